@@ -5,8 +5,8 @@ Created on 22.02.2021 20:18 02
 @author: Piotr Gradkowski <grotsztaksel@o2.pl>
 """
 
-__all__ = ['Tixi', 'TixiException', 'ReturnCode']
+__all__ = ['Tixi', 'TixiException', 'ReturnCode', 'XmlPath', 'TixiProfiler', 'TixiPool', 'Element', 'runBatch']
 __date__ = '2021-02-22'
 __authors__ = ["Piotr Gradkowski <grotsztaksel@o2.pl>"]
 
-from .xtixi import Tixi, TixiException, ReturnCode
\ No newline at end of file
+from .xtixi import Tixi, TixiException, ReturnCode, XmlPath, TixiProfiler, TixiPool, Element, runBatch
\ No newline at end of file
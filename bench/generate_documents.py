@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+"""
+Created on 17.10.2026 16:20
+
+@author: Piotr Gradkowski <grotsztaksel@o2.pl>
+
+Deterministic generator of large synthetic XML documents for the benchmarks.
+All documents have a root element "root" with the attribute "unit" (to be inherited) and leaf elements "item"
+(in the wide documents "item_0" to "item_3") with a numeric text and a numeric attribute "value", so the same
+queries can be run on any of them.
+"""
+
+__authors__ = ['Piotr Gradkowski <grotsztaksel@o2.pl>']
+__date__ = '2026-10-17'
+__all__ = ["KINDS", "GeneratedDocument", "generateDocument"]
+
+import argparse
+import collections
+import os
+import random
+
+GeneratedDocument = collections.namedtuple("GeneratedDocument", ["kind", "nodes", "xml", "paths"])
+GeneratedDocument.__doc__ = """A generated document.
+    nodes: the number of nodes (elements, comments and text nodes) in the document
+    paths: paths of evenly spread "item" elements, by element names (without namespace prefixes)
+           with explicit indices, as getUnknownNSelementPath takes them
+    """
+
+DEPTH = 32
+GROUP_SIZE = 8
+
+
+def _item(rnd, name="item"):
+    """An item - an element and its text node"""
+    value = round(rnd.uniform(-1000.0, 1000.0), 3)
+    return '<{0} value="{1}">{2}</{0}>'.format(name, value, round(value * 0.5, 4))
+
+
+def _wide(nodes, rnd):
+    """All items are the children of the root element, under four different names"""
+    items = max(1, nodes // 2)
+    parts = ['<root unit="m">']
+    paths = list()
+    for i in range(items):
+        paths.append("/root/item_{}[{}]".format(i % 4, i // 4 + 1))
+        parts.append(_item(rnd, "item_{}".format(i % 4)))
+    parts.append("</root>")
+    return parts, paths, 2 * items + 1
+
+
+def _deep(nodes, rnd):
+    """Chains of DEPTH nested "level" elements, each ending with an item"""
+    chains = max(1, nodes // (DEPTH + 3))
+    parts = ['<root unit="m">']
+    paths = list()
+    for m in range(1, chains + 1):
+        parts.append('<chain n="{}">'.format(m))
+        parts.append("<level>" * DEPTH)
+        parts.append(_item(rnd))
+        parts.append("</level>" * DEPTH)
+        parts.append("</chain>")
+        paths.append("/root/chain[{}]{}/item".format(m, "/level" * DEPTH))
+    parts.append("</root>")
+    return parts, paths, chains * (DEPTH + 3) + 1
+
+
+def _namespaced(nodes, rnd):
+    """Groups of prefixed items, each group with a nested element in a default namespace"""
+    groups = max(1, nodes // (2 * GROUP_SIZE + 4))
+    parts = ['<root xmlns:a="urn:bench:a" xmlns:b="urn:bench:b" unit="m">']
+    paths = list()
+    for m in range(1, groups + 1):
+        parts.append("<a:group>")
+        for k in range(1, GROUP_SIZE + 1):
+            parts.append(_item(rnd, "b:item"))
+            paths.append("/root/group[{}]/item[{}]".format(m, k))
+        parts.append('<sub xmlns="urn:bench:c">')
+        parts.append(_item(rnd))
+        parts.append("</sub>")
+        paths.append("/root/group[{}]/sub/item".format(m))
+        parts.append("</a:group>")
+    parts.append("</root>")
+    return parts, paths, groups * (2 * GROUP_SIZE + 4) + 1
+
+
+def _comments(nodes, rnd):
+    """Groups of items, each preceded by a comment, indented with whitespace-only text nodes"""
+    # Per group: the group and the text before it, per item a comment, an item and three text nodes,
+    # and the text before the end of the group
+    groupNodes = 5 * GROUP_SIZE + 3
+    groups = max(1, nodes // groupNodes)
+    parts = ['<root unit="m">']
+    paths = list()
+    for m in range(1, groups + 1):
+        parts.append("\n  <group>")
+        for k in range(1, GROUP_SIZE + 1):
+            parts.append("\n    <!-- item {} of group {} -->".format(k, m))
+            parts.append("\n    ")
+            parts.append(_item(rnd))
+            paths.append("/root/group[{}]/item[{}]".format(m, k))
+        parts.append("\n  </group>")
+    parts.append("\n</root>")
+    return parts, paths, groups * groupNodes + 2
+
+
+_GENERATORS = collections.OrderedDict([("wide", _wide),
+                                       ("deep", _deep),
+                                       ("namespaced", _namespaced),
+                                       ("comments", _comments)])
+KINDS = tuple(_GENERATORS)
+
+
+def generateDocument(kind, nodes, seed=0, samples=64) -> GeneratedDocument:
+    """
+    Generate a document of the given kind with about the given number of nodes.
+    The same arguments always give the same document
+    :param kind: one of KINDS
+    :param nodes: approximate number of nodes
+    :param seed: seed of the random attribute and text values
+    :param samples: number of item paths to return, spread evenly over the document
+    :return: GeneratedDocument
+    """
+    if kind not in _GENERATORS:
+        raise ValueError("Unknown document kind {}, expected one of {}".format(kind, ", ".join(KINDS)))
+    rnd = random.Random("{}-{}-{}".format(kind, nodes, seed))
+    parts, paths, count = _GENERATORS[kind](nodes, rnd)
+    xml = '<?xml version="1.0"?>\n' + "".join(parts)
+    step = max(1, len(paths) // samples)
+    return GeneratedDocument(kind, count, xml, paths[::step][:samples])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write the benchmark documents to a directory")
+    parser.add_argument("directory")
+    parser.add_argument("--sizes", default="1000,10000,100000,1000000",
+                        help="comma-separated approximate numbers of nodes")
+    parser.add_argument("--kinds", default=",".join(KINDS), help="comma-separated document kinds")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    os.makedirs(args.directory, exist_ok=True)
+    for kind in args.kinds.split(","):
+        for size in (int(s) for s in args.sizes.split(",")):
+            document = generateDocument(kind, size, args.seed)
+            fileName = os.path.join(args.directory, "{}_{}.xml".format(kind, size))
+            with open(fileName, "w") as f:
+                f.write(document.xml)
+            print("{}: {} nodes".format(fileName, document.nodes))
+
+
+if __name__ == '__main__':
+    main()
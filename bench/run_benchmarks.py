@@ -0,0 +1,503 @@
+# -*- coding: utf-8 -*-
+"""
+Created on 17.10.2026 16:55
+
+@author: Piotr Gradkowski <grotsztaksel@o2.pl>
+
+Time the ExpandedTixi methods on the generated documents of growing size, fit the scaling exponents
+(time ~ size ** exponent) and save the results as JSON, optionally comparing them with an earlier run:
+
+    python run_benchmarks.py --sizes 1000,10000,100000 --output results.json --compare baseline.json
+"""
+
+__authors__ = ['Piotr Gradkowski <grotsztaksel@o2.pl>']
+__date__ = '2026-10-17'
+__all__ = ["CASES", "runBenchmarks", "scalingExponents", "compareResults"]
+
+import argparse
+import collections
+import datetime
+import itertools
+import json
+import math
+import os
+import platform
+import re
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from xtixi import Tixi
+from xtixi.profiling import TixiProfiler
+
+from generate_documents import KINDS, generateDocument
+
+ITEMS = "//*[@value]"
+NS_URI = "urn:bench:new"
+
+Case = collections.namedtuple("Case", ["function", "mutating"])
+CASES = collections.OrderedDict()
+
+
+def case(mutating=False):
+    """Register the decorated function as a benchmark case. It is called with the opened tixi and the Context.
+    Mutating cases get a freshly opened document for each repetition
+    """
+
+    def register(function):
+        CASES[function.__name__] = Case(function, mutating)
+        return function
+
+    return register
+
+
+class Context(object):
+    """What the cases need to know about the document, found out before the timing"""
+
+    def __init__(self, tixi, document):
+        self.document = document
+        self._directory = None
+        self.names = document.paths
+        self.paths = tixi.getUnknownNSelementPaths(document.paths)
+        # The paths as xmlGetNodePath gives them - the form by which elementRow finds the rows it has indexed
+        self.xmlPaths = [tixi.xPathExpressionGetXPath(path, 1) for path in self.paths]
+        self.parents = [Tixi.parent(path) for path in self.paths]
+        self.count = tixi.xPathEvaluateNodeNumber(ITEMS)
+        step = max(1, self.count // len(self.paths))
+        self.indices = list(range(1, self.count + 1, step))[:len(self.paths)]
+
+    @property
+    def fileName(self) -> str:
+        """The document written to a temporary file"""
+        if self._directory is None:
+            self._directory = tempfile.TemporaryDirectory()
+            with open(os.path.join(self._directory.name, "document.xml"), "w") as f:
+                f.write(self.document.xml)
+        return os.path.join(self._directory.name, "document.xml")
+
+    def close(self):
+        if self._directory is not None:
+            self._directory.cleanup()
+
+
+# Loading
+@case(mutating=True)
+def openFile(tixi, ctx):
+    tixi.openFile(ctx.fileName)
+
+
+@case(mutating=True)
+def openFile_keepWhitespace(tixi, ctx):
+    tixi.openFile(ctx.fileName, stripWhitespace=False)
+
+
+@case(mutating=True)
+def openFile_index(tixi, ctx):
+    # The first repetition builds the index of the file, the others read it
+    tixi.openFile(ctx.fileName, index=True)
+    tixi.getUnknownNSelementPaths(ctx.names)
+
+
+# XPath
+@case()
+def xPathEvaluateNodeNumber(tixi, ctx):
+    tixi.xPathEvaluateNodeNumber(ITEMS)
+
+
+@case()
+def xPathExpressionGetXPath(tixi, ctx):
+    for index in ctx.indices:
+        tixi.xPathExpressionGetXPath(ITEMS, index)
+
+
+@case()
+def xPathExpressionGetAllXPaths(tixi, ctx):
+    tixi.xPathExpressionGetAllXPaths(ITEMS)
+
+
+@case(mutating=True)
+def xPathExpressionGetAllXPaths_nameIndex(tixi, ctx):
+    tixi.enableNameIndex()
+    tixi.xPathExpressionGetAllXPaths("//item")
+    tixi.xPathExpressionGetAllXPaths("//comment()")
+
+
+@case()
+def xPathExpressionIterXPaths(tixi, ctx):
+    for _ in itertools.islice(tixi.xPathExpressionIterXPaths(ITEMS), len(ctx.paths)):
+        pass
+
+
+@case()
+def xPathExpressionGetLastXPath(tixi, ctx):
+    tixi.xPathExpressionGetLastXPath(ITEMS)
+
+
+# Attributes and values
+@case()
+def getAttributes(tixi, ctx):
+    for path in ctx.paths:
+        tixi.getAttributes(path)
+
+
+@case()
+def getAttributesBulk(tixi, ctx):
+    tixi.getAttributesBulk(ctx.paths)
+
+
+@case()
+def getAttributesBulk_xPath(tixi, ctx):
+    tixi.getAttributesBulk(ITEMS, names=["value"])
+
+
+@case()
+def getNumericArray(tixi, ctx):
+    tixi.getNumericArray(ITEMS, attr="value")
+
+
+@case(mutating=True)
+def setNumericArray(tixi, ctx):
+    tixi.setNumericArray(ITEMS, range(ctx.count), attr="value")
+
+
+@case(mutating=True)
+def addNumericArray(tixi, ctx):
+    tixi.addNumericArray(ctx.parents[0], "added", range(1000))
+
+
+@case()
+def findInheritedAttribute(tixi, ctx):
+    for path in ctx.paths:
+        tixi.findInheritedAttribute(path, "unit")
+
+
+@case()
+def findInheritedAttributes(tixi, ctx):
+    tixi.findInheritedAttributes(ctx.paths, "unit")
+
+
+@case()
+def getInheritedTextAttribute(tixi, ctx):
+    for path in ctx.paths:
+        tixi.getInheritedTextAttribute(path, "unit")
+
+
+@case()
+def getInheritedTextAttributes(tixi, ctx):
+    tixi.getInheritedTextAttributes(ctx.paths, "unit")
+
+
+# Paths
+@case()
+def staticPathHelpers(tixi, ctx):
+    for path in ctx.paths:
+        Tixi.parent(path), Tixi.elementName(path), Tixi.uniqueElementName(path), Tixi.elementNumber(path)
+
+
+@case()
+def elementRow(tixi, ctx):
+    for path in ctx.xmlPaths:
+        tixi.elementRow(path)
+
+
+@case()
+def elementRows(tixi, ctx):
+    tixi.elementRows(ctx.xmlPaths)
+
+
+@case()
+def getUnknownNSelementPath(tixi, ctx):
+    for name in ctx.names:
+        tixi.getUnknownNSelementPath(name)
+
+
+@case()
+def getUnknownNSelementPaths(tixi, ctx):
+    tixi.getUnknownNSelementPaths(ctx.names)
+
+
+@case()
+def getURI(tixi, ctx):
+    # Every call reads the whole document - a few calls are enough
+    for name in ctx.names[:8]:
+        tixi.getURI(name)
+
+
+@case()
+def getURIs(tixi, ctx):
+    tixi.getURIs(ctx.names)
+
+
+@case()
+def iterTree(tixi, ctx):
+    for _ in tixi.iterTree():
+        pass
+
+
+# Creating elements
+@case(mutating=True)
+def createElement(tixi, ctx):
+    for parent in ctx.parents:
+        tixi.createElement(parent, "new")
+
+
+@case(mutating=True)
+def createElementAtIndex(tixi, ctx):
+    for parent in ctx.parents:
+        tixi.createElementAtIndex(parent, "new", 1)
+
+
+@case(mutating=True)
+def createElementNS(tixi, ctx):
+    for parent in ctx.parents:
+        tixi.createElementNS(parent, "new", NS_URI)
+
+
+@case(mutating=True)
+def createElementNSAtIndex(tixi, ctx):
+    for parent in ctx.parents:
+        tixi.createElementNSAtIndex(parent, "new", 1, NS_URI)
+
+
+@case(mutating=True)
+def addTextElement(tixi, ctx):
+    for parent in ctx.parents:
+        tixi.addTextElement(parent, "new", "text")
+
+
+@case(mutating=True)
+def addTextElementAtIndex(tixi, ctx):
+    for parent in ctx.parents:
+        tixi.addTextElementAtIndex(parent, "new", "text", 1)
+
+
+@case(mutating=True)
+def createElement_siblings(tixi, ctx):
+    for _ in range(1000):
+        tixi.createElement(ctx.parents[0], "new")
+
+
+@case(mutating=True)
+def buildSubtree(tixi, ctx):
+    spec = [{"name": "block", "attributes": {"n": i},
+             "children": [{"name": "entry", "text": j} for j in range(10)]} for i in range(100)]
+    tixi.buildSubtree(ctx.parents[0], spec, returnPaths=True)
+
+
+# Removing nodes
+@case(mutating=True)
+def clearComments(tixi, ctx):
+    tixi.clearComments()
+
+
+@case(mutating=True)
+def clearComments_nameIndex(tixi, ctx):
+    tixi.enableNameIndex()
+    tixi.clearComments()
+
+
+@case(mutating=True)
+def clearWhitespace(tixi, ctx):
+    tixi.clearWhitespace()
+
+
+@case(mutating=True)
+def removeElements(tixi, ctx):
+    tixi.removeElements(ctx.paths)
+
+
+def _openDocument(document) -> Tixi:
+    tixi = Tixi()
+    tixi.openString(document.xml)
+    return tixi
+
+
+def _timeCase(benchmark, document, tixi, ctx, repeats) -> float:
+    """Return the best time of the case out of the repetitions. Each of them starts with cold caches"""
+    best = math.inf
+    for _ in range(repeats):
+        if benchmark.mutating:
+            tixi = _openDocument(document)
+        else:
+            # Forget everything remembered about the document by the earlier repetitions
+            tixi._documentChanged()
+        start = time.perf_counter()
+        benchmark.function(tixi, ctx)
+        best = min(best, time.perf_counter() - start)
+        if benchmark.mutating:
+            tixi.close()
+    return best
+
+
+def _countCalls(benchmark, document, tixi, ctx) -> int:
+    """Run the case once more, counting the Tixi3 calls it makes"""
+    if benchmark.mutating:
+        tixi = _openDocument(document)
+    else:
+        tixi._documentChanged()
+    with TixiProfiler() as profiler:
+        benchmark.function(tixi, ctx)
+    if benchmark.mutating:
+        tixi.close()
+    return sum(call["calls"] for entry in profiler.report().values() for call in entry["tixi3"].values())
+
+
+def runBenchmarks(sizes, kinds=KINDS, cases=None, repeats=3, budget=10.0, countCalls=False, log=print) -> list:
+    """
+    Run the cases on the documents of all kinds and sizes
+    :param sizes: approximate numbers of nodes of the documents
+    :param kinds: kinds of the documents, see generate_documents.KINDS
+    :param cases: names of the cases to run, all if None
+    :param repeats: number of repetitions, the best time counts
+    :param budget: time in seconds; if a case takes longer on a document, it is not run on the larger ones
+    :param countCalls: if True, also count the Tixi3 calls made by each case (in an extra, untimed run)
+    :param log: function to print the progress with
+    :return: list of dicts with the keys "case", "kind", "size", "nodes", "seconds", "status"
+             and, if countCalls, "tixi3Calls"
+    """
+    cases = list(CASES) if cases is None else list(cases)
+    results = list()
+    for kind in kinds:
+        overBudget = set()
+        for size in sorted(sizes):
+            document = generateDocument(kind, size)
+            tixi = _openDocument(document)
+            ctx = Context(tixi, document)
+            for name in cases:
+                result = {"case": name, "kind": kind, "size": size, "nodes": document.nodes, "seconds": None}
+                if name in overBudget:
+                    result["status"] = "skipped"
+                else:
+                    try:
+                        result["seconds"] = _timeCase(CASES[name], document, tixi, ctx, repeats)
+                        if countCalls:
+                            result["tixi3Calls"] = _countCalls(CASES[name], document, tixi, ctx)
+                        result["status"] = "ok"
+                    except ImportError as e:
+                        result["status"] = "unavailable: {}".format(e)
+                    except Exception as e:
+                        result["status"] = "error: {!r}".format(e)
+                    if result["seconds"] is None or result["seconds"] > budget:
+                        overBudget.add(name)
+                results.append(result)
+                log("{:>12} {:>9} {:<32} {}".format(kind, document.nodes, name,
+                                                    "{:.6f} s".format(result["seconds"])
+                                                    if result["seconds"] is not None else result["status"]))
+            tixi.close()
+            ctx.close()
+    return results
+
+
+def scalingExponents(results, key="seconds") -> dict:
+    """Fit time ~ nodes ** exponent to the results of each case on each kind of document, by least squares
+    in log-log scale. Cases timed on fewer than two sizes get no exponent
+    :param key: the measure to fit - "seconds" or "tixi3Calls"
+    :return: dict {case: {kind: exponent}}
+    """
+    points = collections.defaultdict(list)
+    for result in results:
+        if result.get(key):
+            points[(result["case"], result["kind"])].append((math.log(result["nodes"]), math.log(result[key])))
+
+    exponents = collections.OrderedDict()
+    for (name, kind), xy in points.items():
+        if len(xy) < 2:
+            continue
+        meanX = sum(x for x, _ in xy) / len(xy)
+        meanY = sum(y for _, y in xy) / len(xy)
+        sxx = sum((x - meanX) ** 2 for x, _ in xy)
+        if sxx == 0:
+            continue
+        exponents.setdefault(name, collections.OrderedDict())[kind] = sum((x - meanX) * (y - meanY)
+                                                                          for x, y in xy) / sxx
+    return exponents
+
+
+def compareResults(baseline, current, threshold=1.25) -> list:
+    """Compare the timings of two runs
+    :param baseline: results dict of the earlier run, as saved by main
+    :param current: results dict of this run
+    :param threshold: ratio current/baseline above which a timing is marked as a regression
+    :return: list of tuples (case, kind, size, baseline seconds, current seconds, ratio, regression flag)
+    """
+    earlier = {(r["case"], r["kind"], r["size"]): r["seconds"] for r in baseline["results"]}
+    rows = list()
+    for r in current["results"]:
+        before = earlier.get((r["case"], r["kind"], r["size"]))
+        if before and r["seconds"]:
+            ratio = r["seconds"] / before
+            rows.append((r["case"], r["kind"], r["size"], before, r["seconds"], ratio, ratio > threshold))
+    return rows
+
+
+def _gitCommit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], cwd=os.path.dirname(os.path.abspath(__file__)),
+                                       stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _printExponents(title, exponents, kinds):
+    print("\n" + title)
+    print("{:<32}".format("") + "".join("{:>12}".format(kind) for kind in kinds))
+    for name, byKind in exponents.items():
+        print("{:<32}".format(name) + "".join("{:>12}".format("{:.2f}".format(byKind[kind]) if kind in byKind else "-")
+                                              for kind in kinds))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark ExpandedTixi on synthetic documents")
+    parser.add_argument("--sizes", default="1000,10000,100000,1000000",
+                        help="comma-separated approximate numbers of nodes")
+    parser.add_argument("--kinds", default=",".join(KINDS), help="comma-separated document kinds")
+    parser.add_argument("--cases", default=None, help="regular expression selecting the cases to run")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--budget", type=float, default=10.0,
+                        help="seconds; a case taking longer is not run on the larger documents")
+    parser.add_argument("--calls", action="store_true", help="also count the Tixi3 calls made by each case")
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--compare", default=None, help="JSON results of an earlier run to compare with")
+    parser.add_argument("--threshold", type=float, default=1.25,
+                        help="slowdown ratio reported as a regression")
+    args = parser.parse_args(argv)
+
+    cases = [name for name in CASES if args.cases is None or re.search(args.cases, name)]
+    results = runBenchmarks([int(s) for s in args.sizes.split(",")], args.kinds.split(","), cases,
+                            args.repeats, args.budget, args.calls)
+    exponents = scalingExponents(results)
+    output = {"meta": {"commit": _gitCommit(),
+                       "date": datetime.datetime.now().isoformat(timespec="seconds"),
+                       "python": platform.python_version(),
+                       "platform": platform.platform(),
+                       "repeats": args.repeats},
+              "results": results,
+              "exponents": exponents}
+    if args.calls:
+        output["callExponents"] = scalingExponents(results, "tixi3Calls")
+    with open(args.output, "w") as f:
+        json.dump(output, f, indent=1)
+
+    _printExponents("Scaling exponents (time ~ nodes ** exponent):", exponents, args.kinds.split(","))
+    if args.calls:
+        _printExponents("Scaling exponents of the number of Tixi3 calls:", output["callExponents"],
+                        args.kinds.split(","))
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        rows = compareResults(baseline, output, args.threshold)
+        print("\nCompared with {} ({}):".format(args.compare, baseline["meta"].get("commit")))
+        for name, kind, size, before, after, ratio, regression in rows:
+            print("{:<32} {:>12} {:>9} {:>12.6f} {:>12.6f} {:>7.2f}{}".format(name, kind, size, before, after, ratio,
+                                                                            "  REGRESSION" if regression else ""))
+        if any(row[-1] for row in rows):
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+"""
+Created on 17.10.2026 23:55
+
+@author: Piotr Gradkowski <grotsztaksel@o2.pl>
+"""
+
+__authors__ = ['Piotr Gradkowski <grotsztaksel@o2.pl>']
+__date__ = '2026-10-17'
+
+import os
+import shutil
+import signal
+import sys
+import tempfile
+import time
+import unittest
+
+sys.path.append("..")
+
+import test_expanded_tixi
+from xtixi import runBatch
+from xtixi.batch import batchFiles
+
+
+# At module level, to be picklable for the worker processes
+def nodeCount(tixi):
+    return tixi.xPathEvaluateNodeNumber("//node_4")
+
+
+def sleeping(tixi):
+    time.sleep(10)
+
+
+class TestBatch(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        os.mkdir(os.path.join(self.directory, "sub"))
+        self.fileNames = [os.path.join(self.directory, name)
+                          for name in ("a.xml", "b.xml", os.path.join("sub", "c.xml"))]
+        for fileName in self.fileNames:
+            with open(fileName, "w") as file:
+                file.write(test_expanded_tixi.TEST_XML)
+        self.broken = os.path.join(self.directory, "broken.xml")
+        with open(self.broken, "w") as file:
+            file.write("<root><unclosed></root>")
+        with open(os.path.join(self.directory, "notes.txt"), "w") as file:
+            file.write("not a document")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_batchFiles(self):
+        self.assertEqual(sorted(self.fileNames + [self.broken]), batchFiles(self.directory))
+        self.assertEqual(self.fileNames[:2], batchFiles(os.path.join(self.directory, "[ab].xml")))
+        self.assertEqual(sorted([self.broken, self.fileNames[2]]), batchFiles([self.broken, self.fileNames[2],
+                                                                               self.broken]))
+
+    def checkBatch(self, processes, ordered):
+        with runBatch(self.directory, nodeCount, processes=processes, ordered=ordered, chunkSize=2) as run:
+            results = list(run)
+        if ordered:
+            self.assertEqual(sorted(self.fileNames + [self.broken]), [result.fileName for result in results])
+        results = {result.fileName: result for result in results}
+        for fileName in self.fileNames:
+            self.assertEqual(6, results[fileName].result)
+            self.assertIsNone(results[fileName].error)
+        self.assertIsNone(results[self.broken].result)
+        self.assertIsNotNone(results[self.broken].error)
+
+        report = run.report()
+        self.assertEqual((4, 1, 0), report[:3])
+        self.assertEqual(sum(os.path.getsize(fileName) for fileName in results), report.bytes)
+        self.assertGreater(report.filesPerSecond, 0)
+
+    def test_inProcess(self):
+        self.checkBatch(processes=0, ordered=True)
+
+    def test_processes(self):
+        self.checkBatch(processes=2, ordered=True)
+        self.checkBatch(processes=2, ordered=False)
+
+    @unittest.skipUnless(hasattr(signal, "SIGALRM"), "Timeouts need SIGALRM")
+    def test_timeout(self):
+        with runBatch(self.fileNames[0], sleeping, processes=1, timeout=0.2) as run:
+            result, = run
+        self.assertTrue(result.timedOut)
+        self.assertLess(result.seconds, 5)
+        self.assertEqual(1, run.report().timedOut)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+"""
+Created on 17.10.2026 21:50
+
+@author: Piotr Gradkowski <grotsztaksel@o2.pl>
+"""
+
+__authors__ = ['Piotr Gradkowski <grotsztaksel@o2.pl>']
+__date__ = '2026-10-17'
+
+import sys
+import unittest
+
+sys.path.append("..")
+
+try:
+    # If Tixi path is specified in PYTHONPATH
+    from tixi3wrapper import Tixi3Exception as TixiException
+except ImportError:
+    # This usually works in Anaconda environment
+    from tixi3.tixi3wrapper import Tixi3Exception as TixiException
+
+import test_expanded_tixi
+from xtixi import Tixi, Element
+
+
+class TestElement(unittest.TestCase):
+    def setUp(self):
+        self.tixi = Tixi()
+        self.tixi.openString(test_expanded_tixi.TEST_XML)
+        self.tixi.clearWhitespace()
+
+    def test_navigation(self):
+        root = self.tixi.element("/root")
+        self.assertIsNone(root.parent)
+        self.assertEqual("root", root.name)
+        self.assertEqual(["/root/child_1", "/root/child_2[1]", "/root/child_2[2]"],
+                         [str(child.path) for child in root.children])
+
+        node_3 = self.tixi.element("/root/child_2[1]/child_2[1]/node_3[1]")
+        self.assertEqual("/root/child_2[1]/child_2[1]/node_3[1]", node_3.path)
+        self.assertEqual(Element(self.tixi, "/root/child_2[1]/child_2[1]"), node_3.parent)
+        self.assertEqual(1, node_3.row)
+        self.assertIsNone(node_3.text)
+        node_4, good, node_5, named = node_3.children
+        self.assertEqual({"attr": "good"}, good.attributes)
+        self.assertEqual("good", good.get("attr"))
+        self.assertIsNone(node_4.get("attr"))
+        self.assertEqual(3, node_5.row)
+        self.assertEqual("Text O", node_5.text.strip())
+
+        with self.assertRaises(TixiException):
+            self.tixi.element("//node_4")
+        with self.assertRaises(TixiException):
+            self.tixi.element("//node_9")
+
+    def test_changes(self):
+        child_1 = self.tixi.element("/root/child_1")
+        self.assertEqual(1, len(child_1.children))
+
+        first = child_1.createElement("node_9", index=1)
+        self.assertEqual("/root/child_1/node_9", first.path)
+        last = child_1.addTextElement("node_9", "text")
+        self.assertEqual("/root/child_1/node_9[2]", last.path)
+        self.assertEqual("text", last.text)
+        # What the handle knows is reloaded after the document has changed
+        self.assertEqual(3, len(child_1.children))
+        self.assertEqual(3, last.row)
+
+        self.tixi.addTextAttribute(str(last.path), "n", "1")
+        self.assertEqual({"n": "1"}, last.attributes)
+
+
+if __name__ == '__main__':
+    unittest.main()
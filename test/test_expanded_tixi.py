@@ -8,8 +8,9 @@ Created on 24.11.2020 21:14
 __authors__ = ['Piotr Gradkowski <grotsztaksel@o2.pl>']
 __date__ = '2020-11-24'
 
-import re
+import os
 import sys
+import tempfile
 import unittest
 
 sys.path.append("..")
@@ -23,7 +24,7 @@ except ImportError:
     from tixi3.tixi3wrapper import ReturnCode
     from tixi3.tixi3wrapper import Tixi3Exception as TixiException
 
-from xtixi import Tixi
+from xtixi import Tixi, XmlPath
 
 TEST_XML = """<?xml version="1.0"?>
               <root>
@@ -66,9 +67,9 @@ TEST_XML = """<?xml version="1.0"?>
 class TestExpandedTixi(unittest.TestCase):
     def setUp(self):
         self.tixi = Tixi()
-        # Need to get rid of leading spaces, otherwise they are treated as element #text
-        string = re.sub("\s+<", "<", TEST_XML)
-        self.tixi.openString(string)
+        self.tixi.openString(TEST_XML)
+        # Get rid of the indentation, otherwise it is treated as element #text
+        self.tixi.clearWhitespace()
 
     def test_xPathEvaluateNodeNumber(self):
         self.assertEqual(6, self.tixi.xPathEvaluateNodeNumber("//node_3/node_4"))
@@ -87,10 +88,170 @@ class TestExpandedTixi(unittest.TestCase):
 
         self.assertEqual([], self.tixi.xPathExpressionGetAllXPaths("//node_3/node_9"))
 
+    def test_xPathExpressionIterXPaths(self):
+        paths = self.tixi.xPathExpressionIterXPaths("//node_3/node_4")
+        self.assertEqual('/root/child_2[1]/child_2[1]/node_3[1]/node_4[1]', next(paths))
+        self.assertEqual('/root/child_2[1]/child_2[1]/node_3[1]/node_4[2]', next(paths))
+        self.assertEqual(4, len(list(paths)))
+
+        self.assertEqual([], list(self.tixi.xPathExpressionIterXPaths("//node_3/node_9")))
+
+    def test_xPathExpressionGetLastXPath(self):
+        self.assertEqual('/root/child_2[2]/node_3/node_4[2]', self.tixi.xPathExpressionGetLastXPath("//node_3/node_4"))
+        self.assertEqual('/root/child_2[2]/node_3/node_4[2]',
+                         self.tixi.xPathExpressionGetLastXPath("//child_2/node_3[1]/node_4"))
+        self.assertIsNone(self.tixi.xPathExpressionGetLastXPath("//node_3/node_9"))
+
+    def test_xPathCache(self):
+        self.assertIsNone(self.tixi.xPathCacheStats())
+        self.tixi.enableXPathCache(maxSize=2)
+
+        xpath = "//node_3/node_4"
+        paths = self.tixi.xPathExpressionGetAllXPaths(xpath)
+        self.assertEqual(paths, self.tixi.xPathExpressionGetAllXPaths(xpath))
+        self.assertEqual(1, self.tixi.xPathCacheStats()["hits"])
+
+        # Changing the document invalidates the results
+        generation = self.tixi.documentGeneration()
+        self.tixi.createElement("/root/child_2[2]/node_3", "node_4")
+        self.assertLess(generation, self.tixi.documentGeneration())
+        self.assertEqual(7, len(self.tixi.xPathExpressionGetAllXPaths(xpath)))
+        self.assertEqual(7, self.tixi.xPathEvaluateNodeNumber(xpath))
+        stats = self.tixi.xPathCacheStats()
+        self.assertEqual(1, stats["invalidations"])
+        self.assertEqual(2, stats["size"])
+        self.assertEqual(0, stats["evictions"])
+        # A third result evicts the least recently used one
+        self.assertEqual(4, self.tixi.xPathEvaluateNodeNumber("//node_3"))
+        self.assertEqual(1, self.tixi.xPathCacheStats()["evictions"])
+
+        # The cached list cannot be changed from outside
+        self.tixi.xPathExpressionGetAllXPaths(xpath).clear()
+        self.assertEqual(7, len(self.tixi.xPathExpressionGetAllXPaths(xpath)))
+
+        self.tixi.addTextAttribute("/root/child_1", "attr", "new")
+        self.assertEqual(["/root/child_1"], self.tixi.xPathExpressionGetAllXPaths("//child_1[@attr]"))
+
     def test_getAttributes(self):
         self.assertEqual({"attr": "foo", "name": "bar"}, self.tixi.getAttributes('/root/child_2[1]'))
         self.assertEqual({}, self.tixi.getAttributes('/root/child_1[1]'))
 
+    def test_getAttributesBulk(self):
+        xpath = "/root/child_2[1]/child_2[1]/node_3[1]/node_4"
+        self.assertEqual({"attr": [None, "good", None], "name": [None, None, "node4"]},
+                         self.tixi.getAttributesBulk(xpath))
+        self.assertEqual({"attr": [None, "good", None]}, self.tixi.getAttributesBulk(xpath, names=["attr"]))
+        self.assertEqual({"attr": ["foo", "9"]},
+                         self.tixi.getAttributesBulk(["/root/child_2[1]", "/root/child_2[1]/child_2[1]"],
+                                                     names=["attr"]))
+        self.assertEqual({}, self.tixi.getAttributesBulk("//node_9"))
+
+        # All elements have the same attributes
+        for i, path in enumerate(self.tixi.xPathExpressionGetAllXPaths("//node_4")):
+            self.tixi.addTextAttribute(path, "x", str(i))
+        columns = self.tixi.getAttributesBulk("//node_4[not(@attr) and not(@name)]")
+        self.assertEqual({"x": ["0", "3", "4", "5"]}, columns)
+
+        # Prefixed attribute names are not used as XPath name tests, their prefixes need not be registered
+        tixi = Tixi()
+        tixi.openString('<root xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance">'
+                        '<a xsi:type="t1"/><a xsi:type="t2" n="1"/></root>')
+        columns = tixi.getAttributesBulk("//a")
+        self.assertEqual(2, len(columns))
+        self.assertEqual([None, "1"], columns["n"])
+        self.assertEqual({"n": [None, "1"]}, tixi.getAttributesBulk("//a", names=["n"]))
+
+    def test_getAttributesBulk_asArrays(self):
+        try:
+            import numpy
+        except ImportError:
+            self.skipTest("NumPy is not available")
+        self.tixi.addTextAttribute("/root/child_2[1]/child_2[1]/node_3[1]/node_4[3]", "attr", "1.5")
+        columns = self.tixi.getAttributesBulk("/root/child_2[1]/child_2[1]/node_3[1]/node_4", asArrays=True)
+        self.assertEqual([True, False, False], list(columns["attr"].mask))
+        self.assertEqual([True, True, False], list(columns["name"].mask))
+        self.assertEqual("node4", columns["name"][2])
+
+        columns = self.tixi.getAttributesBulk("//*[@attr]", names=["attr"], asArrays=True)
+        self.assertEqual(["foo", "9", "good", "1.5"], columns["attr"].tolist())
+
+        columns = self.tixi.getAttributesBulk("//child_2/child_2 | //node_4[@name]", names=["attr"], asArrays=True)
+        self.assertEqual([False, False, True], list(columns["attr"].mask))
+        self.assertEqual([9.0, 1.5], columns["attr"].compressed().tolist())
+
+    def test_numericArrays(self):
+        try:
+            import numpy
+        except ImportError:
+            self.skipTest("NumPy is not available")
+        self.tixi.addNumericArray("/root/child_1", "x", [1, 2.5, 1e-7])
+        self.assertEqual(["1", "2.5", "1e-07"],
+                         [self.tixi.getTextElement("/root/child_1/x[{}]".format(i)) for i in (1, 2, 3)])
+        self.assertEqual([1.0, 2.5, 1e-7], self.tixi.getNumericArray("/root/child_1/x").tolist())
+
+        values = numpy.array([1 / 3, 2.0, -4e12])
+        self.tixi.setNumericArray("/root/child_1/x", values)
+        self.tixi.addDoubleElement("/root/child_1", "y", 1 / 3, "%g")
+        self.assertEqual(self.tixi.getTextElement("/root/child_1/y"), self.tixi.getTextElement("/root/child_1/x[1]"))
+
+        self.tixi.setNumericArray("/root/child_1/x", values, attr="w", format="%.3f")
+        self.assertEqual("0.333", self.tixi.getTextAttribute("/root/child_1/x[1]", "w"))
+        self.assertEqual([0.333, 2.0, -4e12], self.tixi.getNumericArray("/root/child_1/x", attr="w").tolist())
+        self.assertEqual([2], self.tixi.getNumericArray("/root/child_1/x[2]", dtype=int).tolist())
+        self.assertEqual(0, len(self.tixi.getNumericArray("//node_9")))
+
+        with self.assertRaises(ValueError):
+            self.tixi.setNumericArray("/root/child_1/x", [1, 2])
+
+    def test_openFile(self):
+        stripped = Tixi()
+        stripped.openString(TEST_XML)
+        stripped.clearWhitespace()
+        with tempfile.TemporaryDirectory() as directory:
+            fileName = os.path.join(directory, "test.xml")
+            with open(fileName, "w") as f:
+                f.write(TEST_XML)
+            tixi = Tixi()
+            stats = tixi.openFile(fileName)
+            self.assertEqual(stripped.exportDocumentAsString(), tixi.exportDocumentAsString())
+            # Only the whitespace-only text nodes are removed
+            text = tixi.getTextElement("/root/child_2[1]/child_2[1]/node_3[1]/node_5")
+            self.assertEqual("Text O", text.strip())
+            self.assertNotEqual("Text O", text.lstrip())
+            self.assertEqual(len(TEST_XML), stats.bytesRead)
+            self.assertLess(0, stats.seconds)
+            # The layout of the document walked through is not kept after the load
+            self.assertEqual({}, tixi._childNames)
+            self.assertEqual({}, tixi._childNodeIndexes)
+
+            tixi.openFile(fileName, stripWhitespace=False)
+            self.assertLess(0, tixi.xPathEvaluateNodeNumber("//text()[normalize-space()='']"))
+
+    def test_iterTree(self):
+        nodes = list(self.tixi.iterTree())
+        self.assertEqual(self.tixi.xPathExpressionGetAllXPaths("//*"), [node.path for node in nodes])
+        self.assertEqual(["root", "child_1", "child"], [node.name for node in nodes[:3]])
+        self.assertEqual({"attr": "foo", "name": "bar"}, nodes[3].attributes)
+        self.assertIsNone(nodes[0].text)
+        self.assertEqual("Text", nodes[9].text.strip())
+
+        self.assertEqual(["/root", "/root/child_1", "/root/child_2[1]", "/root/child_2[2]"],
+                         [node.path for node in self.tixi.iterTree(depth=1)])
+        self.assertEqual(["/root/child_2[2]", "/root/child_2[2]/node_3"],
+                         [node.path for node in self.tixi.iterTree("/root/child_2[2]", depth=1)])
+
+        # Pruned subtrees are not visited
+        paths = [node.path for node in self.tixi.iterTree("/root/child_2[1]",
+                                                          filter=lambda node: node.attributes.get("attr") != "9")]
+        self.assertEqual(["/root/child_2[1]", "/root/child_2[1]/child_2[2]", "/root/child_2[1]/node_3",
+                          "/root/child_2[1]/node_3/node_4"], paths)
+
+        nodes = self.tixi.iterTree()
+        next(nodes)
+        self.tixi.createElement("/root", "child_3")
+        with self.assertRaises(RuntimeError):
+            next(nodes)
+
     def test_parent(self):
         self.assertEqual('/root/child_2[1]/child_2[1]/node_3[1]',
                          self.tixi.parent(
@@ -107,6 +268,50 @@ class TestExpandedTixi(unittest.TestCase):
         self.assertEqual("/root/child_2[1]/node_9", path)
         self.assertTrue(self.tixi.checkElement("/root/child_2[1]/node_9"))
 
+    def test_createElement_siblings(self):
+        paths = [self.tixi.createElement("/root/child_1[1]", "node_9") for _ in range(3)]
+        self.assertIsNone(self.tixi.createElement("/root/child_1", "node_9", returnPath=False))
+        paths.append(self.tixi.addTextElement("/root/child_1", "node_9", "text"))
+        paths.append(self.tixi.createElement("/root/child_1/node_9[1]", "node_9"))
+        paths.append(self.tixi.createElement("/root/child_1", "node_8"))
+
+        # The path of the first element gains an index, once it gets a sibling
+        self.assertEqual(["/root/child_1/node_9", "/root/child_1/node_9[2]", "/root/child_1/node_9[3]",
+                          "/root/child_1/node_9[5]", "/root/child_1/node_9[1]/node_9", "/root/child_1/node_8"],
+                         paths)
+        self.assertEqual("/root/child_1/node_9[5]", self.tixi.xPathExpressionGetLastXPath("/root/child_1/node_9"))
+        self.assertEqual("text", self.tixi.getTextElement(paths[3]))
+
+        # Adding a sibling behind the helper's back is not missed either
+        self.tixi.createElementAtIndex("/root/child_1", "node_8", 1)
+        self.assertEqual("/root/child_1/node_8[3]", self.tixi.createElement("/root/child_1", "node_8"))
+
+    def test_createElement_withoutPath(self):
+        self.tixi.createElement("/root/child_1[1]", "node_9")
+        self.assertIsNone(self.tixi.createElement("/root/child_1", "node_9", returnPath=False))
+        # The element appended without returning its path is counted too
+        self.assertEqual("/root/child_1/node_9[3]", self.tixi.createElement("/root/child_1[1]", "node_9"))
+
+    def test_buildSubtree(self):
+        spec = {"name": "node_3",
+                "attributes": {"name": "built", "size": 2},
+                "children": [{"name": "node_4", "text": 1.5},
+                             {"name": "node_4", "children": iter([{"name": "leaf"}])},
+                             {"name": "node_5", "text": "text"}]}
+        paths = self.tixi.buildSubtree("/root/child_2[2]", spec, returnPaths=True)
+        self.assertEqual(["/root/child_2[2]/node_3[2]",
+                          "/root/child_2[2]/node_3[2]/node_4[1]",
+                          "/root/child_2[2]/node_3[2]/node_4[2]",
+                          "/root/child_2[2]/node_3[2]/node_4[2]/leaf",
+                          "/root/child_2[2]/node_3[2]/node_5"], paths)
+        self.assertEqual({"name": "built", "size": "2"}, self.tixi.getAttributes(paths[0]))
+        self.assertEqual("1.5", self.tixi.getTextElement(paths[1]))
+        self.assertEqual("text", self.tixi.getTextElement(paths[4]))
+
+        self.assertIsNone(self.tixi.buildSubtree("/root/child_1", ({"name": "node_%d" % i} for i in range(3))))
+        self.assertEqual(["/root/child_1/child", "/root/child_1/node_0", "/root/child_1/node_1",
+                          "/root/child_1/node_2"], self.tixi.xPathExpressionGetAllXPaths("/root/child_1/*"))
+
     def test_xPath_by_attributeNamespace(self):
         """This test check the basic tixi functionality - not the extended tixi
         whether it can evaluate XPath expressions containing [namespace-uri()="..."]
@@ -172,6 +377,22 @@ class TestExpandedTixi(unittest.TestCase):
         except TixiException as e:
             self.assertEqual(ReturnCode.INVALID_XPATH, e.code)
 
+    def test_getUnknownNSelementPaths(self):
+        paths = ["/root/child_2[2]/node_3/node_4[2]",
+                 "/root/child_2[2]/node_3/node_4[1]",
+                 "/root/child_2[2]/node_3/node_5",
+                 "/root/child_2[1]/child_2[1]/node_3[1]/node_4[3]"]
+        self.assertEqual(["/*[1]/*[3]/*[1]/*[2]", "/*[1]/*[3]/*[1]/*[1]", "/*[1]/*[3]/*[1]/*[3]",
+                          "/*[1]/*[2]/*[1]/*[1]/*[4]"],
+                         self.tixi.getUnknownNSelementPaths(paths))
+
+        # The remembered layout follows the changes of the document
+        self.tixi.createElementAtIndex("/root/child_2[2]/node_3", "node_4", 1)
+        # The paths now name other elements: node_4[1] is the new one
+        self.assertEqual(["/*[1]/*[3]/*[1]/*[2]", "/*[1]/*[3]/*[1]/*[1]", "/*[1]/*[3]/*[1]/*[4]"],
+                         self.tixi.getUnknownNSelementPaths(paths[:3]))
+        self.assertEqual([], self.tixi.getUnknownNSelementPaths([]))
+
     def test_getURI(self):
         # First, set some namespaces
 
@@ -194,6 +415,14 @@ class TestExpandedTixi(unittest.TestCase):
                          (uri2_path, uri2))
         self.assertEqual((None, None), (uri3_path, uri3))
 
+        # Batch form gives the same results
+        self.assertEqual([(uri1_path, uri1), (uri2_path, uri2), (uri3_path, uri3)],
+                         self.tixi.getURIs(["/root/child_2[1]/child_2[1]",
+                                            "/root/child_2[1]/child_2[1]/node_3[1]/node_4[2]",
+                                            "/root/child_2[2]/node_3/node_4[2]"]))
+        self.assertEqual(("/root/child_2[1]", "http://www.test_uri1"),
+                         self.tixi.getURI("/root/child_2[1]/child_2[1]/node_3[1]/node_4[3]"))
+
         # try accessing the nodes
         self.tixi.registerNamespace(uri1, "u1")
         self.tixi.registerNamespace(uri2, "u2")
@@ -209,6 +438,14 @@ class TestExpandedTixi(unittest.TestCase):
         self.assertEqual("good",
                          self.tixi.getTextAttribute("/root/u1:child_2[1]/child_2[1]/node_3[1]/u2:node_4[1]", "attr"))
 
+    def test_getURI_redeclared(self):
+        tixi = Tixi()
+        tixi.openString('<root><a xmlns="urn:x"><b xmlns="urn:x"><c/></b></a><d/></root>')
+        # The nearest declaration counts, even if it repeats the URI of the parent
+        self.assertEqual(("/root/a/b", "urn:x"), tixi.getURI("/root/a/b/c"))
+        self.assertEqual(("/root/a", "urn:x"), tixi.getURI("/root/a"))
+        self.assertEqual((None, None), tixi.getURI("/root/d"))
+
     def test_addTextElement(self):
         path = self.tixi.addTextElement("/root/child_2[1]", "node_9", "text of the node")
         self.assertEqual("/root/child_2[1]/node_9", path)
@@ -252,11 +489,60 @@ class TestExpandedTixi(unittest.TestCase):
         self.assertEqual(1, self.tixi.elementNumber('/root/child_2[1]/child_2[1]/node_3[1]/node_5'))
         self.assertEqual(2, self.tixi.elementNumber('/root/child_2[2]'))
 
+    def test_xmlPathArguments(self):
+        path = XmlPath.parse('/root/child_2[1]/child_2[1]/node_3[1]/node_4[2]')
+        self.assertEqual('/root/child_2[1]/child_2[1]/node_3[1]', self.tixi.parent(path))
+        self.assertIsInstance(self.tixi.parent(path), XmlPath)
+        self.assertEqual("", self.tixi.parent(XmlPath.parse("/root")))
+        self.assertEqual('node_4', self.tixi.elementName(path))
+        self.assertEqual('node_4[2]', self.tixi.uniqueElementName(path))
+        self.assertEqual(2, self.tixi.elementNumber(path))
+
+        self.assertEqual(2, self.tixi.elementRow(path))
+        self.assertEqual({"attr": "good"}, self.tixi.getAttributes(path))
+        self.assertEqual(["/*[1]/*[2]/*[1]/*[1]/*[2]"], self.tixi.getUnknownNSelementPaths([path]))
+        # A single path given where an XPath expression or a list of paths is taken
+        self.assertEqual({"attr": ["good"]}, self.tixi.getAttributesBulk(path))
+        self.assertEqual([str(path)], self.tixi.findInheritedAttributes(path, "attr"))
+        created = self.tixi.createElement(path.parent, "node_9")
+        self.assertTrue(self.tixi.checkElement(created))
+        self.tixi.removeElement(XmlPath.parse(created))
+        self.assertFalse(self.tixi.checkElement(created))
+        self.tixi.removeElements(path)
+        self.assertEqual(2, self.tixi.xPathEvaluateNodeNumber(str(path.parent) + "/node_4"))
+
     def test_elementRow(self):
         self.assertEqual(1, self.tixi.elementRow('/root/child_1'))
         self.assertEqual(2, self.tixi.elementRow('/root/child_2[1]'))
         self.assertEqual(3, self.tixi.elementRow('/root/child_2[1]/child_2[1]/node_3[1]/node_5'))
         self.assertEqual(3, self.tixi.elementRow('/root/child_2[2]'))
+        # Comments are not counted, non-canonical paths are accepted
+        self.assertEqual(3, self.tixi.elementRow('/root/child_2[2]/node_3[1]/node_5'))
+
+        with self.assertRaises(TixiException) as cm:
+            self.tixi.elementRow('/root/child_3')
+        self.assertEqual(ReturnCode.ELEMENT_NOT_FOUND, cm.exception.code)
+        with self.assertRaises(TixiException) as cm:
+            self.tixi.elementRow('/root/child_2')
+        self.assertEqual(ReturnCode.ELEMENT_PATH_NOT_UNIQUE, cm.exception.code)
+
+        self.assertEqual(1, self.tixi.elementRow('/root'))
+
+    def test_elementRows(self):
+        paths = self.tixi.xPathExpressionGetAllXPaths("/root/child_2[1]/child_2[1]/node_3[1]/*")
+        self.assertEqual([1, 2, 3, 4], self.tixi.elementRows(paths))
+        self.assertEqual([], self.tixi.elementRows([]))
+
+        # The rows follow the changes of the document
+        self.tixi.createElementAtIndex("/root/child_2[1]/child_2[1]/node_3[1]", "node_5", 1)
+        self.assertEqual(4, self.tixi.elementRow("/root/child_2[1]/child_2[1]/node_3[1]/node_5[2]"))
+        self.assertEqual([2, 3, 5], self.tixi.elementRows(paths[:2] + paths[3:]))
+
+        # Namespaced siblings
+        uri = "http://www.testtixi.uri"
+        self.tixi.createElementNS("/root/child_1", "new", uri)
+        self.assertEqual(2, self.tixi.elementRow(self.tixi.xPathExpressionGetLastXPath("/root/child_1/*")))
+        self.assertEqual(1, self.tixi.elementRow("/root/child_1/child"))
 
     def test_findInheritedAttribute(self):
         self.assertEqual("/root/child_2[1]/child_2[1]/node_3[1]/node_4[2]",
@@ -276,6 +562,25 @@ class TestExpandedTixi(unittest.TestCase):
                          self.tixi.getInheritedTextAttribute("/root/child_2[1]/child_2[1]/node_3[1]/node_4[1]", "attr"))
         self.assertIsNone(self.tixi.getInheritedTextAttribute("/root/child_1/child", "attr"))
 
+    def test_findInheritedAttributes(self):
+        paths = ["/root/child_2[1]/child_2[1]/node_3[1]/node_4[2]",
+                 "/root/child_2[1]/node_3/node_4",
+                 "/root/child_2[1]/child_2[1]/node_3[1]/node_4[1]",
+                 "/root/child_1/child"]
+        expected = [self.tixi.findInheritedAttribute(path, "attr") for path in paths]
+        self.assertEqual(expected, self.tixi.findInheritedAttributes(paths, "attr"))
+        self.assertEqual(["good", "foo", "9", None], self.tixi.getInheritedTextAttributes(paths, "attr"))
+
+        xpath = "//child_2/child_2[1]/*"
+        self.assertEqual(["/root/child_2[1]", "/root/child_2[1]/child_2[1]/node_3[2]"],
+                         self.tixi.findInheritedAttributes(xpath, "name"))
+        self.assertEqual(["bar", "none"], self.tixi.getInheritedTextAttributes(xpath, "name"))
+
+        # Changes of the attributes are followed
+        self.tixi.addTextAttribute("/root/child_2[1]/node_3", "attr", "new")
+        self.assertEqual("new", self.tixi.getInheritedTextAttribute(paths[1], "attr"))
+        self.assertEqual(["good", "new", "9", None], self.tixi.getInheritedTextAttributes(paths, "attr"))
+
     def test_clearComments(self):
         paths = ["/root/child_2[1]/child_2[1]/node_3[1]",
                             "/root/child_2[2]","/root/child_2[2]/node_3"
@@ -288,6 +593,143 @@ class TestExpandedTixi(unittest.TestCase):
             self.assertNotEqual("#comment", self.tixi.getChildNodeName(path, i))
         self.assertEqual([], self.tixi.xPathExpressionGetAllXPaths("//comment()"))
 
+    def test_clearWhitespace(self):
+        tixi = Tixi()
+        tixi.openString(TEST_XML)
+        self.assertEqual("#text", tixi.getChildNodeName("/root", 1))
+        tixi.clearWhitespace()
+        self.assertEqual([], tixi.xPathExpressionGetAllXPaths("//text()[normalize-space()='']"))
+
+        expected = {"/root": ["child_1", "child_2", "child_2"],
+                    "/root/child_2[1]/child_2[1]/node_3[1]": ["node_4", "#comment", "node_4", "node_5", "node_4"],
+                    "/root/child_2[2]/node_3": ["node_4", "node_4", "#comment", "node_5"]}
+        for path, childNames in expected.items():
+            self.assertEqual(childNames,
+                             [tixi.getChildNodeName(path, i + 1) for i in range(tixi.getNumberOfChilds(path))])
+        self.assertEqual("Text", tixi.getTextElement("/root/child_2[1]/child_2[1]/node_3[1]/node_4[3]").strip())
+
+    def test_removeElements(self):
+        self.tixi.removeElements("//node_3/node_4")
+        self.assertEqual([], self.tixi.xPathExpressionGetAllXPaths("//node_4"))
+        self.assertEqual(2, self.tixi.xPathEvaluateNodeNumber("//node_5"))
+
+        paths = ["/root/child_2[1]/child_2[1]/node_3[1]/comment()",
+                 "/root/child_2[2]/comment()",
+                 "/root/child_2[1]/child_2[2]",
+                 "/root/child_2[1]/child_2[1]",
+                 "/root/child_2[1]/child_2[1]/node_3[2]"]
+        self.tixi.removeElements(paths)
+        self.assertEqual(["/root/child_2[1]/node_3", "/root/child_2[2]/node_3"],
+                         self.tixi.xPathExpressionGetAllXPaths("//child_2/*"))
+        self.assertEqual(["/root/child_2[2]/node_3/comment()"],
+                         self.tixi.xPathExpressionGetAllXPaths("//comment()"))
+
+        # Paths in other forms are resolved by the library
+        self.tixi.removeElements(["//node_3[node_5]/comment()", "/root/child_2[position() = 1]/node_3"])
+        self.assertEqual(["/root/child_1", "/root/child_2[1]", "/root/child_2[2]", "/root/child_2[2]/node_3",
+                          "/root/child_2[2]/node_3/node_5"],
+                         self.tixi.xPathExpressionGetAllXPaths("/root//*[not(self::child)]"))
+
+    def test_trackChanges(self):
+        with self.assertRaises(RuntimeError):
+            self.tixi.changedPaths()
+        self.tixi.trackChanges()
+        node_3 = "/root/child_2[1]/child_2[1]/node_3[1]"
+        hash_3 = self.tixi.subtreeHash(node_3)
+        hash_2 = self.tixi.subtreeHash("/root/child_2[2]")
+
+        self.tixi.addTextAttribute(node_3 + "/node_5", "x", "1")
+        self.tixi.createElement(node_3 + "/node_4[1]", "new")
+        self.tixi.removeElement("/root/child_1/child")
+        self.assertEqual(["/root/child_1", node_3 + "/node_4[1]", node_3 + "/node_5"], self.tixi.changedPaths())
+        self.assertNotEqual(hash_3, self.tixi.subtreeHash(node_3))
+        self.assertEqual(hash_2, self.tixi.subtreeHash("/root/child_2[2]"))
+
+        changes = self.tixi.exportChanges()
+        self.assertEqual(("/root/child_1", "<child_1></child_1>"), changes[0])
+        self.assertEqual((node_3 + "/node_4[1]", "<node_4><new></new></node_4>"), changes[1])
+        self.assertTrue(changes[2][1].startswith('<node_5 x="1">'))
+        self.assertEqual("Text O", changes[2][1][len('<node_5 x="1">'):-len("</node_5>")].strip())
+        self.assertEqual([], self.tixi.changedPaths())
+
+        # A change of an ancestor covers the changes below it
+        self.tixi.updateTextElement(node_3 + "/node_5", "1")
+        self.tixi.createElement("/root/child_2[1]", "child_2")
+        self.assertEqual(["/root/child_2[1]"], self.tixi.changedPaths())
+        self.tixi.openString(TEST_XML)
+        self.assertEqual(["/"], self.tixi.changedPaths())
+
+        self.tixi.trackChanges(False)
+        with self.assertRaises(RuntimeError):
+            self.tixi.changedPaths()
+
+    def test_extractSubtree(self):
+        # The comment would be lost
+        with self.assertRaises(ValueError):
+            self.tixi.extractSubtree("/root/child_2[1]/child_2[1]/node_3[1]")
+        self.tixi.clearComments()
+        node_3 = self.tixi.extractSubtree("/root/child_2[1]/child_2[1]/node_3[1]",
+                                          inheritedAttributes=["attr", "name", "missing"])
+        self.assertEqual({"attr": "9", "name": "bar"}, node_3.getAttributes("/node_3"))
+        self.assertEqual(["/node_3/node_4[1]", "/node_3/node_4[2]", "/node_3/node_5", "/node_3/node_4[3]"],
+                         node_3.xPathExpressionGetAllXPaths("/node_3/*"))
+        self.assertEqual({"attr": "good"}, node_3.getAttributes("/node_3/node_4[2]"))
+        self.assertEqual("Text O", node_3.getTextElement("/node_3/node_5").strip())
+        self.assertEqual(0, node_3.xPathEvaluateNodeNumber("//comment()"))
+        self.assertEqual(4, self.tixi.xPathEvaluateNodeNumber("//node_3"))
+
+        uri = "http://www.test_uri1"
+        self.tixi.registerNamespace(uri, "u_test1")
+        self.tixi.setElementNamespace("/root/child_2[1]", uri, None)
+        child_2 = self.tixi.extractSubtree("/root/u_test1:child_2/child_2[1]", namespaces=True)
+        self.assertEqual(("/child_2", uri), child_2.getURI("/child_2"))
+        self.assertEqual(("/child_2", uri), child_2.getURI("/child_2/node_3[1]/node_4[2]"))
+        plain = self.tixi.extractSubtree("/root/child_2", namespaces=True)
+        self.assertEqual((None, None), plain.getURI("/child_2/node_3"))
+
+        # The indentation is left out
+        tixi = Tixi()
+        tixi.openString(TEST_XML)
+        tixi.clearComments()
+        node_3 = tixi.extractSubtree("/root/child_2[1]/child_2[1]/node_3[1]")
+        self.assertEqual(0, node_3.xPathEvaluateNodeNumber("/node_3/text()"))
+        self.assertEqual("Text O", node_3.getTextElement("/node_3/node_5").strip())
+
+        # The prefixes would be lost
+        tixi.openString('<root xmlns:p="http://www.test_uri1"><p:a/><b p:c="1"/></root>')
+        for path in ["/root", "/root/*[1]", "/root/b"]:
+            with self.assertRaises(ValueError):
+                tixi.extractSubtree(path)
+
+    def test_graftSubtree(self):
+        other = Tixi()
+        other.openString(TEST_XML)
+        other.clearWhitespace()
+        with self.assertRaises(ValueError):
+            self.tixi.graftSubtree("/root/child_1", other, "/root/child_2[1]/child_2[1]/node_3[1]")
+        other.clearComments()
+        path = self.tixi.graftSubtree("/root/child_1", other, "/root/child_2[1]/child_2[1]/node_3[1]")
+        self.assertEqual("/root/child_1/node_3", path)
+        self.assertEqual(["/root/child_1/node_3/node_4[1]", "/root/child_1/node_3/node_4[2]",
+                          "/root/child_1/node_3/node_5", "/root/child_1/node_3/node_4[3]"],
+                         self.tixi.xPathExpressionGetAllXPaths(path + "/*"))
+        self.assertEqual("good", self.tixi.getTextAttribute(path + "/node_4[2]", "attr"))
+        self.assertEqual("Text O", self.tixi.getTextElement(path + "/node_5").strip())
+
+        # From the document itself
+        path = self.tixi.graftSubtree("/root/child_2[2]", self.tixi, "/root/child_1/child")
+        self.assertEqual("/root/child_2[2]/child", path)
+
+        uri = "http://www.test_uri1"
+        other.registerNamespace(uri, "u_test1")
+        other.setElementNamespace("/root/child_2[2]", uri, None)
+        self.tixi.registerNamespace(uri, "u_test1")
+        self.tixi.graftSubtree("/root/child_1", other, "/root/u_test1:child_2", namespaces=True)
+        self.assertEqual(("/root/child_1/child_2", uri), self.tixi.getURI("/root/child_1/child_2"))
+        self.assertEqual(4, self.tixi.xPathEvaluateNodeNumber("/root/child_1/u_test1:child_2//*"))
+        with self.assertRaises(TixiException):
+            self.tixi.graftSubtree("/root/child_1", other, "//node_4")
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+"""
+Created on 17.10.2026 23:30
+
+@author: Piotr Gradkowski <grotsztaksel@o2.pl>
+"""
+
+__authors__ = ['Piotr Gradkowski <grotsztaksel@o2.pl>']
+__date__ = '2026-10-17'
+
+import sys
+import unittest
+
+sys.path.append("..")
+
+try:
+    # If Tixi path is specified in PYTHONPATH
+    from tixi3wrapper import Tixi3
+except ImportError:
+    # This usually works in Anaconda environment
+    from tixi3.tixi3wrapper import Tixi3
+
+import test_expanded_tixi
+from xtixi import Tixi
+
+EXPRESSIONS = ["//node_4", "//node_3/node_4", "//child_2/*", "//*", "//comment()", "//text()", "//node_3/text()",
+               "//*/comment()", "//node_9", "//child_2/node_9"]
+
+
+class TestNameIndex(unittest.TestCase):
+    def setUp(self):
+        self.tixi = Tixi()
+        self.tixi.openString(test_expanded_tixi.TEST_XML)
+        self.tixi.clearWhitespace()
+        self.tixi.enableNameIndex()
+
+    def checkExpressions(self):
+        for xPathExpr in EXPRESSIONS:
+            n = self.tixi._xPathEvaluateNodeNumber(xPathExpr)
+            expected = [Tixi3.xPathExpressionGetXPath(self.tixi, xPathExpr, i + 1) for i in range(n)]
+            self.assertEqual(expected, self.tixi.xPathExpressionGetAllXPaths(xPathExpr), xPathExpr)
+            self.assertEqual(n, self.tixi.xPathEvaluateNodeNumber(xPathExpr), xPathExpr)
+
+    def test_nameIndex(self):
+        self.checkExpressions()
+        nameIndex = self.tixi._nameIndex
+        self.assertIsNotNone(nameIndex)
+
+        # Kept up to date by the changes
+        self.tixi.createElement("/root/child_2[2]", "node_9")
+        self.tixi.createElementAtIndex("/root/child_2[1]/child_2[1]/node_3[1]", "node_4", 1)
+        self.tixi.addTextElement("/root/child_1", "node_9", "text")
+        self.tixi.addTextElementAtIndex("//node_3[@name]", "node_4", "text", 1)
+        self.tixi.updateTextElement("/root/child_2[2]/node_3/node_5", "text")
+        self.tixi.addTextAttribute("/root/child_1", "attr", "x")
+        self.tixi.removeElement("/root/child_2[1]/node_3/node_4")
+        self.tixi.removeElement("/root/child_2[1]/child_2[1]/node_3[1]/comment()")
+        self.assertIs(nameIndex, self.tixi._nameIndex)
+        self.checkExpressions()
+
+        self.tixi.clearComments()
+        self.assertIs(nameIndex, self.tixi._nameIndex)
+        self.checkExpressions()
+
+        # Other changes make the index be built anew
+        self.tixi.renameElement("/root/child_2[2]", "node_3", "node_4")
+        self.assertIsNone(self.tixi._nameIndex)
+        self.checkExpressions()
+
+        self.tixi.disableNameIndex()
+        self.assertEqual(["/root/child_1/node_9"], self.tixi.xPathExpressionGetAllXPaths("//child_1/node_9"))
+        self.assertIsNone(self.tixi._nameIndex)
+
+    def test_manyChildren(self):
+        self.checkExpressions()
+        nameIndex = self.tixi._nameIndex
+        # The layout of the parent is updated in place, the steps of the siblings renumbered
+        for i in range(20):
+            self.tixi.createElement("/root/child_1", "node_9", returnPath=False)
+        self.tixi.createElementAtIndex("/root/child_1", "node_9", 3)
+        self.tixi.createElementAtIndex("/root/child_1", "node_4", 1)
+        self.tixi.addTextElement("/root/child_1", "node_4", "")
+        self.tixi.removeElement("/root/child_1/node_9[5]")
+        self.tixi.removeElement("/root/child_1/node_4[1]")
+        self.assertIs(nameIndex, self.tixi._nameIndex)
+        self.checkExpressions()
+
+    def test_indentedDocument(self):
+        # The indentation is made of text nodes - the export tells them exactly
+        self.tixi.openString(test_expanded_tixi.TEST_XML)
+        self.checkExpressions()
+        self.tixi.clearWhitespace()
+        self.checkExpressions()
+
+
+if __name__ == '__main__':
+    unittest.main()
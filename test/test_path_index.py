@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+"""
+Created on 17.10.2026 23:00
+
+@author: Piotr Gradkowski <grotsztaksel@o2.pl>
+"""
+
+__authors__ = ['Piotr Gradkowski <grotsztaksel@o2.pl>']
+__date__ = '2026-10-17'
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.append("..")
+
+try:
+    # If Tixi path is specified in PYTHONPATH
+    from tixi3wrapper import ReturnCode
+    from tixi3wrapper import Tixi3Exception as TixiException
+except ImportError:
+    # This usually works in Anaconda environment
+    from tixi3.tixi3wrapper import ReturnCode
+    from tixi3.tixi3wrapper import Tixi3Exception as TixiException
+
+import test_expanded_tixi
+from xtixi import Tixi
+from xtixi.path_index import PathIndex, SIDECAR_SUFFIX, fileDigest
+
+NS_XML = """<?xml version="1.0"?>
+<root xmlns:p="urn:p"><a/><!-- c --><a x="1"><b/></a><p:a/><d xmlns="urn:d"><e/><e/><f/></d><p:q><q/></p:q></root>"""
+
+
+class TestPathIndex(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.fileName = os.path.join(self.directory, "test.xml")
+        with open(self.fileName, "w") as file:
+            file.write(test_expanded_tixi.TEST_XML)
+        self.tixi = Tixi()
+        self.plain = Tixi()
+
+    def tearDown(self):
+        self.tixi.close()
+        self.plain.close()
+        shutil.rmtree(self.directory)
+
+    def test_openFile(self):
+        self.tixi.openFile(self.fileName, index=True)
+        self.plain.openFile(self.fileName)
+        self.assertTrue(os.path.isfile(self.fileName + SIDECAR_SUFFIX))
+
+        for tixi in (self.tixi, self.plain):
+            self.assertEqual(6, tixi.xPathEvaluateNodeNumber("//node_4"))
+        self.assertEqual(self.plain.xPathExpressionGetAllXPaths("//node_4"),
+                         self.tixi.xPathExpressionGetAllXPaths("//node_4"))
+        self.assertEqual([], self.tixi.xPathExpressionGetAllXPaths("//node_9"))
+        paths = self.plain.xPathExpressionGetAllXPaths("//*")
+        self.assertEqual(self.plain.elementRows(paths), self.tixi.elementRows(paths))
+        self.assertEqual(["/*[1]/*[3]/*[1]/*[2]", "/*[1]/*[2]/*[1]/*[1]/*[4]"],
+                         self.tixi.getUnknownNSelementPaths(["/root/child_2[2]/node_3/node_4[2]",
+                                                             "/root/child_2[1]/child_2[1]/node_3[1]/node_4[3]"]))
+        with self.assertRaises(TixiException) as context:
+            self.tixi.getUnknownNSelementPath("/root/child_2/child_2[1]/node_3[5]")
+        self.assertEqual(ReturnCode.ELEMENT_PATH_NOT_UNIQUE, context.exception.code)
+        with self.assertRaises(TixiException) as context:
+            self.tixi.getUnknownNSelementPath("/root/child_2[1]/child_2[1]/node_3[5]")
+        self.assertEqual(ReturnCode.ELEMENT_NOT_FOUND, context.exception.code)
+
+        # The index is not used once the document has changed
+        self.tixi.createElement("/root/child_1", "node_4")
+        self.assertEqual(7, self.tixi.xPathEvaluateNodeNumber("//node_4"))
+
+        # The next open reads the saved index; a changed file gets a new one
+        modified = os.path.getmtime(self.fileName + SIDECAR_SUFFIX)
+        self.tixi.openFile(self.fileName, stripWhitespace=False, index=True)
+        self.assertEqual(modified, os.path.getmtime(self.fileName + SIDECAR_SUFFIX))
+        with open(self.fileName, "w") as file:
+            file.write(NS_XML)
+        self.tixi.openFile(self.fileName, index=True)
+        self.assertEqual(["/root/a[1]", "/root/a[2]"], self.tixi.xPathExpressionGetAllXPaths("//a"))
+
+    def test_namespaces(self):
+        with open(self.fileName, "w") as file:
+            file.write(NS_XML)
+        self.tixi.openFile(self.fileName, index=True)
+        self.plain.openFile(self.fileName)
+
+        for name in ("a", "e", "q", "b"):
+            self.assertEqual(self.plain.xPathExpressionGetAllXPaths("//" + name),
+                             self.tixi.xPathExpressionGetAllXPaths("//" + name))
+        paths = self.plain.xPathExpressionGetAllXPaths("//*")
+        self.assertEqual(self.plain.elementRows(paths), self.tixi.elementRows(paths))
+        self.assertEqual(("/root/d", "urn:d"), self.tixi.getURI("/root/d/e[2]"))
+        self.assertEqual((None, None), self.tixi.getURI("/root/a[2]/b"))
+        self.assertEqual("/*[1]/*[3]", self.tixi.getUnknownNSelementPath("/root/a[3]"))
+
+        digest = fileDigest(self.fileName)
+        pathIndex = PathIndex.load(self.fileName, digest)
+        self.assertEqual(["/root/p:q/q"], pathIndex.namedPaths("q"))
+        self.assertEqual(4, pathIndex.row("/root/*[4]"))
+        pathIndex.close()
+        self.assertIsNone(PathIndex.load(self.fileName, bytes(16)))
+
+    def test_redeclaredNamespace(self):
+        with open(self.fileName, "w") as file:
+            file.write('<root><a xmlns="urn:x"><b xmlns="urn:x"><c/></b></a></root>')
+        self.tixi.openFile(self.fileName, index=True)
+        self.plain.openFile(self.fileName)
+        for tixi in (self.tixi, self.plain):
+            self.assertEqual(("/root/a/b", "urn:x"), tixi.getURI("/root/a/b/c"))
+
+    def test_corruptSidecar(self):
+        self.tixi.openFile(self.fileName, index=True)
+        self.tixi.close()
+        sidecar = self.fileName + SIDECAR_SUFFIX
+        size = os.path.getsize(sidecar)
+        digest = fileDigest(self.fileName)
+        for length in (size // 2, size - 9):
+            with open(sidecar, "r+b") as file:
+                file.truncate(length)
+            self.assertIsNone(PathIndex.load(self.fileName, digest))
+            # The index is built and saved anew
+            self.tixi = Tixi()
+            self.tixi.openFile(self.fileName, index=True)
+            self.assertEqual(6, self.tixi.xPathEvaluateNodeNumber("//node_4"))
+            self.assertEqual(size, os.path.getsize(sidecar))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+"""
+Created on 17.10.2026 20:40
+
+@author: Piotr Gradkowski <grotsztaksel@o2.pl>
+"""
+
+__authors__ = ['Piotr Gradkowski <grotsztaksel@o2.pl>']
+__date__ = '2026-10-17'
+
+import sys
+import unittest
+
+sys.path.append("..")
+
+import test_expanded_tixi
+from xtixi import Tixi, TixiPool
+
+
+def childCount(tixi, path):
+    # At module level, to be picklable for the worker processes
+    return tixi.xPathEvaluateNodeNumber(path + "/*")
+
+
+def text(tixi, path):
+    return tixi.getTextElement(path)
+
+
+class TestTixiPool(unittest.TestCase):
+    def setUp(self):
+        self.tixi = Tixi()
+        self.tixi.openString(test_expanded_tixi.TEST_XML)
+        self.tixi.clearWhitespace()
+
+    def checkPool(self, processes):
+        expressions = ["//node_4", "//node_3", "//child_2", "//node_9", "//*[@attr]"]
+        paths = self.tixi.xPathExpressionGetAllXPaths("//*")
+        with TixiPool(self.tixi, size=2, processes=processes) as pool:
+            self.assertEqual([self.tixi.xPathExpressionGetAllXPaths(e) for e in expressions],
+                             pool.xPathExpressionGetAllXPaths(expressions, chunkSize=1))
+            self.assertEqual([6, 4, 4, 0, 3], pool.xPathEvaluateNodeNumbers(expressions))
+            self.assertEqual([self.tixi.getAttributes(path) for path in paths], pool.getAttributes(paths))
+            self.assertEqual([childCount(self.tixi, path) for path in paths], pool.map(childCount, paths))
+            self.assertEqual(["/*[1]/*[3]/*[1]/*[2]"],
+                             pool.getUnknownNSelementPaths(["/root/child_2[2]/node_3/node_4[2]"]))
+
+            # The replicas follow the changes of the document
+            self.tixi.createElement("/root/child_1", "node_4")
+            self.assertEqual([7], pool.xPathEvaluateNodeNumbers(["//node_4"]))
+
+    def test_threads(self):
+        self.checkPool(processes=False)
+
+    def test_processes(self):
+        self.checkPool(processes=True)
+
+    def test_autoRefresh(self):
+        with TixiPool(self.tixi, size=1, autoRefresh=False) as pool:
+            self.tixi.createElement("/root/child_1", "node_4")
+            with self.assertRaises(RuntimeError):
+                pool.xPathEvaluateNodeNumbers(["//node_4"])
+            pool.refresh()
+            self.assertEqual([7], pool.xPathEvaluateNodeNumbers(["//node_4"]))
+
+    def test_mixedContent(self):
+        tixi = Tixi()
+        tixi.openString(test_expanded_tixi.TEST_XML)
+        tixi.clearWhitespace()
+        paths = tixi.xPathExpressionGetAllXPaths("//node_5|//node_4[@name]")
+        with TixiPool(tixi, size=1) as pool:
+            # The whitespace around the text is kept, only the indentation of the export is removed
+            self.assertEqual([text(tixi, path) for path in paths], pool.map(text, paths))
+            self.assertEqual([0], pool.xPathEvaluateNodeNumbers(["//text()[normalize-space()='']"]))
+
+
+if __name__ == '__main__':
+    unittest.main()
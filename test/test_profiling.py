@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+"""
+Created on 17.10.2026 18:10
+
+@author: Piotr Gradkowski <grotsztaksel@o2.pl>
+"""
+
+__authors__ = ['Piotr Gradkowski <grotsztaksel@o2.pl>']
+__date__ = '2026-10-17'
+
+import sys
+import unittest
+
+sys.path.append("..")
+
+import test_expanded_tixi
+from xtixi import Tixi
+from xtixi.profiling import DIRECT, Tixi3, TixiProfiler, profile
+
+
+class TestProfiling(unittest.TestCase):
+    def setUp(self):
+        self.tixi = Tixi()
+        self.tixi.openString(test_expanded_tixi.TEST_XML)
+        self.tixi.clearWhitespace()
+
+    def test_profile(self):
+        getTextElement = Tixi3.getTextElement
+        elementRow = Tixi.elementRow
+        with profile() as profiler:
+            self.assertIsNot(getTextElement, Tixi3.getTextElement)
+            self.assertEqual(3, self.tixi.elementRow("/root/child_2[2]"))
+            self.tixi.getTextElement("/root/child_2[1]/child_2[1]/node_3[1]/node_5")
+            self.assertEqual(6, len(list(self.tixi.xPathExpressionIterXPaths("//node_3/node_4"))))
+        self.assertIs(getTextElement, Tixi3.getTextElement)
+        self.assertIs(elementRow, Tixi.elementRow)
+
+        report = profiler.report()
+        self.assertEqual(1, report["elementRow"]["calls"])
+        self.assertLess(0, sum(call["calls"] for call in report["elementRow"]["tixi3"].values()))
+        self.assertEqual({"getTextElement"}, set(report[DIRECT]["tixi3"]))
+        self.assertEqual(1, report[DIRECT]["tixi3"]["getTextElement"]["calls"])
+        # Nested ExpandedTixi calls are attributed to the outermost one
+        iterated = report["xPathExpressionIterXPaths"]["tixi3"]
+        self.assertEqual(6, iterated["xPathExpressionGetXPath"]["calls"])
+        self.assertEqual(1, iterated["xPathEvaluateNodeNumber"]["calls"])
+        self.assertNotIn("xPathExpressionGetXPath", report)
+
+        table = profiler.table(sortBy="calls").splitlines()
+        self.assertTrue(table[1].startswith("xPathExpressionIterXPaths"))
+
+        # Nothing is collected when not running
+        self.tixi.elementRow("/root/child_2[2]")
+        self.assertEqual(report, profiler.report())
+        profiler.reset()
+        self.assertEqual({}, profiler.report())
+
+    def test_single_profiler(self):
+        with TixiProfiler():
+            with self.assertRaises(RuntimeError):
+                TixiProfiler().start()
+
+
+if __name__ == '__main__':
+    unittest.main()
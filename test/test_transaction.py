@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+"""
+Created on 17.10.2026 19:30
+
+@author: Piotr Gradkowski <grotsztaksel@o2.pl>
+"""
+
+__authors__ = ['Piotr Gradkowski <grotsztaksel@o2.pl>']
+__date__ = '2026-10-17'
+
+import sys
+import unittest
+from unittest import mock
+
+sys.path.append("..")
+
+try:
+    # If Tixi path is specified in PYTHONPATH
+    from tixi3wrapper import Tixi3
+except ImportError:
+    # This usually works in Anaconda environment
+    from tixi3.tixi3wrapper import Tixi3
+
+import test_expanded_tixi
+from xtixi import Tixi, TixiException, ReturnCode
+
+
+class TestBatch(unittest.TestCase):
+    def setUp(self):
+        self.tixi = Tixi()
+        self.tixi.openString(test_expanded_tixi.TEST_XML)
+        self.tixi.clearWhitespace()
+
+    def test_batch(self):
+        # The comments could not be restored, were the batch to fail
+        self.tixi.clearComments()
+        generation = self.tixi.documentGeneration()
+        self.tixi.trackChanges()
+        with self.tixi.batch() as batch:
+            first = batch.createElementAtIndex("/root/child_1", "node_9", 1)
+            batch.addTextElement(first, "value", "1")
+            # Paths refer to the document as it was before the batch
+            batch.addTextAttribute("/root/child_1/child", "attr", "x")
+            last = batch.addTextElement("/root/child_1", "node_9", "t")
+            batch.addTextAttribute(last, "n", 2)
+            batch.removeElement("/root/child_2[2]")
+            with self.assertRaises(RuntimeError):
+                self.tixi.createElement("/root", "node_9")
+            with self.assertRaises(RuntimeError):
+                first.path
+            self.assertEqual(generation, self.tixi.documentGeneration())
+
+        self.assertLess(generation, self.tixi.documentGeneration())
+        self.assertEqual("/root/child_1/node_9[1]", first.path)
+        self.assertEqual("/root/child_1/node_9[2]", last.path)
+        self.assertEqual(3, self.tixi.elementRow(last.path))
+        self.assertEqual("1", self.tixi.getTextElement(first.path + "/value"))
+        self.assertEqual("2", self.tixi.getTextAttribute(last.path, "n"))
+        self.assertEqual("x", self.tixi.getTextAttribute("/root/child_1/child", "attr"))
+        self.assertEqual(1, self.tixi.xPathEvaluateNodeNumber("/root/child_2"))
+        self.assertEqual(["/root"], self.tixi.changedPaths())
+
+        # The paths were resolved when the batch was applied
+        self.tixi.createElementAtIndex("/root/child_1", "node_9", 1)
+        self.assertEqual("/root/child_1/node_9[1]", first.path)
+
+        with self.assertRaises(RuntimeError):
+            batch.createElement("/root", "node_9")
+
+    def test_batch_removals(self):
+        node_3 = "/root/child_2[1]/child_2[1]/node_3[1]"
+        with self.tixi.batch() as batch:
+            batch.removeElement(node_3 + "/node_4[1]")
+            # The index counts the child elements without the removed one
+            new = batch.createElementAtIndex(node_3, "new", 1)
+            removed = batch.createElement(node_3, "new")
+            batch.removeElement(removed)
+            batch.removeElement(node_3 + "/node_5")
+        self.assertEqual(node_3 + "/new", new.path)
+        self.assertIsNone(removed.path)
+        n = self.tixi.getNumberOfChilds(node_3)
+        self.assertEqual(["#comment", "new", "node_4", "node_4"],
+                         [self.tixi.getChildNodeName(node_3, i + 1) for i in range(n)])
+        self.assertEqual("good", self.tixi.getTextAttribute(node_3 + "/*[2]", "attr"))
+
+    def test_batch_failure(self):
+        xml = self.tixi.exportDocumentAsString()
+        with self.assertRaises(TixiException) as e:
+            with self.tixi.batch() as batch:
+                batch.createElement("/root/child_1", "node_9")
+                batch.addTextAttribute("/root/child_2[1]", "attr", "changed")
+                batch.addTextAttribute("/root/child_1", "attr", "new")
+                batch.removeElement("/root/child_1/child")
+                batch.createElement("/root/child_1/child", "node_9")
+        self.assertEqual(ReturnCode.ELEMENT_NOT_FOUND, e.exception.code)
+        self.assertEqual(xml, self.tixi.exportDocumentAsString())
+
+        with self.assertRaises(TixiException) as e:
+            with self.tixi.batch() as batch:
+                batch.createElement("/root/child_2", "node_9")
+        self.assertEqual(ReturnCode.ELEMENT_PATH_NOT_UNIQUE, e.exception.code)
+        self.assertEqual(xml, self.tixi.exportDocumentAsString())
+
+        # What could not be restored exactly is not removed at all
+        with self.assertRaises(ValueError):
+            with self.tixi.batch() as batch:
+                batch.createElement("/root/child_1", "node_9")
+                batch.removeElement("/root/child_2[2]")
+        self.assertEqual(xml, self.tixi.exportDocumentAsString())
+
+        # Nothing is applied, if the with-block fails
+        with self.assertRaises(ValueError):
+            with self.tixi.batch() as batch:
+                batch.createElement("/root/child_1", "node_9")
+                raise ValueError()
+        self.assertEqual(xml, self.tixi.exportDocumentAsString())
+        self.tixi.createElement("/root/child_1", "node_9")
+
+    def test_batch_failedRemoval(self):
+        xml = self.tixi.exportDocumentAsString()
+        removeElement = Tixi3.removeElement
+        calls = list()
+
+        def failingSecondRemoval(tixi, path):
+            calls.append(path)
+            if len(calls) == 2:
+                raise TixiException(ReturnCode.FAILED, path)
+            removeElement(tixi, path)
+
+        # The removals already made are undone as well
+        with mock.patch.object(Tixi3, "removeElement", failingSecondRemoval):
+            with self.assertRaises(TixiException):
+                with self.tixi.batch() as batch:
+                    batch.createElement("/root/child_1", "node_9")
+                    batch.addTextAttribute("/root/child_2[1]/node_3/node_4", "attr", "x")
+                    batch.removeElement("/root/child_1/child")
+                    batch.removeElement("/root/child_2[1]/node_3")
+        self.assertEqual(xml, self.tixi.exportDocumentAsString())
+
+
+if __name__ == '__main__':
+    unittest.main()
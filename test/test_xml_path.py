@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+"""
+Created on 17.10.2026 15:05
+
+@author: Piotr Gradkowski <grotsztaksel@o2.pl>
+"""
+
+__authors__ = ['Piotr Gradkowski <grotsztaksel@o2.pl>']
+__date__ = '2026-10-17'
+
+import pickle
+import sys
+import unittest
+
+sys.path.append("..")
+
+from xtixi.xml_path import XmlPath
+
+
+class TestXmlPath(unittest.TestCase):
+    def test_parse(self):
+        path = XmlPath.parse("/root/child_2[1]/p:node_3/*[4]")
+        self.assertEqual(((("root", None), ("child_2", 1), ("p:node_3", None), ("*", 4))), path.steps)
+        self.assertEqual("/root/child_2[1]/p:node_3/*[4]", str(path))
+        self.assertIs(path, XmlPath.parse("/root/child_2[1]/p:node_3/*[4]"))
+        self.assertIs(path, XmlPath.parse(path))
+        self.assertEqual((), XmlPath.parse("/").steps)
+        self.assertEqual("/", str(XmlPath.parse("/")))
+        for invalid in ["root/child_1", "/root//child_1", "/root/", ""]:
+            with self.assertRaises(ValueError):
+                XmlPath.parse(invalid)
+
+    def test_components(self):
+        path = XmlPath.parse("/root/child_2[3]")
+        self.assertEqual("/root", path.parent)
+        self.assertEqual("child_2", path.name)
+        self.assertEqual(3, path.index)
+        self.assertEqual(3, path.number)
+        self.assertEqual("child_2[3]", path.uniqueName)
+        self.assertIsNone(path.parent.index)
+        self.assertEqual(1, path.parent.number)
+
+        self.assertEqual("/root/child_2[3]/node_1[2]", path.child("node_1", 2))
+        self.assertEqual("/root/child_2[3]/node_1", path.child("node_1"))
+        self.assertEqual("/root/child_2", path.withIndex(None))
+        self.assertEqual("/root/child_2[1]", path[:2].withIndex(1))
+        self.assertEqual(("root", None), path[0])
+        self.assertEqual(2, len(path))
+        self.assertFalse(XmlPath())
+
+    def test_value_semantics(self):
+        path = XmlPath.parse("/root/child_1")
+        self.assertEqual(path, XmlPath([("root", None), ("child_1", None)]))
+        self.assertNotEqual(path, XmlPath.parse("/root/child_1[1]"))
+        self.assertEqual({"/root/child_1": 1}[path], 1)
+        with self.assertRaises(AttributeError):
+            path.steps = ()
+        self.assertEqual(path, pickle.loads(pickle.dumps(path)))
+
+
+if __name__ == '__main__':
+    unittest.main()
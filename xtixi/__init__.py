@@ -7,7 +7,7 @@ Created on Sat Nov 14 17:57:28 2020
 
 __authors__ = ['Piotr Gradkowski <grotsztaksel@o2.pl>']
 __date__ = '2020-11-14'
-__all__ = ['Tixi', 'TixiException', 'ReturnCode']
+__all__ = ['Tixi', 'TixiException', 'ReturnCode', 'XmlPath', 'TixiProfiler', 'TixiPool', 'Element', 'runBatch']
 
 try:
     # If Tixi path is specified in PYTHONPATH
@@ -19,3 +19,8 @@ except ImportError:
     from tixi3.tixi3wrapper import Tixi3Exception as TixiException
 
 from .expanded_tixi import ExpandedTixi as Tixi
+from .xml_path import XmlPath
+from .profiling import TixiProfiler
+from .pool import TixiPool
+from .element import Element
+from .batch import runBatch
@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+"""
+Created on 17.10.2026 23:50
+
+@author: Piotr Gradkowski <grotsztaksel@o2.pl>
+
+Run a function over a batch of XML documents in worker processes, printing the results as JSON lines
+and the throughput at the end:
+
+    python -m xtixi documents/ mymodule:extract --processes 8 --timeout 30 --output results.jsonl
+
+The function is called with the ExpandedTixi of each opened document; mymodule must be importable.
+"""
+
+__authors__ = ['Piotr Gradkowski <grotsztaksel@o2.pl>']
+__date__ = '2026-10-17'
+__all__ = ["main"]
+
+import argparse
+import importlib
+import json
+import sys
+
+from .batch import runBatch
+
+
+def _resolveFunction(spec):
+    """Return the function named "module:function" (or "module.function")"""
+    moduleName, separator, functionName = spec.partition(":")
+    if not separator:
+        moduleName, _, functionName = spec.rpartition(".")
+    if not moduleName or not functionName:
+        raise ValueError("Expected module:function, got {}".format(spec))
+    function = importlib.import_module(moduleName)
+    for name in functionName.split("."):
+        function = getattr(function, name)
+    return function
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m xtixi",
+                                     description="Run a function over a batch of XML documents")
+    parser.add_argument("source", nargs="+", help="files, directories (their *.xml files) or glob patterns")
+    parser.add_argument("function", help="module:function called with the ExpandedTixi of each document")
+    parser.add_argument("--processes", type=int, default=None,
+                        help="number of worker processes, the number of CPUs by default")
+    parser.add_argument("--unordered", action="store_true", help="print the results as they are completed")
+    parser.add_argument("--chunk-size", type=int, default=1, help="files sent to a worker process at once")
+    parser.add_argument("--timeout", type=float, default=None, help="seconds allowed for a file")
+    parser.add_argument("--keep-whitespace", action="store_true",
+                        help="do not remove the whitespace-only text nodes")
+    parser.add_argument("--output", default=None, help="file for the JSON lines, the standard output by default")
+    args = parser.parse_args(argv)
+
+    # The workers import the module of the function by name
+    sys.path.insert(0, "")
+    function = _resolveFunction(args.function)
+    output = sys.stdout if args.output is None else open(args.output, "w")
+    try:
+        with runBatch(args.source, function, args.processes, not args.unordered, args.chunk_size, args.timeout,
+                      not args.keep_whitespace) as run:
+            for result in run:
+                line = {"fileName": result.fileName, "seconds": round(result.seconds, 6)}
+                if result.error is None:
+                    line["result"] = result.result
+                else:
+                    line["error"] = result.error
+                output.write(json.dumps(line, default=repr) + "\n")
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    report = run.report()
+    print(report, file=sys.stderr)
+    return 1 if report.failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,199 @@
+# -*- coding: utf-8 -*-
+"""
+Created on 17.10.2026 23:40
+
+@author: Piotr Gradkowski <grotsztaksel@o2.pl>
+"""
+
+__authors__ = ['Piotr Gradkowski <grotsztaksel@o2.pl>']
+__date__ = '2026-10-17'
+__all__ = ["runBatch", "batchFiles", "BatchRun", "BatchResult", "BatchReport"]
+
+import collections
+import contextlib
+import functools
+import glob
+import multiprocessing
+import os
+import signal
+import time
+import traceback
+import typing
+
+from .expanded_tixi import ExpandedTixi
+
+BatchResult = collections.namedtuple("BatchResult", ["fileName", "result", "error", "timedOut", "bytes", "seconds"])
+BatchResult.__doc__ = """Outcome of a file of a batch: the value returned by the function, or the formatted
+    traceback of the error raised by opening the file or by the function (result is then None), whether the file
+    timed out, the size of the file and the time taken
+    """
+
+
+class BatchReport(collections.namedtuple("BatchReport", ["files", "failed", "timedOut", "bytes", "seconds"])):
+    """Throughput of a batch: the numbers of the files processed, failed and timed out (which are counted
+    as failed as well), the bytes of the files processed and the wall time
+    """
+    __slots__ = ()
+
+    @property
+    def filesPerSecond(self) -> float:
+        return self.files / self.seconds if self.seconds else 0.0
+
+    @property
+    def bytesPerSecond(self) -> float:
+        return self.bytes / self.seconds if self.seconds else 0.0
+
+    def __str__(self):
+        return "{} files ({} failed, {} timed out), {:.1f} MB in {:.2f} s: {:.1f} files/s, {:.2f} MB/s".format(
+            self.files, self.failed, self.timedOut, self.bytes / 1e6, self.seconds, self.filesPerSecond,
+            self.bytesPerSecond / 1e6)
+
+
+class _Timeout(BaseException):
+    """Not an Exception, so that the function cannot catch it by accident"""
+
+
+def _raiseTimeout(signum, frame):
+    raise _Timeout()
+
+
+@contextlib.contextmanager
+def _timeLimit(seconds):
+    """Raise _Timeout in the scope, once it has taken longer than seconds. A native call is only interrupted
+    when it returns to Python
+    """
+    if not seconds:
+        yield
+        return
+    previous = signal.signal(signal.SIGALRM, _raiseTimeout)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+def _processFile(function, stripWhitespace, timeout, fileName) -> BatchResult:
+    """Open the file in a Tixi of this process and call the function with it"""
+    start = time.perf_counter()
+    result = error = None
+    timedOut = False
+    size = 0
+    tixi = ExpandedTixi()
+    try:
+        with _timeLimit(timeout):
+            size = os.path.getsize(fileName)
+            tixi.openFile(fileName, stripWhitespace)
+            result = function(tixi)
+    except _Timeout:
+        timedOut = True
+        error = "Timed out after {} s\n".format(timeout)
+    except Exception:
+        error = traceback.format_exc()
+    finally:
+        with contextlib.suppress(Exception):
+            tixi.close()
+    return BatchResult(fileName, result, error, timedOut, size, time.perf_counter() - start)
+
+
+def batchFiles(source) -> typing.List[str]:
+    """
+    Return the sorted names of the files of the source
+    :param source: a file, a directory (its *.xml files, recursively), a glob pattern, or a list of these
+    """
+    if not isinstance(source, (str, os.PathLike)):
+        return sorted(set(fileName for item in source for fileName in batchFiles(item)))
+    source = os.fspath(source)
+    if os.path.isdir(source):
+        pattern = os.path.join(glob.escape(source), "**", "*.xml")
+    elif os.path.isfile(source):
+        return [source]
+    else:
+        pattern = source
+    return sorted(fileName for fileName in glob.glob(pattern, recursive=True) if os.path.isfile(fileName))
+
+
+class BatchRun(object):
+    """The results of a batch, streamed as the worker processes deliver them. Use it as a context manager
+    (or close it), to stop the workers when not all results are consumed
+    """
+
+    def __init__(self, fileNames, function, processes, ordered, chunkSize, timeout, stripWhitespace):
+        self.fileNames = fileNames
+        self._task = functools.partial(_processFile, function, stripWhitespace, timeout)
+        self._processes = processes
+        self._ordered = ordered
+        self._chunkSize = chunkSize
+        self._pool = None
+        self._start = None
+        self._end = None
+        self._counts = collections.Counter()
+
+    def __enter__(self) -> "BatchRun":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool.join()
+            self._pool = None
+
+    def __iter__(self) -> typing.Iterator[BatchResult]:
+        if self._start is not None:
+            raise RuntimeError("The batch has already been run")
+        self._start = time.perf_counter()
+        if self._processes == 0:
+            results = map(self._task, self.fileNames)
+        else:
+            self._pool = multiprocessing.Pool(self._processes)
+            mapping = self._pool.imap if self._ordered else self._pool.imap_unordered
+            results = mapping(self._task, self.fileNames, self._chunkSize)
+        try:
+            for result in results:
+                self._counts["files"] += 1
+                self._counts["failed"] += result.error is not None
+                self._counts["timedOut"] += result.timedOut
+                self._counts["bytes"] += result.bytes
+                yield result
+        finally:
+            self._end = time.perf_counter()
+            self.close()
+
+    def report(self) -> BatchReport:
+        """Return the throughput of the files processed so far"""
+        if self._start is None:
+            return BatchReport(0, 0, 0, 0, 0.0)
+        end = time.perf_counter() if self._end is None else self._end
+        return BatchReport(self._counts["files"], self._counts["failed"], self._counts["timedOut"],
+                           self._counts["bytes"], end - self._start)
+
+
+def runBatch(source, function, processes=None, ordered=True, chunkSize=1, timeout=None,
+             stripWhitespace=True) -> BatchRun:
+    """
+    Open each file of the source in a worker process and call function(tixi) with the ExpandedTixi. The results
+    are streamed back as BatchResults; an error of a file is captured in its result and does not stop the batch.
+
+        with runBatch("documents/", extract, processes=8) as run:
+            for result in run:
+                ...
+        print(run.report())
+
+    :param source: a file, a directory (its *.xml files, recursively), a glob pattern, or a list of these
+    :param function: function called with the opened tixi. Must be picklable - defined at module level
+    :param processes: number of worker processes, the number of CPUs by default. 0 processes the files in this
+                      process, one after another
+    :param ordered: if True, yield the results in the order of the files, otherwise as they are completed
+    :param chunkSize: number of files sent to a worker process at once
+    :param timeout: seconds allowed for a file, None for no limit. Needs SIGALRM (not on Windows)
+    :param stripWhitespace: passed to ExpandedTixi.openFile
+    """
+    if timeout and not hasattr(signal, "SIGALRM"):
+        raise ValueError("Timeouts need SIGALRM, which this platform does not have")
+    if chunkSize < 1:
+        raise ValueError("chunkSize must be positive, got {}".format(chunkSize))
+    return BatchRun(batchFiles(source), function, processes, ordered, chunkSize, timeout, stripWhitespace)
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+"""
+Created on 17.10.2026 10:12
+
+@author: Piotr Gradkowski <grotsztaksel@o2.pl>
+"""
+
+__authors__ = ['Piotr Gradkowski <grotsztaksel@o2.pl>']
+__date__ = '2026-10-17'
+__all__ = ["GenerationCache"]
+
+import collections
+import typing
+
+
+class GenerationCache(object):
+    """A bounded LRU cache whose entries are stamped with the document generation they were computed for.
+    An entry looked up in another generation is treated as a miss and dropped
+    """
+
+    _MISSING = object()
+
+    def __init__(self, maxSize=1024):
+        if maxSize < 1:
+            raise ValueError("Cache size must be positive, got {}".format(maxSize))
+        self.maxSize = maxSize
+        self._entries = collections.OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key, generation, default=None):
+        """Return the value stored for key in the given generation, or default"""
+        entry = self._entries.get(key, self._MISSING)
+        if entry is self._MISSING:
+            self.misses += 1
+            return default
+        if entry[0] != generation:
+            del self._entries[key]
+            self.invalidations += 1
+            self.misses += 1
+            return default
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, key, generation, value):
+        """Store the value computed for key in the given generation, evicting the least recently used entry"""
+        self._entries[key] = (generation, value)
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.maxSize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> typing.Dict[str, int]:
+        """Return the hit/miss/eviction counters and the current fill of the cache"""
+        return {"hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "size": len(self._entries),
+                "maxSize": self.maxSize}
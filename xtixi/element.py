@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+"""
+Created on 17.10.2026 21:30
+
+@author: Piotr Gradkowski <grotsztaksel@o2.pl>
+"""
+
+__authors__ = ['Piotr Gradkowski <grotsztaksel@o2.pl>']
+__date__ = '2026-10-17'
+__all__ = ["Element"]
+
+import typing
+
+from .xml_path import XmlPath
+
+
+class Element(object):
+    """Handle of an element of an ExpandedTixi document. What it tells about the element is loaded on the first
+    access and kept until the document changes. Elements are equal if they have the same path in the same document.
+    The handle is not moved along with the element - after a change, it refers to whatever element is at its path
+    """
+    __slots__ = ("tixi", "path", "_generation", "_name", "_attributes", "_text", "_children", "_row")
+
+    def __init__(self, tixi, path):
+        """
+        :param tixi: ExpandedTixi
+        :param path: XML path of the element, as xmlGetNodePath gives it - see ExpandedTixi.element
+        """
+        self.tixi = tixi
+        self.path = XmlPath.parse(path)
+        self._forget()
+
+    def _forget(self):
+        self._generation = self.tixi.documentGeneration()
+        self._name = None
+        self._attributes = None
+        self._text = None
+        self._children = None
+        self._row = None
+
+    def _check(self):
+        if self._generation != self.tixi.documentGeneration():
+            self._forget()
+
+    def __eq__(self, other):
+        if not isinstance(other, Element):
+            return NotImplemented
+        return self.tixi is other.tixi and self.path == other.path
+
+    def __hash__(self):
+        return hash(self.path)
+
+    def __repr__(self):
+        return "Element({!r})".format(str(self.path))
+
+    #
+    @property
+    def name(self) -> str:
+        """Name of the element, without the namespace prefix"""
+        self._check()
+        if self._name is None:
+            self._name = self.tixi._elementLocalName(str(self.path))
+        return self._name
+
+    @property
+    def attributes(self) -> typing.Dict[str, str]:
+        """Attributes of the element. The dict is shared by the calls until the document changes - do not modify it"""
+        self._check()
+        if self._attributes is None:
+            self._attributes = self.tixi.getAttributes(str(self.path))
+        return self._attributes
+
+    def get(self, attrName, default=None) -> typing.Union[str, None]:
+        """Return the value of the attribute, or default if the element does not have it"""
+        return self.attributes.get(attrName, default)
+
+    @property
+    def text(self) -> typing.Union[str, None]:
+        """Text of the element, None if it has no text"""
+        self._check()
+        if self._text is None:
+            path = str(self.path)
+            childNames = self.tixi._listChildNodeNames(path)
+            hasText = "#text" in childNames or "#cdata-section" in childNames
+            self._text = (self.tixi.getTextElement(path) if hasText else None,)
+        return self._text[0]
+
+    @property
+    def children(self) -> typing.List["Element"]:
+        """Child elements, in document order"""
+        self._check()
+        if self._children is None:
+            paths = self.tixi.xPathExpressionGetAllXPaths("{}/*".format(self.path))
+            self._children = [Element(self.tixi, path) for path in paths]
+        return list(self._children)
+
+    @property
+    def parent(self) -> typing.Union["Element", None]:
+        """Parent element, None for the root element"""
+        parentPath = self.path.parent
+        return Element(self.tixi, parentPath) if parentPath else None
+
+    @property
+    def row(self) -> int:
+        """Sequential number of the element among the child elements of its parent"""
+        self._check()
+        if self._row is None:
+            self._row = self.tixi.elementRow(str(self.path))
+        return self._row
+
+    #
+    def createElement(self, elementName, index=None, uri=None) -> "Element":
+        """Create a child element and return it
+        :param index: position among the child elements, appended if None
+        :param uri: namespace URI of the element, if any
+        """
+        path = str(self.path)
+        if uri is None and index is None:
+            childPath = self.tixi.createElement(path, elementName)
+        elif uri is None:
+            childPath = self.tixi.createElementAtIndex(path, elementName, index)
+        elif index is None:
+            childPath = self.tixi.createElementNS(path, elementName, uri)
+        else:
+            childPath = self.tixi.createElementNSAtIndex(path, elementName, index, uri)
+        return self._child(childPath)
+
+    def addTextElement(self, elementName, text, index=None) -> "Element":
+        """Create a child element with text and return it
+        :param index: position among the child elements, appended if None
+        """
+        path = str(self.path)
+        if index is None:
+            childPath = self.tixi.addTextElement(path, elementName, text)
+        else:
+            childPath = self.tixi.addTextElementAtIndex(path, elementName, text, index)
+        return self._child(childPath)
+
+    def _child(self, childPath) -> "Element":
+        if childPath is None:
+            # The path of an appended element in an inherited namespace is not known by its name
+            childPath = self.tixi.xPathExpressionGetLastXPath("{}/*".format(self.path))
+        return Element(self.tixi, childPath)
@@ -7,7 +7,7 @@ Created on 24.11.2020 19:25
 
 __authors__ = ['Piotr Gradkowski <grotsztaksel@o2.pl>']
 __date__ = '2020-11-24'
-__all__ = ["ExpandedTixi"]
+__all__ = ["ExpandedTixi", "TreeNode", "LoadStats"]
 
 try:
     # If Tixi path is specified in PYTHONPATH
@@ -20,33 +20,705 @@ except ImportError:
     from tixi3.tixi3wrapper import Tixi3
     from tixi3.tixi3wrapper import Tixi3Exception
 
+import collections
+import contextlib
+import functools
+import hashlib
+import itertools
+import os
 import re
+import sys
+import time
 import typing
+import xml.parsers.expat
+import xml.sax.saxutils
+
+try:
+    import numpy
+except ImportError:
+    # Only needed for the array-returning variants of the methods
+    numpy = None
+
+try:
+    import resource
+except ImportError:
+    # Not available on Windows - the peak memory is not reported there
+    resource = None
+
+from .cache import GenerationCache
+from .element import Element
+from .name_index import NameIndex
+from .path_index import PathIndex, fileDigest
+from .transaction import Batch
+from .xml_path import XmlPath
+
+_MISSING = object()
+
+# A step of a path as xmlGetNodePath gives it, e.g. "name", "p:name[2]", "*[3]" or "comment()[1]"
+_STEP = re.compile(r"([^\[\]]+?)(?:\[(\d+)\])?")
+
+# An XPath expression selecting the elements of a name without a namespace anywhere in the document
+_DESCENDANT_NAME = re.compile(r"//([A-Za-z_][\w.\-]*)")
+
+# XPath expressions that the name index answers: //test or //parentTest/test
+_SIMPLE_DESCENDANTS = re.compile(r"//(?:([A-Za-z_][\w.\-]*|\*)/)?([A-Za-z_][\w.\-]*|\*|comment\(\)|text\(\))")
+
+# XPath node tests of the node kinds that getChildNodeName names with a "#"
+_NODE_TESTS = {"#comment": "comment()", "#text": "text()", "#cdata-section": "text()"}
+
+# Content of a subtree that the copies built from its elements, attributes and texts leave out, and the XPath
+# steps finding it below the root element of the subtree
+_UNCOPIED_CONTENT = (("comments", "//comment()"),
+                     ("processing instructions", "//processing-instruction()"),
+                     ("text beside child elements", "/descendant-or-self::*[*]/text()[normalize-space()]"),
+                     ("prefixed elements", "/descendant-or-self::*[contains(name(), ':')]"),
+                     ("prefixed attributes", "/descendant-or-self::*/@*[contains(name(), ':')]"),
+                     ("prefixed namespace declarations",
+                      "/descendant-or-self::*/namespace::*[name() and name() != 'xml'][not(. = ../../namespace::*)]"))
+
+# Content that the copies keep only in part: the indentation is left out and the default namespaces are set
+# on each element anew, if at all
+_INEXACTLY_COPIED_CONTENT = (("whitespace between child elements", "/descendant-or-self::*[*]/text()"),
+                             ("namespaced elements", "/descendant-or-self::*[namespace-uri()]"),
+                             ("undeclared default namespaces",
+                              "/descendant-or-self::*[not(namespace::*[not(name())])][../namespace::*[not(name())]]"))
+
+# Tixi3 methods that change the document (or the way XPath expressions are resolved in it).
+# Those not overridden by ExpandedTixi are wrapped below the class, so that each call bumps the document generation
+_MUTATING_METHODS = ("open", "openString", "openHttp", "create", "close",
+                     "createElement", "createElementAtIndex", "createElementNS", "createElementNSAtIndex",
+                     "createElementIfNotExists", "createElementIfNotExistsNS",
+                     "addTextElement", "addTextElementAtIndex", "addTextElementNS", "addTextElementNSAtIndex",
+                     "addBooleanElement", "addBooleanElementNS", "addDoubleElement", "addDoubleElementNS",
+                     "addIntegerElement", "addIntegerElementNS", "addFloatVector", "addDoubleListWithAttributes",
+                     "addPoint", "addHeader", "addCpacsHeader", "addExternalLink",
+                     "updateTextElement", "updateDoubleElement", "updateIntegerElement", "updateBooleanElement",
+                     "updateFloatVector", "removeElement", "renameElement", "swapElements",
+                     "addTextAttribute", "addDoubleAttribute", "addIntegerAttribute", "addBooleanAttribute",
+                     "removeAttribute", "declareNamespace", "setElementNamespace",
+                     "registerNamespace", "registerNamespacesFromDocument")
+
+# The subtrees changed by the wrapped Tixi3 methods, for the change tracking: that of the element given as the first
+# argument (the default), of its parent ("parent"), of the parents of the first two arguments ("parents"),
+# of the deepest existing ancestor of the first argument ("ancestor"), the whole document ("document") or none
+_CHANGE_RULES = {"open": "document", "openString": "document", "openHttp": "document", "create": "document",
+                 "close": "document", "addHeader": "document", "addCpacsHeader": "document",
+                 "createElementIfNotExists": "ancestor", "createElementIfNotExistsNS": "ancestor",
+                 "removeElement": "parent", "setElementNamespace": "parent", "swapElements": "parents",
+                 "registerNamespace": None, "registerNamespacesFromDocument": None}
+
+# How the wrapped Tixi3 methods change the mirror of the name index: not at all (None), by removing the node
+# of the first argument ("remove") or by changing the text nodes of the element of the first argument ("text").
+# Any other method makes the index be built anew
+_MIRROR_RULES = {"removeElement": "remove",
+                 "updateTextElement": "text", "updateDoubleElement": "text", "updateIntegerElement": "text",
+                 "updateBooleanElement": "text", "updateFloatVector": "text",
+                 "addTextAttribute": None, "addDoubleAttribute": None, "addIntegerAttribute": None,
+                 "addBooleanAttribute": None, "removeAttribute": None, "declareNamespace": None,
+                 "registerNamespace": None, "registerNamespacesFromDocument": None}
+
+
+def _pathArguments(method):
+    """Let the method take XmlPath arguments wherever it takes path strings"""
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        args = [str(arg) if isinstance(arg, XmlPath) else arg for arg in args]
+        kwargs = {key: str(arg) if isinstance(arg, XmlPath) else arg for key, arg in kwargs.items()}
+        return method(self, *args, **kwargs)
+
+    return wrapper
+
+
+TreeNode = collections.namedtuple("TreeNode", ["path", "name", "attributes", "text"])
+TreeNode.__doc__ = """An element visited by ExpandedTixi.iterTree"""
+
+LoadStats = collections.namedtuple("LoadStats", ["seconds", "peakMemoryIncrease", "bytesRead"])
+LoadStats.__doc__ = """Statistics of ExpandedTixi.openFile: the time taken, the rise of the peak resident memory
+    of the process during the load in bytes (0, if the load stayed below an earlier peak; None, if the platform
+    does not report it) and the size of the file
+    """
+
+
+def _attributeTest(attrName) -> str:
+    """Return the XPath test of an attribute by its name as getAttributeName gives it, prefixed or not.
+    "@prefix:name" would only resolve with the prefix registered
+    """
+    return "@*[name()='{}']".format(attrName)
+
+
+def _childSteps(childNames):
+    """Yield the position among the child elements, the name and the path step of each child element,
+    given the names of all child nodes
+    """
+    totals = collections.Counter(name for name in childNames if not name.startswith("#"))
+    counts = dict()
+    position = 0
+    for name in childNames:
+        if name.startswith("#"):
+            continue
+        position += 1
+        n = counts[name] = counts.get(name, 0) + 1
+        yield position, name, name if totals[name] == 1 else "{}[{}]".format(name, n)
+
+
+def _maskedArray(values):
+    """Return a NumPy masked array of the values, with the None values masked.
+    The values are converted to floats, if all of them are numeric
+    """
+    mask = [value is None for value in values]
+    try:
+        data = [float("nan") if value is None else float(value) for value in values]
+        dtype = float
+    except ValueError:
+        data = ["" if value is None else value for value in values]
+        dtype = object
+    return numpy.ma.masked_array(numpy.array(data, dtype=dtype), mask=mask)
+
+
+def _ancestors(path) -> typing.List[str]:
+    """Return the paths of the ancestors of the element, from the root element down"""
+    steps = path.split("/")
+    return ["/".join(steps[:depth]) for depth in range(2, len(steps))]
+
+
+def _formatNumbers(values, format) -> typing.List[str]:
+    """Format the numbers the way Tixi3 formats doubles - with C printf, which Python's % operator follows"""
+    if numpy is not None and isinstance(values, numpy.ndarray):
+        # Python floats format much faster than NumPy scalars
+        values = values.astype(float).tolist()
+    return [format % float(value) for value in values]
+
+
+def _peakMemory() -> typing.Union[int, None]:
+    """Return the peak resident set size of the process in bytes"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Given in kilobytes on Linux, in bytes on macOS
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class _ScanFinished(Exception):
+    """Raised to stop scanning the document, once everything needed is known"""
+
+
+class _SubtreeElement(object):
+    """An element created by ExpandedTixi.buildSubtree"""
+    __slots__ = ("path", "origin", "counts", "canonical")
+
+    def __init__(self, path, origin):
+        self.path = path
+        # (parent, name, index) - or None for the element the subtree is built under
+        self.origin = origin
+        # Number of children created so far, by name
+        self.counts = dict()
+        self.canonical = None
 
 
 class ExpandedTixi(Tixi3):
     """A class providing some expanded functionalities to the tixi wrapper"""
 
     def __init__(self):
+        # Set before the wrapper is initialized - it may already call the (wrapped) mutating methods
+        self._generation = 0
+        self._xPathCache = None
+        # Canonical paths of the parents that children were appended to, and the number of their same-named children
+        self._appendGeneration = -1
+        self._canonicalParents = dict()
+        self._siblingCounts = dict()
+        # Default namespace declared on the elements, by their element positions
+        self._nsScopesGeneration = -1
+        self._nsScopes = dict()
+        # Children of the elements by name, the already resolved paths of getUnknownNSelementPath,
+        # the rows of the children of the elements and the ancestors having the inherited attributes
+        self._layoutGeneration = -1
+        self._childNames = dict()
+        self._childIndexes = dict()
+        self._childNodeIndexes = dict()
+        self._unknownNSPaths = dict()
+        self._siblingRows = dict()
+        self._inheritedPaths = dict()
+        self._inheritedValues = dict()
+        # The open Batch, if any
+        self._batch = None
+        # Roots of the subtrees changed since the tracking started (None, if the changes are not tracked)
+        # and the hashes of the subtrees, by their paths
+        self._changes = None
+        self._subtreeHashes = dict()
+        self._hashGeneration = -1
+        # Index of the file opened with openFile(index=True), valid until the document changes
+        self._pathIndex = None
+        self._pathIndexGeneration = -1
+        # Index of the nodes by name, kept up to date by the changes (None, until built) and the generation
+        # in which it could not be built
+        self._nameIndexEnabled = False
+        self._nameIndex = None
+        self._nameIndexFailed = -1
         super(ExpandedTixi, self).__init__()
 
     #
+    def documentGeneration(self) -> int:
+        """Return the document generation - a counter increased by every call that changes the document"""
+        return self._generation
+
+    def _documentChanged(self):
+        """Invalidate everything that has been learned about the document so far"""
+        self._generation += 1
+
+    @contextlib.contextmanager
+    def _changingDocument(self, subtrees=(), parentsOf=(), resolved=False, marked=False, indexed=False):
+        """Scope a change of the document. The generation is bumped even if the change fails half-way
+        :param subtrees: paths of the elements whose subtrees change
+        :param parentsOf: paths of the elements whose parents' subtrees change
+        If neither is given, the whole document is considered changed
+        :param resolved: True, if the paths are already in the form xmlGetNodePath gives
+        :param marked: True, if the caller marks the changed subtrees itself
+        :param indexed: True, if the caller keeps the name index up to date itself
+        """
+        if self._batch is not None and not self._batch.applying:
+            raise RuntimeError("The document cannot be changed directly while a batch is open")
+        if self._changes is not None and not marked:
+            if subtrees or parentsOf:
+                self._markChanged(subtrees, resolved=resolved)
+                self._markChanged(parentsOf, parents=True, resolved=resolved)
+            else:
+                self._addChange("/")
+        if not indexed:
+            self._nameIndex = None
+        try:
+            yield
+        except BaseException:
+            # The mirror of the name index may have been left half-way
+            self._nameIndex = None
+            raise
+        finally:
+            self._documentChanged()
+            if self._changes is not None:
+                # The hashes of the subtrees have been taken care of by the marking
+                self._hashGeneration = self._generation
+
+    def batch(self) -> Batch:
+        """Return a Batch, to queue changes of the document and apply them all at once, or none of them:
+
+            with tixi.batch() as batch:
+                element = batch.createElement("/root", "list")
+                batch.addTextElement(element, "item", "text")
+            path = element.path
+        """
+        return Batch(self)
+
+    #
+    def trackChanges(self, enable=True):
+        """Start (or stop) keeping track of the subtrees changed through this object - see changedPaths.
+        Starting forgets the changes tracked so far"""
+        self._changes = set() if enable else None
+        self._subtreeHashes.clear()
+
+    def changedPaths(self) -> typing.List[str]:
+        """
+        Return the paths of the roots of the subtrees changed since the tracking started or the changes were cleared,
+        in document order. None of them lies within another. "/" stands for the whole document
+        """
+        if self._changes is None:
+            raise RuntimeError("The changes are not tracked - call trackChanges() first")
+        if "/" in self._changes:
+            return ["/"]
+        roots = [path for path in self._changes if not any(ancestor in self._changes for ancestor in _ancestors(path))]
+        return sorted(roots, key=lambda path: (self._nodePosition(path) or (), path))
+
+    def clearChanges(self):
+        """Forget the changes tracked so far, keep tracking"""
+        if self._changes is not None:
+            self._changes = set()
+
+    def exportChanges(self, clear=True) -> typing.List[typing.Tuple[str, str]]:
+        """
+        Return the changed subtrees as XML fragments - see changedPaths. The fragments have the elements with
+        their attributes and texts, without namespace declarations and comments
+        :param clear: if True, forget the exported changes
+        :return: list of (path, fragment) tuples
+        """
+        changes = [(path, self._serializeSubtree(path)) for path in self.changedPaths()]
+        if clear:
+            self.clearChanges()
+        return changes
+
+    def subtreeHash(self, xmlPath) -> str:
+        """
+        Return a hash of the subtree of the element (names, attributes and texts), e.g. to find out if it has to be
+        stored again. The hash is computed once and kept until the subtree changes - if the changes are tracked -
+        or until anything in the document changes
+        """
+        path = self.xPathExpressionGetXPath(xmlPath, 1) if xmlPath != "/" else "/"
+        if self._hashGeneration != self._generation:
+            self._subtreeHashes.clear()
+            self._hashGeneration = self._generation
+        digest = self._subtreeHashes.get(path)
+        if digest is None:
+            digest = hashlib.blake2b(self._serializeSubtree(path).encode(), digest_size=16).hexdigest()
+            self._subtreeHashes[path] = digest
+        return digest
+
+    def _markChanged(self, paths, parents=False, resolved=False):
+        """Record the subtrees of the elements (or of their parents) as changed, if the changes are tracked"""
+        if self._changes is None:
+            return
+        for path in paths:
+            if not resolved:
+                try:
+                    path = super(ExpandedTixi, self).xPathExpressionGetXPath(path, 1)
+                except Tixi3Exception:
+                    # Nothing there to be changed
+                    continue
+            if parents:
+                path = path.rsplit("/", 1)[0] or "/"
+            self._addChange(path)
+
+    def _addChange(self, path):
+        hashes = self._subtreeHashes
+        if path == "/":
+            self._changes = {"/"}
+            hashes.clear()
+            return
+        for key in _ancestors(path) + [path, "/"]:
+            hashes.pop(key, None)
+        prefix = path + "/"
+        for key in [key for key in hashes if key.startswith(prefix)]:
+            del hashes[key]
+        self._changes.add(path)
+
+    def _serializeSubtree(self, path, rootAttributes=None, namespaces=False) -> str:
+        """Return the subtree as an XML fragment of its elements, attributes and texts. The whitespace-only text
+        between child elements is left out, any other text of an element is written before its child elements.
+        Comments and namespace prefixes are not written (see _uncopiedContent)
+        :param rootAttributes: dict of attributes added to the root element of the fragment, unless it has them
+        :param namespaces: if True, declare the default namespaces of the elements (see getURI)
+        """
+        rootName = None if path == "/" else self._elementLocalName(path)
+        nodes = self.iterTree(path)
+        uris = None
+        if namespaces:
+            nodes = list(nodes)
+            uris = [uri for _, uri in self._nearestNamespaces(self._subtreeChains(path, nodes))]
+        parts = list()
+        opened = list()
+        for i, node in enumerate(nodes):
+            while opened and not node.path.startswith(opened[-1][0] + "/"):
+                parts.append("</{}>".format(opened.pop()[1]))
+            if opened and opened[-1][3] is not None and not parts[opened[-1][3]].strip():
+                # The indentation of the child elements
+                parts[opened[-1][3]] = ""
+            attributes = node.attributes
+            if not parts and rootAttributes:
+                attributes = dict(rootAttributes, **attributes)
+            name = node.name if parts or rootName is None else rootName
+            attributes = "".join(" {}={}".format(attrName, xml.sax.saxutils.quoteattr(value))
+                                 for attrName, value in attributes.items())
+            uri = None if uris is None else uris[i]
+            if uri != (opened[-1][2] if opened else None):
+                attributes = " xmlns={}{}".format(xml.sax.saxutils.quoteattr(uri or ""), attributes)
+            parts.append("<{}{}>".format(name, attributes))
+            textIndex = None
+            if node.text is not None:
+                textIndex = len(parts)
+                parts.append(xml.sax.saxutils.escape(node.text))
+            opened.append((node.path, name, uri, textIndex))
+        while opened:
+            parts.append("</{}>".format(opened.pop()[1]))
+        return "".join(parts)
+
+    def _elementLocalName(self, xmlPath) -> str:
+        """Return the name of the element at the path as xmlGetNodePath gives it, without the namespace prefix"""
+        name = ExpandedTixi.elementName(xmlPath)
+        if name == "*":
+            # An element in the default namespace
+            names = [name for name in self._listChildNodeNames(ExpandedTixi.parent(xmlPath) or "/")
+                     if not name.startswith("#")]
+            name = names[self.elementRow(xmlPath) - 1]
+        return name.rsplit(":", 1)[-1]
+
+    #
+    @_pathArguments
+    def element(self, xPathExpr) -> Element:
+        """Return the Element handle of the element to which the XPath expression uniquely resolves"""
+        return Element(self, self._uniquePath(xPathExpr))
+
+    def _uniquePath(self, xPathExpr) -> str:
+        """Return the path of the element to which the XPath expression uniquely resolves"""
+        n = self.xPathEvaluateNodeNumber(xPathExpr)
+        if n == 0:
+            raise Tixi3Exception(ReturnCode.ELEMENT_NOT_FOUND, xPathExpr)
+        if n > 1:
+            raise Tixi3Exception(ReturnCode.ELEMENT_PATH_NOT_UNIQUE, xPathExpr)
+        return self.xPathExpressionGetXPath(xPathExpr, 1)
+
+    @_pathArguments
+    def extractSubtree(self, xPathExpr, namespaces=False, inheritedAttributes=()) -> "ExpandedTixi":
+        """
+        Return a new ExpandedTixi with the subtree of an element as its document. Without the namespaces, only
+        the subtree is walked - the document is neither exported nor reopened. The elements are copied with their
+        attributes and texts, without the indentation. A subtree holding anything else (comments, prefixed names,
+        text beside child elements) is refused with ValueError, rather than copied in part
+        :param xPathExpr: XPath expression uniquely resolving to the element
+        :param namespaces: if True, keep the default namespaces of the elements (see getURI), declaring them
+                           in the copy. Tixi does not tell the namespace declarations, so they are read from
+                           the exported document, which is scanned once up to the end of the subtree
+        :param inheritedAttributes: names of the attributes to be copied to the root element from its nearest
+                                    ancestor having them (see getInheritedTextAttribute), if it has not got them
+        """
+        path = self._uniquePath(xPathExpr)
+        self._checkCopiable(path)
+        rootAttributes = dict()
+        for attrName in inheritedAttributes:
+            value = self.getInheritedTextAttribute(path, attrName)
+            if value is not None:
+                rootAttributes[attrName] = value
+        extracted = ExpandedTixi()
+        extracted.openString(self._serializeSubtree(path, rootAttributes, namespaces))
+        return extracted
+
+    @_pathArguments
+    def graftSubtree(self, targetPath, otherTixi, srcPath, namespaces=False) -> str:
+        """
+        Copy the subtree of an element of another ExpandedTixi (or of this one) as the last child of targetPath.
+        Only the copied subtree is walked and built, see buildSubtree. Like in extractSubtree, a subtree holding
+        anything else than elements, attributes and texts is refused with ValueError
+        :param targetPath: XML path of the element to append the copy to
+        :param otherTixi: ExpandedTixi with the subtree
+        :param srcPath: XPath expression uniquely resolving to the root element of the subtree in otherTixi
+        :param namespaces: if True, set the default namespaces of the copied elements like in otherTixi
+                           (see getURI)
+        :return: path of the copied root element
+        """
+        srcPath = otherTixi._uniquePath(str(srcPath))
+        otherTixi._checkCopiable(srcPath)
+        nodes = list(otherTixi.iterTree(srcPath))
+        paths = self.buildSubtree(targetPath, otherTixi._subtreeSpec(srcPath, nodes), returnPaths=True)
+        if not namespaces:
+            return paths[0]
+        uris = [uri for _, uri in otherTixi._nearestNamespaces(otherTixi._subtreeChains(srcPath, nodes))]
+        # The deepest first, so that the paths of the ancestors still resolve
+        for path, uri in reversed(list(zip(paths, uris))):
+            if uri is not None:
+                self.setElementNamespace(path, uri, None)
+        return self.xPathExpressionGetLastXPath(paths[0].rsplit("/", 1)[0] + "/*")
+
+    #
+    def openFile(self, fileName, stripWhitespace=True, index=False) -> LoadStats:
+        """
+        Open an XML file, as open does - without ever building the whole document as a Python string.
+        The indentation of a pretty-printed file can be removed once it is opened
+        :param fileName: path of the file
+        :param stripWhitespace: if True, remove the whitespace-only text nodes (see clearWhitespace)
+        :param index: if True, use the index of the file saved next to it (see PathIndex), or build and save it,
+                      if there is none for this content of the file. Until the document changes, the index answers
+                      //name expressions, elementRow, getUnknownNSelementPath and getURI without asking Tixi
+        :return: LoadStats
+        """
+        start = time.perf_counter()
+        peak = _peakMemory()
+        size = os.path.getsize(fileName)
+        # The file itself is opened, so that Tixi knows its path
+        self.open(fileName)
+        if stripWhitespace:
+            self.clearWhitespace()
+
+        if index:
+            # The whitespace-only text nodes are not indexed, so the index holds for the stripped document as well
+            digest = fileDigest(fileName)
+            self._pathIndex = PathIndex.load(fileName, digest) or PathIndex.build(fileName, digest)
+            self._pathIndexGeneration = self._generation
+        return LoadStats(time.perf_counter() - start, None if peak is None else _peakMemory() - peak, size)
+
+    def _activePathIndex(self) -> typing.Union[PathIndex, None]:
+        """Return the index of the opened file, if the document has not changed since it was opened"""
+        if self._pathIndex is not None and self._pathIndexGeneration != self._generation:
+            self._pathIndex.close()
+            self._pathIndex = None
+        return self._pathIndex
+
+    def _indexedPaths(self, xPathExpr) -> typing.Union[typing.List[str], None]:
+        """Return the paths to which the XPath resolves, if the index of the opened file or the name index
+        can tell them
+        """
+        pathIndex = self._activePathIndex()
+        if pathIndex is not None:
+            match = _DESCENDANT_NAME.fullmatch(xPathExpr)
+            if match is not None:
+                return pathIndex.namedPaths(match.group(1))
+        match = _SIMPLE_DESCENDANTS.fullmatch(xPathExpr)
+        if match is None:
+            return None
+        nameIndex = self._activeNameIndex()
+        return None if nameIndex is None else nameIndex.paths(*match.groups())
+
+    #
+    def enableXPathCache(self, maxSize=1024):
+        """Cache the results of XPath evaluations until the document changes.
+        :param maxSize: maximum number of cached results; the least recently used ones are evicted first
+        """
+        self._xPathCache = GenerationCache(maxSize)
+
+    def disableXPathCache(self):
+        self._xPathCache = None
+
+    def xPathCacheStats(self) -> typing.Union[typing.Dict[str, int], None]:
+        """Return the hit/miss/eviction counters of the XPath cache, or None if the cache is disabled"""
+        if self._xPathCache is None:
+            return None
+        return self._xPathCache.stats()
+
+    def enableNameIndex(self):
+        """Answer the XPath expressions //test and //parentTest/test - where the tests are element names, "*",
+        and in the last step also "comment()" or "text()" - from an index of the nodes by name. The index is built
+        on the first such query and kept up to date by the element creations, removals, text updates
+        and attribute changes; any other change makes it be built anew on the next query
+        """
+        self._nameIndexEnabled = True
+
+    def disableNameIndex(self):
+        self._nameIndexEnabled = False
+        self._nameIndex = None
+
+    def _activeNameIndex(self) -> typing.Union[NameIndex, None]:
+        if not self._nameIndexEnabled:
+            return None
+        if self._nameIndex is None and self._nameIndexFailed != self._generation:
+            self._nameIndex = NameIndex.build(self)
+            if self._nameIndex is None:
+                self._nameIndexFailed = self._generation
+        return self._nameIndex
+
+    def _mirroredNode(self, xmlPath):
+        """Return the node of the name index mirroring the node at xmlPath, to be changed along with it.
+        If it cannot be found, the index is dropped
+        """
+        nameIndex = self._nameIndex
+        if nameIndex is None:
+            return None
+        node = nameIndex.find(xmlPath)
+        if node is None:
+            try:
+                node = nameIndex.find(super(ExpandedTixi, self).xPathExpressionGetXPath(xmlPath, 1), prefixes=True)
+            except Tixi3Exception:
+                pass
+        if node is None:
+            self._nameIndex = None
+        return node
+
+    @contextlib.contextmanager
+    def _creatingChild(self, xmlPath, elementName, index=None, text=None, namespace=False):
+        """Scope the creation of a child element of xmlPath, appended or at index, mirroring it in the name index
+        :param text: text of the new element, if any
+        :param namespace: True, if the element is created in a namespace
+        """
+        with self._changingDocument([xmlPath], indexed=True):
+            parent = self._mirroredNode(xmlPath)
+            yield
+            nameIndex = self._nameIndex
+            if nameIndex is not None:
+                row = nameIndex.elementCount(parent) + 1 if index is None else index
+                path = "{}/*[{}]".format(nameIndex.positionalPath(parent).rstrip("/"), row)
+                if namespace or parent.prefix is None or ":" in elementName:
+                    # The step tells the namespace of the new element
+                    step = super(ExpandedTixi, self).xPathExpressionGetXPath(path, 1).rsplit("/", 1)[-1]
+                else:
+                    # Created without a namespace, in a parent without a default one
+                    step = elementName
+                if text is None:
+                    childNames = ()
+                elif text and "&" not in str(text):
+                    childNames = ("#text",)
+                else:
+                    # An empty text or entity references may make other child nodes
+                    childNames = self._listChildNodeNames(path)
+                if not nameIndex.insertElement(parent, row, elementName, step, childNames):
+                    self._nameIndex = None
+
+    def _mirrorRemoved(self, node):
+        if self._nameIndex is not None:
+            self._nameIndex.removeNode(node)
+
+    def _mirrorTexts(self, node):
+        nameIndex = self._nameIndex
+        if nameIndex is not None:
+            childNames = self._listChildNodeNames(nameIndex.positionalPath(node))
+            if not nameIndex.refreshTexts(node, childNames):
+                self._nameIndex = None
+
+    def _cached(self, key, compute):
+        """Return the cached result for key, or compute and cache it, if the XPath cache is enabled"""
+        if self._xPathCache is None:
+            return compute()
+        value = self._xPathCache.get(key, self._generation, _MISSING)
+        if value is _MISSING:
+            value = compute()
+            self._xPathCache.put(key, self._generation, value)
+        return value
+
+    #
+    @_pathArguments
     def xPathEvaluateNodeNumber(self, xPathExpr) -> int:
         """Return the number of paths to which the XPath resolves"""
+        return self._cached(("count", xPathExpr), lambda: self._indexedNodeNumber(xPathExpr))
+
+    def _indexedNodeNumber(self, xPathExpr) -> int:
+        paths = self._indexedPaths(xPathExpr)
+        return self._xPathEvaluateNodeNumber(xPathExpr) if paths is None else len(paths)
+
+    def _xPathEvaluateNodeNumber(self, xPathExpr) -> int:
         try:
-            n = super().xPathEvaluateNodeNumber(xPathExpr)
+            n = super(ExpandedTixi, self).xPathEvaluateNodeNumber(xPathExpr)
         except Tixi3Exception as e:
             if e.code != ReturnCode.FAILED:
                 raise e
             n = 0
         return n
 
+    @_pathArguments
+    def xPathExpressionGetXPath(self, xPathExpr, index) -> str:
+        """Return the XML path of the index-th (starting from 1) node to which the XPath resolves"""
+        return self._cached(("xpath", xPathExpr, index),
+                            lambda: super(ExpandedTixi, self).xPathExpressionGetXPath(xPathExpr, index))
+
+    @_pathArguments
     def xPathExpressionGetAllXPaths(self, xPathExpr) -> typing.List[str]:
         """Return a list of all XML paths to which the XPath resolves"""
-        return [self.xPathExpressionGetXPath(xPathExpr, i + 1) for i in
-                range(self.xPathEvaluateNodeNumber(xPathExpr))]
+        return list(self._cached(("all", xPathExpr), lambda: self._indexedAllXPaths(xPathExpr)))
+
+    def _indexedAllXPaths(self, xPathExpr) -> typing.Tuple[str, ...]:
+        paths = self._indexedPaths(xPathExpr)
+        return tuple(self.xPathExpressionIterXPaths(xPathExpr) if paths is None else paths)
+
+    @_pathArguments
+    def xPathExpressionIterXPaths(self, xPathExpr) -> typing.Iterator[str]:
+        """Lazily yield the XML paths to which the XPath resolves, in document order.
+        The number of results is evaluated once, the paths only as they are consumed,
+        so the caller may stop early without paying for the remaining results.
+        The paths are not cached one by one, so that a large result does not evict the other entries
+        """
+        paths = self._indexedPaths(xPathExpr)
+        if paths is not None:
+            yield from paths
+            return
+        for i in range(self.xPathEvaluateNodeNumber(xPathExpr)):
+            yield super(ExpandedTixi, self).xPathExpressionGetXPath(xPathExpr, i + 1)
+
+    @_pathArguments
+    def xPathExpressionGetLastXPath(self, xPathExpr) -> typing.Union[str, None]:
+        """Return the XML path of the last node to which the XPath resolves, or None if there is none.
+        The expression is evaluated once
+        """
+        try:
+            return self.xPathExpressionGetXPath("({})[last()]".format(xPathExpr), 1)
+        except Tixi3Exception as e:
+            if e.code != ReturnCode.FAILED:
+                raise e
+            return None
 
     #
+    @_pathArguments
     def getAttributes(self, element_path) -> typing.Dict[str, str]:
         """
         Return a list of all attributes of a given element
@@ -60,25 +732,142 @@ class ExpandedTixi(Tixi3):
             attributes[attrName] = attrValue
         return attributes
 
+    def getAttributesBulk(self, elements, names=None, asArrays=False) -> typing.Dict[str, typing.Any]:
+        """
+        Return the attributes of many elements at once, as columns
+        :param elements: XPath expression or list of XML paths of the elements
+        :param names: names of the attributes to get. If None, all attributes found on the elements are returned
+        :param asArrays: if True, return NumPy masked arrays - of floats, if all present values are numeric -
+                         with the missing values masked
+        :return: dict with attribute names as keys and lists of values as values - None where an element
+                 does not have the attribute
+        """
+        if asArrays and numpy is None:
+            raise ImportError("NumPy is required to get the attributes as arrays")
+        xPathExpr = str(elements) if isinstance(elements, (str, XmlPath)) else None
+        paths = self.xPathExpressionGetAllXPaths(xPathExpr) if xPathExpr is not None else [str(e) for e in elements]
+
+        if names is None and paths:
+            names = self._commonAttributeNames(xPathExpr, paths)
+        if names is None:
+            # The elements differ - go through them one by one
+            columns = dict()
+            for i, path in enumerate(paths):
+                for attrName, attrValue in self.getAttributes(path).items():
+                    columns.setdefault(attrName, [None] * len(paths))[i] = attrValue
+        else:
+            columns = {attrName: self._attributeColumn(xPathExpr, paths, attrName) for attrName in names}
+
+        if asArrays:
+            columns = {attrName: _maskedArray(column) for attrName, column in columns.items()}
+        return columns
+
+    def _commonAttributeNames(self, xPathExpr, paths) -> typing.Union[typing.List[str], None]:
+        """Return the names of the attributes of the first element, if all elements of xPathExpr have exactly those"""
+        if xPathExpr is None:
+            return None
+        names = [self.getAttributeName(paths[0], i + 1) for i in range(self.getNumberOfAttributes(paths[0]))]
+        condition = "".join(" and " + _attributeTest(attrName) for attrName in names)
+        sameAttributes = "({})[count(@*) = {}{}]".format(xPathExpr, len(names), condition)
+        if self.xPathEvaluateNodeNumber(sameAttributes) != len(paths):
+            return None
+        return names
+
+    def _attributeColumn(self, xPathExpr, paths, attrName) -> typing.List[typing.Union[str, None]]:
+        """Return the values of attrName of all elements, None where it is missing"""
+        missing = "({})[not({})]".format(xPathExpr, _attributeTest(attrName))
+        if xPathExpr is not None and not self.xPathEvaluateNodeNumber(missing):
+            # No need to check each element
+            return [self.getTextAttribute(path, attrName) for path in paths]
+        return [self.getTextAttribute(path, attrName) if self.checkAttribute(path, attrName) else None
+                for path in paths]
+
+    #
+    @_pathArguments
+    def getNumericArray(self, xPathExpr, attr=None, dtype=float):
+        """
+        Return the numeric values of all elements matching xPathExpr, or of their attributes, as a NumPy array
+        :param xPathExpr: XPath expression of the elements
+        :param attr: name of the attribute holding the value. If None, the text of the elements is read
+        :param dtype: type of the returned array
+        :return: numpy.ndarray with one value per element, in document order
+        """
+        if numpy is None:
+            raise ImportError("NumPy is required to get numeric arrays")
+        paths = self.xPathExpressionGetAllXPaths(xPathExpr)
+        if attr is None:
+            texts = [self.getTextElement(path) for path in paths]
+        else:
+            texts = [self.getTextAttribute(path, attr) for path in paths]
+        # Let NumPy parse all the strings at once instead of calling float() on each of them
+        return numpy.array(texts, dtype=str).astype(dtype)
+
+    @_pathArguments
+    def setNumericArray(self, xPathExpr, values, attr=None, format="%g"):
+        """
+        Write the values to the elements matching xPathExpr, or to their attributes. The text is the same
+        as updateDoubleElement/addDoubleAttribute write with the same format
+        :param xPathExpr: XPath expression of the elements
+        :param values: sequence or array of numbers, one per element
+        :param attr: name of the attribute to write (it is created, if missing). If None, the text of the elements
+                     is replaced
+        :param format: printf-style format of the numbers
+        """
+        paths = self.xPathExpressionGetAllXPaths(xPathExpr)
+        texts = _formatNumbers(values, format)
+        if len(texts) != len(paths):
+            raise ValueError("Got {} values for {} elements of {}".format(len(texts), len(paths), xPathExpr))
+        with self._changingDocument(paths, resolved=True, indexed=attr is not None):
+            if attr is None:
+                for path, text in zip(paths, texts):
+                    super().updateTextElement(path, text)
+            else:
+                for path, text in zip(paths, texts):
+                    super().addTextAttribute(path, attr, text)
+
+    @_pathArguments
+    def addNumericArray(self, xmlPath, elementName, values, format="%g"):
+        """
+        Append one text element elementName per value to xmlPath. The text is the same as addDoubleElement
+        writes with the same format
+        :param xmlPath: path of the parent element
+        :param elementName: name of the new elements
+        :param values: sequence or array of numbers
+        :param format: printf-style format of the numbers
+        """
+        texts = _formatNumbers(values, format)
+        with self._changingDocument([xmlPath]):
+            for text in texts:
+                super().addTextElement(xmlPath, elementName, text)
+
     #
     @staticmethod
-    def parent(xmlPath) -> str:
+    def parent(xmlPath) -> typing.Union[str, XmlPath]:
         """Return the parent of the input xmlPath"""
+        if isinstance(xmlPath, XmlPath):
+            # Like the string form, the root element has no parent path
+            return xmlPath.parent if len(xmlPath) > 1 else ""
         return xmlPath.rsplit("/", 1)[0]
 
     #
     @staticmethod
     def elementName(xmlPath) -> str:
+        if isinstance(xmlPath, XmlPath):
+            return xmlPath.name
         return ExpandedTixi.uniqueElementName(xmlPath).split("[")[0]
 
     #
     @staticmethod
     def uniqueElementName(xmlPath) -> str:
+        if isinstance(xmlPath, XmlPath):
+            return xmlPath.uniqueName
         return xmlPath.rsplit("/", 1)[1]
 
     #
     @staticmethod
     def elementNumber(xmlPath) -> int:
+        if isinstance(xmlPath, XmlPath):
+            return xmlPath.number
         elementNumberString = ExpandedTixi.uniqueElementName(xmlPath).split("[")
         if len(elementNumberString) > 1:
             return int(elementNumberString[1].rstrip("]"))
@@ -86,87 +875,405 @@ class ExpandedTixi(Tixi3):
             return 1
 
     #
+    @_pathArguments
     def elementRow(self, xmlPath) -> int:
-        """Return the sequential number of the given element in its parent's tree"""
-        return self.xPathExpressionGetAllXPaths(self.parent(xmlPath) + "/*").index(xmlPath) + 1
+        """Return the sequential number of the given element in its parent's tree.
+        The rows of all children are remembered on the first call for a parent, until the document changes
+        """
+        pathIndex = self._activePathIndex()
+        if pathIndex is not None:
+            row = pathIndex.row(xmlPath)
+            if row is not None:
+                return row
+        parentPath = self.parent(xmlPath)
+        if parentPath:
+            row = self._childRows(parentPath).get(xmlPath)
+            if row is not None:
+                return row
+        # The root element, or a path not in the form xmlGetNodePath gives
+        return self._elementRow(xmlPath)
+
+    def elementRows(self, xmlPaths) -> typing.List[int]:
+        """Batch form of elementRow"""
+        return [self.elementRow(xmlPath) for xmlPath in xmlPaths]
+
+    def _childRows(self, xmlPath) -> typing.Dict[str, int]:
+        """Return the rows of the child elements of xmlPath, by their paths"""
+        self._checkLayoutGeneration()
+        rows = self._siblingRows.get(xmlPath)
+        if rows is not None:
+            return rows
+
+        index = self._childNameIndex(xmlPath)
+        n = sum(len(positions) for positions in index.values())
+        if n == self.xPathEvaluateNodeNumber(xmlPath + "/*[namespace-uri()='']"):
+            # No namespaces involved - the paths of the children can be told from their names
+            parentPath = self.xPathExpressionGetXPath(xmlPath, 1) if n else xmlPath
+            rows = dict()
+            for name, positions in index.items():
+                if len(positions) == 1:
+                    rows["{}/{}".format(parentPath, name)] = positions[0]
+                    continue
+                for i, position in enumerate(positions):
+                    rows["{}/{}[{}]".format(parentPath, name, i + 1)] = position
+        else:
+            rows = {path: i + 1 for i, path in enumerate(self.xPathExpressionIterXPaths(xmlPath + "/*"))}
+        self._siblingRows[xmlPath] = rows
+        return rows
 
-    def createElement(self, xmlPath, elementName) -> str:
-        """Create an element and return its path"""
-        super().createElement(xmlPath, elementName)
-        return self.xPathExpressionGetAllXPaths("{}/{}".format(xmlPath, elementName))[-1]
+    def _elementRow(self, xmlPath) -> int:
+        n = self.xPathEvaluateNodeNumber(xmlPath + "/self::*")
+        if n == 0:
+            raise Tixi3Exception(ReturnCode.ELEMENT_NOT_FOUND, xmlPath)
+        if n > 1:
+            raise Tixi3Exception(ReturnCode.ELEMENT_PATH_NOT_UNIQUE, xmlPath)
+        return self.xPathEvaluateNodeNumber(xmlPath + "/preceding-sibling::*") + 1
 
-    def createElementAtIndex(self, xmlPath, elementName, index) -> str:
-        """Create an element at given index and return its path"""
-        super().createElementAtIndex(xmlPath, elementName, index)
-        return self.xPathExpressionGetXPath(xmlPath + "/*", index)
+    @_pathArguments
+    def createElement(self, xmlPath, elementName, returnPath=True) -> typing.Union[str, None]:
+        """Create an element and return its path (or None, if returnPath is False)"""
+        generation = self._generation
+        with self._creatingChild(xmlPath, elementName):
+            super().createElement(xmlPath, elementName)
+        return self._appendedChildPath(generation, xmlPath, elementName, returnPath)
+
+    @_pathArguments
+    def createElementAtIndex(self, xmlPath, elementName, index, returnPath=True) -> typing.Union[str, None]:
+        """Create an element at given index and return its path (or None, if returnPath is False)"""
+        with self._creatingChild(xmlPath, elementName, index):
+            super().createElementAtIndex(xmlPath, elementName, index)
+        if returnPath:
+            return self.xPathExpressionGetXPath(xmlPath + "/*", index)
 
     #
-    def createElementNS(self, xmlPath, elementName, uri, prefix=None) -> str:
+    @_pathArguments
+    def createElementNS(self, xmlPath, elementName, uri, prefix=None, returnPath=True) -> typing.Union[str, None]:
         """Create an element using namespace and return its path, if a prefix is known"""
-        super().createElementNS(xmlPath, elementName, uri)
-        return self.xPathExpressionGetAllXPaths("{}/*".format(xmlPath))[-1]
+        with self._creatingChild(xmlPath, elementName, namespace=True):
+            super().createElementNS(xmlPath, elementName, uri)
+        if returnPath:
+            return self.xPathExpressionGetLastXPath("{}/*".format(xmlPath))
 
-    def createElementNSAtIndex(self, xmlPath, elementName, index, uri) -> str:
+    @_pathArguments
+    def createElementNSAtIndex(self, xmlPath, elementName, index, uri, returnPath=True) -> typing.Union[str, None]:
         """Create an element at given index using namespace and return its path"""
-        super().createElementNSAtIndex(xmlPath, elementName, index, uri)
-        return self.xPathExpressionGetXPath(xmlPath + "/*", index)
+        with self._creatingChild(xmlPath, elementName, index, namespace=True):
+            super().createElementNSAtIndex(xmlPath, elementName, index, uri)
+        if returnPath:
+            return self.xPathExpressionGetXPath(xmlPath + "/*", index)
+
+    def _appendedChildPath(self, generation, xmlPath, elementName, returnPath) -> typing.Union[str, None]:
+        """Return the path of the element just appended to xmlPath, the same as xmlGetNodePath would return it.
+        The canonical parent path and the number of same-named children are remembered as long as the document
+        is only changed by appending children, so that building a parent with N children stays linear.
+        :param generation: document generation before the element was appended
+        """
+        if self._appendGeneration != generation:
+            self._canonicalParents.clear()
+            self._siblingCounts.clear()
+        self._appendGeneration = self._generation
+
+        parentPath = self._canonicalParents.get(xmlPath)
+        n = self._siblingCounts.get((parentPath, elementName))
+        if n is not None:
+            n += 1
+        elif not returnPath:
+            # The parent may be remembered under another spelling, whose count is no longer right
+            self._canonicalParents.clear()
+            self._siblingCounts.clear()
+            return None
+        else:
+            # Not through the XPath cache, which is kept for the user's queries
+            if parentPath is None:
+                parentPath = super(ExpandedTixi, self).xPathExpressionGetXPath(xmlPath, 1)
+            n = self._xPathEvaluateNodeNumber("{}/{}".format(parentPath, elementName))
+            if n == 0:
+                # The new element has inherited the parent's namespace, there's no way to tell its path
+                return None
+            self._canonicalParents[xmlPath] = parentPath
+
+        if n == 2:
+            # The first sibling's path has just gained an index - so have the paths of all of its descendants
+            self._canonicalParents = {xmlPath: parentPath}
+            self._siblingCounts = dict()
+        self._siblingCounts[(parentPath, elementName)] = n
+
+        if not returnPath:
+            return None
+        if n == 1:
+            return "{}/{}".format(parentPath, elementName)
+        return "{}/{}[{}]".format(parentPath, elementName, n)
 
     #
-    def getUnknownNSelementPath(self, path, processed_path=None, elements=None):
+    @_pathArguments
+    def buildSubtree(self, parentPath, spec, returnPaths=False) -> typing.Union[typing.List[str], None]:
+        """Create a whole subtree under parentPath in one pass.
+        Elements are addressed by explicit indices while building, so no paths are queried back from the document.
+        :param parentPath: XML path of the element to append the subtree to
+        :param spec: dict with the key "name" and optional keys "attributes" (dict), "text" and "children"
+                     (iterable of further such dicts) - or an iterable of such dicts. Iterators are consumed lazily
+        :param returnPaths: if True, return the paths of all created elements in document order
+        :return: list of paths or None
+        """
+        if isinstance(spec, dict):
+            spec = (spec,)
+        top = _SubtreeElement(parentPath, None)
+        created = list()
+        stack = [(top, iter(spec))]
+        with self._changingDocument([parentPath]):
+            while stack:
+                parent, children = stack[-1]
+                child = next(children, None)
+                if child is None:
+                    stack.pop()
+                    continue
+
+                name = child["name"]
+                n = parent.counts.get(name)
+                if n is None:
+                    # Only the element we are building under may already have children
+                    n = 0 if parent is not top else self.xPathEvaluateNodeNumber("{}/{}".format(parentPath, name))
+                n += 1
+                parent.counts[name] = n
+
+                text = child.get("text")
+                if text is None:
+                    super().createElement(parent.path, name)
+                else:
+                    super().addTextElement(parent.path, name, str(text))
+                element = _SubtreeElement("{}/{}[{}]".format(parent.path, name, n), (parent, name, n))
+                for attrName, attrValue in child.get("attributes", {}).items():
+                    super().addTextAttribute(element.path, attrName, str(attrValue))
+
+                if returnPaths:
+                    created.append(element)
+                grandchildren = child.get("children")
+                if grandchildren:
+                    stack.append((element, iter(grandchildren)))
+
+        if not returnPaths:
+            return None
+
+        # Now that the number of siblings is known, the paths can be given in the form xmlGetNodePath returns them
+        top.canonical = self.xPathExpressionGetXPath(parentPath, 1)
+        for element in created:
+            parent, name, n = element.origin
+            if parent.counts[name] == 1:
+                element.canonical = "{}/{}".format(parent.canonical, name)
+            else:
+                element.canonical = "{}/{}[{}]".format(parent.canonical, name, n)
+        return [element.canonical for element in created]
+
+    #
+    def getUnknownNSelementPath(self, path) -> str:
         """ Carve the way down to an element, without knowing the namespace URI or having the namespace
         registered/declared.
-        Comment elements are ignored and do not influence the index
-        This is a recursive function
+        Comment and text nodes are ignored and do not influence the index
         :return: xPath in the form "/*[3]/*[1]/*[1]/*[2]
         """
-        if elements is None:
-            if "/" not in path:
-                raise Tixi3Exception(ReturnCode.INVALID_XPATH, path)
-            # The first element would be an empty string, as the path starts with "/"
-            elements = path.split("/")[1:]
+        return self.getUnknownNSelementPaths([path])[0]
 
+    def getUnknownNSelementPaths(self, paths) -> typing.List[str]:
+        """Batch form of getUnknownNSelementPath. Prefixes shared by the paths are resolved only once
+        - and remembered, as well as the children of each element passed on the way, until the document changes
+        """
+        self._checkLayoutGeneration()
+        resolved = self._unknownNSPaths
+        pathIndex = self._activePathIndex()
+
+        results = list()
+        for path in paths:
+            steps = ExpandedTixi._pathSteps(path)
+            if pathIndex is not None and steps:
+                results.append("".join("/*[{}]".format(row) for row in pathIndex.chain(pathIndex.element(steps))))
+                continue
 
-        elif elements == []:
-            # previous recursion has already found the right element
-            return processed_path
-        if processed_path is None:
             processed_path = "/"
+            for depth, (nextChildName, index) in enumerate(steps, 1):
+                known = resolved.get(steps[:depth])
+                if known is not None:
+                    processed_path = known
+                    continue
 
-        nextChild = elements[0]
-        nextChildName = ExpandedTixi.elementName("/" + nextChild)
-        nextChildNumber = ExpandedTixi.elementNumber("/" + nextChild)
-
-        # For non-unique names, need to loop through all children to make sure the count is equal 1
-        isNameUnique = nextChildName != nextChild
-
-        childOccurrences = 0
-        commentsFound = 0
-        elementFound = False
-        for i in range(1, self.getNumberOfChilds(processed_path) + 1):
-            childName = self.getChildNodeName(processed_path, i)
-            if childName == "#comment":
-                commentsFound += 1
-            if childName != nextChildName:
-                continue
+                positions = self._childNameIndex(processed_path).get(nextChildName, ())
+                # A name without index must be unique among the siblings
+                if index is None and len(positions) > 1:
+                    raise Tixi3Exception(ReturnCode.ELEMENT_PATH_NOT_UNIQUE, str(path))
+                nextChildNumber = 1 if index is None else index
+                if not 0 < nextChildNumber <= len(positions):
+                    raise Tixi3Exception(ReturnCode.ELEMENT_NOT_FOUND, str(path))
 
-            childOccurrences += 1
+                if processed_path == "/":
+                    processed_path = ""
+                processed_path = "{}/*[{}]".format(processed_path, positions[nextChildNumber - 1])
+                resolved[steps[:depth]] = processed_path
+            results.append(processed_path)
+        return results
 
-            elementFound = True
-            I = i - commentsFound
+    @staticmethod
+    def _pathSteps(path) -> typing.Tuple[typing.Tuple[str, typing.Union[int, None]], ...]:
+        try:
+            return XmlPath.parse(path).steps
+        except ValueError:
+            raise Tixi3Exception(ReturnCode.INVALID_XPATH, str(path))
 
-            if not isNameUnique and childOccurrences > 1:
-                raise Tixi3Exception(ReturnCode.ELEMENT_PATH_NOT_UNIQUE, path)
+    def _checkLayoutGeneration(self):
+        """Forget the remembered layout of the document, if the document has changed since"""
+        if self._layoutGeneration != self._generation:
+            self._forgetLayout()
+            self._layoutGeneration = self._generation
 
-            if isNameUnique and childOccurrences == nextChildNumber:
-                break
+    def _forgetLayout(self):
+        """Forget the remembered layout of the document"""
+        self._childNames = dict()
+        self._childIndexes = dict()
+        self._childNodeIndexes = dict()
+        self._unknownNSPaths = dict()
+        self._siblingRows = dict()
+        self._inheritedPaths = dict()
+        self._inheritedValues = dict()
 
-        if not elementFound or childOccurrences != nextChildNumber:
-            raise Tixi3Exception(ReturnCode.ELEMENT_NOT_FOUND, path)
+    def _childNodeNames(self, xmlPath) -> typing.List[str]:
+        """Return the names of all child nodes of xmlPath, as getChildNodeName gives them"""
+        self._checkLayoutGeneration()
+        names = self._childNames.get(xmlPath)
+        if names is None:
+            names = self._listChildNodeNames(xmlPath)
+            self._childNames[xmlPath] = names
+        return names
+
+    def _childNameIndex(self, xmlPath) -> typing.Dict[str, typing.List[int]]:
+        """Return the positions of the child elements of xmlPath by their names.
+        Comment and text nodes are skipped, so the positions are those that "*[n]" refers to
+        """
+        index = self._childIndexes.get(xmlPath)
+        if index is None:
+            index = dict()
+            position = 0
+            for childName in self._childNodeNames(xmlPath):
+                if childName.startswith("#"):
+                    # "#comment", "#text" or "#cdata-section"
+                    continue
+                position += 1
+                index.setdefault(childName, []).append(position)
+            self._childIndexes[xmlPath] = index
+        return index
 
-        if processed_path == "/":
-            processed_path = ""
-        processed_path = "{}/*[{}]".format(processed_path, I)
-        return self.getUnknownNSelementPath(path, processed_path, elements[1:])
+    def _childNodeIndex(self, xmlPath) -> typing.Dict[str, typing.List[int]]:
+        """Return the positions of the child nodes of xmlPath among all its child nodes,
+        by the XPath node tests that select them: element names, "*", "comment()" and "text()"
+        """
+        index = self._childNodeIndexes.get(xmlPath)
+        if index is None:
+            index = dict()
+            for position, childName in enumerate(self._childNodeNames(xmlPath), 1):
+                if childName.startswith("#"):
+                    if childName in _NODE_TESTS:
+                        index.setdefault(_NODE_TESTS[childName], []).append(position)
+                    continue
+                index.setdefault("*", []).append(position)
+                index.setdefault(childName, []).append(position)
+            self._childNodeIndexes[xmlPath] = index
+        return index
+
+    def _nodePosition(self, path) -> typing.Union[typing.Tuple[int, ...], None]:
+        """Return the positions of the node and of its ancestors among their siblings - a key sorting the nodes
+        in document order. Return None, if the path is not a chain of steps in the form xmlGetNodePath gives
+        """
+        position = list()
+        parentPath = "/"
+        for step in path.split("/")[1:]:
+            match = _STEP.fullmatch(step)
+            if match is None:
+                return None
+            name, n = match.groups()
+            # The prefix of a namespaced element is not known to getChildNodeName
+            positions = self._childNodeIndex(parentPath).get(name.rsplit(":", 1)[-1], ())
+            n = int(n) if n else 1
+            if not 0 < n <= len(positions):
+                return None
+            position.append(positions[n - 1])
+            parentPath = "{}/{}".format(parentPath.rstrip("/"), step)
+        return tuple(position)
+
+    def _collectChildNodes(self, nodeTest, xmlPath="/") -> typing.List[str]:
+        """Walk the tree below xmlPath once and return the paths of the nodes of the kind selected by nodeTest
+        ("comment()" or "text()"), in the order they are found. The elements are addressed by their positions.
+        The child lists are not remembered, so the walk does not hold the layout of the whole document
+        """
+        nameIndex = self._activeNameIndex() if xmlPath == "/" else None
+        paths = None if nameIndex is None else nameIndex.paths(None, nodeTest, positional=True)
+        if paths is not None:
+            # The nodes of a parent one after another
+            return sorted(paths, key=ExpandedTixi.parent)
+        found = list()
+        parents = [xmlPath]
+        while parents:
+            parentPath = parents.pop()
+            prefix = parentPath.rstrip("/")
+            counts = dict()
+            for childName in self._listChildNodeNames(parentPath):
+                test = _NODE_TESTS.get(childName) if childName.startswith("#") else "*"
+                if test is None:
+                    continue
+                n = counts[test] = counts.get(test, 0) + 1
+                if test == "*":
+                    parents.append("{}/*[{}]".format(prefix, n))
+                elif test == nodeTest:
+                    found.append("{}/{}[{}]".format(prefix, test, n))
+        return found
+
+    #
+    @_pathArguments
+    def iterTree(self, rootPath="/", depth=None, filter=None) -> typing.Iterator[TreeNode]:
+        """Walk the tree once, depth-first, yielding a TreeNode for each element below rootPath (and rootPath itself).
+        Only the child lists of the elements on the current branch are held, however large the document is.
+        :param rootPath: XML path of the element to start from. "/" starts from the root element
+        :param depth: maximum depth of the yielded elements below rootPath (the root element for "/"), None for all
+        :param filter: callable taking a TreeNode. If it returns False, the element and its subtree are skipped
+        :return: iterator of TreeNodes. Their paths are built from the element names, indexed where the name
+                 is not unique among the siblings
+        """
+        generation = self._generation
+        # Elements are addressed by their positions, so that the walk does not depend on namespaces
+        stack = list()
+        if rootPath == "/":
+            stack.append(("", "", 0, _childSteps(self._listChildNodeNames("/"))))
+        else:
+            node, childNames = self._treeNode(rootPath, rootPath, ExpandedTixi.elementName(rootPath))
+            if filter is None or filter(node):
+                yield node
+                if depth is None or depth > 0:
+                    stack.append((rootPath, rootPath, 1, _childSteps(childNames)))
+
+        while stack:
+            if self._generation != generation:
+                raise RuntimeError("The document has changed during the iteration")
+            positionalPath, path, level, steps = stack[-1]
+            step = next(steps, None)
+            if step is None:
+                stack.pop()
+                continue
+            position, name, indexedName = step
+            childPath = "{}/*[{}]".format(positionalPath, position)
+            node, childNames = self._treeNode(childPath, "{}/{}".format(path, indexedName), name)
+            if filter is not None and not filter(node):
+                continue
+            yield node
+            if depth is None or level < depth:
+                stack.append((childPath, node.path, level + 1, _childSteps(childNames)))
+
+    def _treeNode(self, xmlPath, path, name) -> typing.Tuple[TreeNode, typing.List[str]]:
+        """Return the TreeNode of the element at xmlPath, along with the names of its child nodes"""
+        childNames = self._listChildNodeNames(xmlPath)
+        text = None
+        if "#text" in childNames or "#cdata-section" in childNames:
+            text = self.getTextElement(xmlPath)
+        return TreeNode(path, name, self.getAttributes(xmlPath), text), childNames
+
+    def _listChildNodeNames(self, xmlPath) -> typing.List[str]:
+        """Return the names of all child nodes of xmlPath, without remembering them"""
+        return [self.getChildNodeName(xmlPath, i + 1) for i in range(self.getNumberOfChilds(xmlPath))]
 
     #
     def getURI(self, path):
@@ -177,80 +1284,228 @@ class ExpandedTixi(Tixi3):
                 - path to the ancestor (or self) of the element, on which the youngest URI is defined.
                 - URI string
         """
+        return self.getURIs([path])[0]
 
-        # First, create a working copy of own XML structure
-        tmp_tixi = ExpandedTixi()
-        tmp_tixi.openString(re.sub("\s+<", "<", self.exportDocumentAsString()))
-        tmp_tixi.clearComments()
-        path_local = tmp_tixi.getUnknownNSelementPath(path)
-
-        # Now, on that copy, remove all elements that do not belong to the element branch
-        elem_chain = path_local.split("/")[1:]
-        chain_path = "/"
-        for i in range(len(elem_chain)):
-            # This path doesn't matter - it's the number that does
-            next_elem = "/" + elem_chain[i]
-            num = ExpandedTixi.elementNumber(next_elem)
-            for j in range(1, tmp_tixi.getNumberOfChilds(chain_path) + 1):
-                if j < num:
-                    tmp_tixi.removeElement(chain_path + "/*[1]")
-                elif j == num:
-                    # This element is a part of the path. Do nothing
-                    pass
-                elif j > num:
-                    tmp_tixi.removeElement(chain_path + "/*[2]")
-            if chain_path == "/":
-                chain_path = ""
-            chain_path += "/*[1]"
-
-        # And now get rid of all children of the element
-        for j in range(1, tmp_tixi.getNumberOfChilds(chain_path) + 1):
-            tmp_tixi.removeElement(chain_path + "/*[1]")
-
-        # Now we should only have a cascade of single nodes. Get the list of opening tags
-        xml_tags = re.findall(r"<[^/\?]\S+.*?[^\?]>", tmp_tixi.exportDocumentAsString())
-
-        elements = path.split("/")
-        assert len(xml_tags) == len(elements[1:])
-
-        # Look for an xmlns attribute (looking backwards, will yield the youngest one first)
-        xmlns = re.compile(r'xmlns=[\'\"](\S+)[\'\"]')
-        for tag in reversed(xml_tags):
-            m = xmlns.search(tag)
-            if not m:
-                xml_tags.pop(-1)
-                continue
-            uri = m.groups(0)[0]
-            path_out = "/".join(elements[:len(xml_tags) + 1])
-            return path_out, uri
-        return None, None
+    def getURIs(self, paths) -> typing.List[typing.Tuple[typing.Union[str, None], typing.Union[str, None]]]:
+        """Batch form of getURI: return a (path, URI) tuple for each of the paths.
+        The namespace declarations of the ancestors are looked up for all the paths at once
+        and remembered until the document changes
+        """
+        paths = [str(path) for path in paths]
+        pathIndex = self._activePathIndex()
+        if pathIndex is not None:
+            uris = list()
+            for path in paths:
+                steps = ExpandedTixi._pathSteps(path)
+                scope = pathIndex.namespaceScope(pathIndex.element(steps)) if steps else None
+                if scope is None:
+                    uris.append((None, None))
+                else:
+                    depth, uri = scope
+                    uris.append(("/".join(path.split("/")[:depth + 1]), uri))
+            return uris
+
+        uris = [(None, None)] * len(paths)
+        wanted = list()
+        for i, path_local in enumerate(self.getUnknownNSelementPaths(paths)):
+            # Without a default namespace in scope anywhere along the path, no ancestor declares one
+            if self._xPathEvaluateNodeNumber(path_local + "/ancestor-or-self::*/namespace::*[not(name())]"):
+                wanted.append((i, tuple(index for name, index in XmlPath.parse(path_local).steps)))
+        chains = [chain for i, chain in wanted]
+        for (i, chain), (depth, uri) in zip(wanted, self._nearestNamespaces(chains)):
+            if uri:
+                uris[i] = ("/".join(paths[i].split("/")[:depth + 1]), uri)
+        return uris
+
+    def _subtreeSpec(self, xmlPath, nodes=None) -> typing.Dict[str, typing.Any]:
+        """Return the subtree of the element as a spec of buildSubtree: the elements with their attributes and texts,
+        without the whitespace-only text between child elements
+        :param nodes: the TreeNodes of iterTree(xmlPath), if already walked
+        """
+        root = None
+        opened = list()
+        for node in self.iterTree(xmlPath) if nodes is None else nodes:
+            while opened and not node.path.startswith(opened[-1][0] + "/"):
+                opened.pop()
+            spec = {"name": node.name, "attributes": node.attributes, "children": list()}
+            if node.text is not None:
+                spec["text"] = node.text
+            if opened:
+                parentSpec = opened[-1][1]
+                if "text" in parentSpec and not parentSpec["text"].strip():
+                    # The indentation of the child elements
+                    del parentSpec["text"]
+                parentSpec["children"].append(spec)
+            else:
+                # The last step of the path may be "*" or have a prefix
+                spec["name"] = self._elementLocalName(xmlPath)
+                root = spec
+            opened.append((node.path, spec))
+        return root
+
+    def _uncopiedContent(self, xmlPath, exact=False) -> typing.Union[str, None]:
+        """Return what the subtree of the element holds that its copies (see _subtreeSpec) leave out, or None
+        :param exact: if True, also look for the content that the copies keep only in part
+        """
+        for kind, steps in _UNCOPIED_CONTENT + _INEXACTLY_COPIED_CONTENT if exact else _UNCOPIED_CONTENT:
+            if self._xPathEvaluateNodeNumber(xmlPath + steps):
+                return kind
+        return None
+
+    def _checkCopiable(self, xmlPath):
+        """Raise ValueError, if the copies of the subtree of the element would leave out some of its content"""
+        # By the positions, the prefixes need not be registered
+        content = self._uncopiedContent(self.getUnknownNSelementPath(xmlPath))
+        if content is not None:
+            raise ValueError("The subtree of {} cannot be copied, it holds {}".format(xmlPath, content))
+
+    def _nearestNamespaces(self, chains) -> typing.List[typing.Tuple[int, typing.Union[str, None]]]:
+        """Return the depth of the youngest element along each chain (see _namespaceScopes) declaring a default
+        namespace, and the URI - or (0, None), if there is none
+        """
+        scopes = self._namespaceScopes(chains)
+        nearest = list()
+        for chain in chains:
+            # Looking backwards, will yield the youngest URI first
+            for depth in range(len(chain), 0, -1):
+                uri = scopes.get(chain[:depth])
+                if uri:
+                    nearest.append((depth, uri))
+                    break
+            else:
+                nearest.append((0, None))
+        return nearest
+
+    def _subtreeChains(self, xmlPath, nodes) -> typing.List[typing.Tuple[int, ...]]:
+        """Return the chains of element positions (see _namespaceScopes) of the TreeNodes of iterTree(xmlPath)"""
+        top = None
+        if xmlPath != "/":
+            steps = xmlPath.split("/")
+            top = tuple(self.elementRow("/".join(steps[:depth])) for depth in range(2, len(steps) + 1))
+        # The open elements: their paths, chains and numbers of the child elements so far
+        opened = [["", (), 0]]
+        chains = list()
+        for node in nodes:
+            if top is not None and not chains:
+                chain = top
+            else:
+                while not node.path.startswith(opened[-1][0] + "/"):
+                    opened.pop()
+                opened[-1][2] += 1
+                chain = opened[-1][1] + (opened[-1][2],)
+            chains.append(chain)
+            opened.append([node.path, chain, 0])
+        return chains
+
+    def _namespaceScopes(self, chains) -> typing.Dict[typing.Tuple[int, ...], typing.Union[str, None]]:
+        """Return a dict with the default namespace URI declared on each element along the chains (or None).
+        The elements are identified by the chain of their element (non-comment, non-text) positions.
+        Tixi gives no access to namespace declarations, so they are read from the exported document,
+        which is only scanned up to the last element not known yet
+        """
+        if self._nsScopesGeneration != self._generation:
+            self._nsScopes = dict()
+            self._nsScopesGeneration = self._generation
+        scopes = self._nsScopes
+
+        wanted = {chain[:depth] for chain in chains for depth in range(1, len(chain) + 1)} - scopes.keys()
+        if not wanted:
+            return scopes
+        ancestors = {chain[:depth] for chain in wanted for depth in range(len(chain))}
+
+        # Element positions of the open elements, None for those not leading to any wanted element
+        openElements = [()]
+        childCounts = [0]
+
+        def startElement(name, attributes):
+            childCounts[-1] += 1
+            parent = openElements[-1]
+            element = None
+            if parent is not None:
+                element = parent + (childCounts[-1],)
+                if element in wanted:
+                    scopes[element] = attributes.get("xmlns") or None
+                    wanted.discard(element)
+                    if not wanted:
+                        raise _ScanFinished()
+                if element not in ancestors:
+                    element = None
+            openElements.append(element)
+            childCounts.append(0)
+
+        def endElement(name):
+            openElements.pop()
+            childCounts.pop()
+
+        parser = xml.parsers.expat.ParserCreate()
+        parser.StartElementHandler = startElement
+        parser.EndElementHandler = endElement
+        try:
+            parser.Parse(self.exportDocumentAsString(), True)
+        except _ScanFinished:
+            pass
+        return scopes
 
     #
-    def addTextElement(self, xmlPath, elementName, text) -> str:
-        """Create a text element and return its path"""
-        super().addTextElement(xmlPath, elementName, text)
-        return self.xPathExpressionGetAllXPaths("{}/{}".format(xmlPath, elementName))[-1]
+    @_pathArguments
+    def addTextElement(self, xmlPath, elementName, text, returnPath=True) -> typing.Union[str, None]:
+        """Create a text element and return its path (or None, if returnPath is False)"""
+        generation = self._generation
+        with self._creatingChild(xmlPath, elementName, text=text):
+            super().addTextElement(xmlPath, elementName, text)
+        return self._appendedChildPath(generation, xmlPath, elementName, returnPath)
 
-    def addTextElementAtIndex(self, xmlPath, elementName, text, index) -> str:
-        """Create a text element and return its path"""
-        super().addTextElementAtIndex(xmlPath, elementName, text, index)
-        return self.xPathExpressionGetXPath(xmlPath + "/*", index)
+    @_pathArguments
+    def addTextElementAtIndex(self, xmlPath, elementName, text, index, returnPath=True) -> typing.Union[str, None]:
+        """Create a text element and return its path (or None, if returnPath is False)"""
+        with self._creatingChild(xmlPath, elementName, index, text=text):
+            super().addTextElementAtIndex(xmlPath, elementName, text, index)
+        if returnPath:
+            return self.xPathExpressionGetXPath(xmlPath + "/*", index)
 
+    @_pathArguments
     def findInheritedAttribute(self, xmlPath, attrName) -> typing.Union[str, None]:
         """Find the "youngest" parent - or self that has the required attribute and return its path.
-           If none of the parent elements has the required attribute, return empty string
+           If none of the parent elements has the required attribute, return None
         """
+        self._checkLayoutGeneration()
+        key = (xmlPath, attrName)
+        path = self._inheritedPaths.get(key, _MISSING)
+        if path is _MISSING:
+            path = self.xPathExpressionGetLastXPath("{}/ancestor-or-self::*[@{}]".format(xmlPath, attrName))
+            self._inheritedPaths[key] = path
+        return path
 
-        xpath = "{}/ancestor-or-self::*[@{}]".format(xmlPath, attrName)
-        try:
+    def findInheritedAttributes(self, elements, attrName) -> typing.List[typing.Union[str, None]]:
+        """Batch form of findInheritedAttribute.
+        The ancestors are checked top-down, each of them once for all the elements below it.
+        :param elements: XPath expression or list of XML paths of the elements
+        :return: list of paths of the ancestors having the attribute - the ancestors' paths are cut from the paths
+                 of the elements, so they are in the form xmlGetNodePath gives, if the elements' paths are
+        """
+        self._checkLayoutGeneration()
+        inherited = self._inheritedPaths
+        if isinstance(elements, (str, XmlPath)):
+            paths = self.xPathExpressionGetAllXPaths(str(elements))
+        else:
+            paths = elements
 
-            return self.xPathExpressionGetXPath(xpath, self.xPathEvaluateNodeNumber(xpath))
-        except Tixi3Exception as e:
-            if e.code != ReturnCode.FAILED:
-                raise e
-            return None
+        results = list()
+        for path in paths:
+            ancestor = None
+            segments = str(path).split("/")
+            for depth in range(2, len(segments) + 1):
+                prefix = "/".join(segments[:depth])
+                known = inherited.get((prefix, attrName), _MISSING)
+                if known is _MISSING:
+                    known = prefix if self.checkAttribute(prefix, attrName) else ancestor
+                    inherited[(prefix, attrName)] = known
+                ancestor = known
+            results.append(ancestor)
+        return results
 
     #
+    @_pathArguments
     def getInheritedTextAttribute(self, xmlPath, attrName) -> typing.Union[str, None]:
         """Find the "youngest" parent - or self that has the required attribute and return the attribute value
            If none of the parent elements has the required attribute, return None
@@ -258,12 +1513,126 @@ class ExpandedTixi(Tixi3):
         path = self.findInheritedAttribute(xmlPath, attrName)
 
         if path:
-            return self.getTextAttribute(path, attrName)
+            return self._inheritedTextAttribute(path, attrName)
         return None
 
+    def getInheritedTextAttributes(self, elements, attrName) -> typing.List[typing.Union[str, None]]:
+        """Batch form of getInheritedTextAttribute
+        :param elements: XPath expression or list of XML paths of the elements
+        """
+        return [self._inheritedTextAttribute(path, attrName) if path else None
+                for path in self.findInheritedAttributes(elements, attrName)]
+
+    def _inheritedTextAttribute(self, path, attrName) -> str:
+        """Return the value of the attribute of an ancestor found by findInheritedAttribute(s)"""
+        key = (path, attrName)
+        value = self._inheritedValues.get(key)
+        if value is None:
+            value = self.getTextAttribute(path, attrName)
+            self._inheritedValues[key] = value
+        return value
+
     #
     def clearComments(self):
         """Remove all comment nodes from tixi"""
-        cmt = "//comment()"
-        for path in reversed(self.xPathExpressionGetAllXPaths(cmt)):
-            self.removeElement(path)
+        self.removeElements(self._collectChildNodes("comment()"))
+
+    def clearWhitespace(self):
+        """Remove all whitespace-only text nodes from tixi - the indentation of a pretty-printed document"""
+        paths = list()
+        # The text nodes of a parent come one after another
+        for parentPath, texts in itertools.groupby(self._collectChildNodes("text()"), key=ExpandedTixi.parent):
+            texts = list(texts)
+            # Ask once per parent if all of its text nodes are whitespace
+            whitespace = self.xPathEvaluateNodeNumber(parentPath + "/text()[normalize-space()='']")
+            if whitespace == len(texts):
+                paths.extend(texts)
+            elif whitespace:
+                paths.extend(path for path in texts if self.xPathEvaluateNodeNumber(path + "[normalize-space()='']"))
+        try:
+            self.removeElements(paths)
+        finally:
+            # Ordering the paths has remembered the child lists of nearly all elements - do not keep them
+            self._forgetLayout()
+
+    def removeElements(self, elements):
+        """Remove many nodes at once.
+        The nodes are removed in reverse document order, so that removing one does not change the paths
+        of those still to be removed. Nodes inside other removed nodes are skipped.
+        :param elements: XPath expression or iterable of XML paths of the nodes
+        """
+        if isinstance(elements, (str, XmlPath)):
+            # Already in document order
+            ordered = self.xPathExpressionGetAllXPaths(str(elements))
+        else:
+            positions = dict()
+            for path in map(str, elements):
+                position = self._nodePosition(path)
+                if position is None:
+                    # Let the library resolve it to the form xmlGetNodePath gives
+                    path = self.xPathExpressionGetXPath(path, 1)
+                    position = self._nodePosition(path)
+                    if position is None:
+                        raise Tixi3Exception(ReturnCode.ELEMENT_NOT_FOUND, path)
+                positions[position] = path
+            ordered = [positions[position] for position in sorted(positions)]
+
+        removed = set(ordered)
+        with self._changingDocument(parentsOf=ordered, indexed=True):
+            for path in reversed(ordered):
+                steps = path.split("/")
+                if any("/".join(steps[:depth]) in removed for depth in range(2, len(steps))):
+                    continue
+                node = self._mirroredNode(path)
+                super().removeElement(path)
+                self._mirrorRemoved(node)
+
+
+def _mutatingTixi3Method(name):
+    """Wrap a Tixi3 method changing the document, so that ExpandedTixi notices the change"""
+
+    rule = _CHANGE_RULES.get(name, "element")
+    mirror = _MIRROR_RULES.get(name, "rebuild")
+
+    @_pathArguments
+    def method(self, *args, **kwargs):
+        indexed = mirror is None or (mirror != "rebuild" and bool(args))
+        with self._changingDocument(indexed=indexed, **_changedSubtrees(self, rule, args)):
+            node = self._mirroredNode(args[0]) if indexed and mirror is not None else None
+            # Looked up on each call, so that the method may still be patched on the Tixi3 class
+            result = getattr(Tixi3, name)(self, *args, **kwargs)
+            if mirror == "remove":
+                self._mirrorRemoved(node)
+            elif mirror == "text":
+                self._mirrorTexts(node)
+            return result
+
+    method.__name__ = name
+    method.__qualname__ = "ExpandedTixi." + name
+    method.__doc__ = getattr(Tixi3, name).__doc__
+    return method
+
+
+def _changedSubtrees(tixi, rule, args) -> typing.Dict[str, typing.Any]:
+    """Return the arguments of _changingDocument for a call of a wrapped Tixi3 method, by its change rule"""
+    if tixi._changes is None or rule == "document" or not args:
+        return dict()
+    if rule is None:
+        return {"marked": True}
+    if rule == "parent":
+        return {"parentsOf": args[:1]}
+    if rule == "parents":
+        return {"parentsOf": args[:2]}
+    if rule == "ancestor":
+        steps = args[0].split("/")
+        for depth in range(len(steps), 1, -1):
+            if Tixi3.checkElement(tixi, "/".join(steps[:depth])):
+                return {"subtrees": ["/".join(steps[:depth])]}
+        return dict()
+    return {"subtrees": args[:1]}
+
+
+for _name in _MUTATING_METHODS:
+    if hasattr(Tixi3, _name) and _name not in vars(ExpandedTixi):
+        setattr(ExpandedTixi, _name, _mutatingTixi3Method(_name))
+del _name
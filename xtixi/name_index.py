@@ -0,0 +1,402 @@
+# -*- coding: utf-8 -*-
+"""
+Created on 17.10.2026 23:20
+
+@author: Piotr Gradkowski <grotsztaksel@o2.pl>
+"""
+
+__authors__ = ['Piotr Gradkowski <grotsztaksel@o2.pl>']
+__date__ = '2026-10-17'
+__all__ = ["NameIndex"]
+
+import collections
+import re
+import typing
+import xml.parsers.expat
+
+_ELEMENT = "*"
+_COMMENT = "comment()"
+_TEXT = "text()"
+
+# A step of a path with an optional index: "name", "p:name", "*", "comment()" or "text()"
+_STEP = re.compile(r"(comment\(\)|text\(\)|\*|(?:([^\[\]/:()*]+):)?([^\[\]/:()*]+))(?:\[(\d+)\])?")
+
+_Layout = collections.namedtuple("_Layout", ["steps", "positions", "rows", "byTest"])
+
+
+class _Node(object):
+    """A node of the mirrored tree. The prefix of an element is "" without a namespace, None in a default namespace"""
+    __slots__ = ("parent", "kind", "name", "prefix", "children", "layout")
+
+    def __init__(self, parent, kind, name=None, prefix=""):
+        self.parent = parent
+        self.kind = kind
+        self.name = name
+        self.prefix = prefix
+        self.children = list()
+        self.layout = None
+
+    def test(self):
+        """The key under which the node is found by name: the name of an element without a namespace"""
+        return self.name if self.kind == _ELEMENT and self.prefix == "" else None
+
+
+def _stepOf(node, n, total) -> str:
+    """Return the step of the path of the node, the n-th of the total siblings counted along with it"""
+    if node.kind != _ELEMENT:
+        step = node.kind
+    elif node.prefix is None:
+        step = _ELEMENT
+    else:
+        step = "{}:{}".format(node.prefix, node.name) if node.prefix else node.name
+    return step if total == 1 else "{}[{}]".format(step, n)
+
+
+def _layout(node) -> _Layout:
+    """Return the steps of the paths of the child nodes as xmlGetNodePath gives them, their positions among all
+    child nodes and among the child nodes of their kind, and the child nodes by the tests of the steps selecting them
+    """
+    if node.layout is not None:
+        return node.layout
+    children = node.children
+    keys = list()
+    for child in children:
+        if child.kind != _ELEMENT:
+            keys.append(child.kind)
+        elif child.prefix is None:
+            # xmlGetNodePath counts all the sibling elements of an element in a default namespace
+            keys.append(_ELEMENT)
+        else:
+            keys.append((child.prefix, child.name))
+    totals = collections.Counter(keys)
+    totals[_ELEMENT] = sum(child.kind == _ELEMENT for child in children)
+    counts = collections.Counter()
+    steps = dict()
+    positions = dict()
+    rows = dict()
+    byTest = collections.defaultdict(list)
+    for position, (child, key) in enumerate(zip(children, keys)):
+        positions[child] = position
+        byTest[child.kind].append(child)
+        rows[child] = len(byTest[child.kind])
+        if child.kind == _ELEMENT:
+            byTest[(child.prefix, child.name)].append(child)
+        counts[key] += 1
+        n = rows[child] if key == _ELEMENT else counts[key]
+        steps[child] = _stepOf(child, n, totals[key])
+    node.layout = _Layout(steps, positions, rows, byTest)
+    return node.layout
+
+
+def _tests(node) -> typing.Tuple:
+    """The keys of byTest under which the node is found"""
+    return (node.kind, (node.prefix, node.name)) if node.kind == _ELEMENT else (node.kind,)
+
+
+def _groupIndex(group, positions, position) -> int:
+    """Return the index of the first node of the group (in document order) at the position or after it"""
+    lo, hi = 0, len(group)
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if positions[group[mid]] < position:
+            lo = mid + 1
+        else:
+            hi = mid
+    return lo
+
+
+def _update(layout, test, changed):
+    """Update the rows and the steps of the siblings found under the test, from the changed index of them on.
+    Those before it keep their steps - unless they have become or ceased to be the only ones
+    """
+    group = layout.byTest[test]
+    kind = not isinstance(test, tuple)
+    if kind:
+        for n in range(changed, len(group)):
+            layout.rows[group[n]] = n + 1
+    elif test[0] is None:
+        # The elements in a default namespace are numbered among all the sibling elements, under their kind
+        return
+    for n in range(0 if len(group) <= 2 else changed, len(group)):
+        node = group[n]
+        # Among all the sibling elements, those in a default namespace alone take "*" steps
+        if test != _ELEMENT or node.prefix is None:
+            layout.steps[node] = _stepOf(node, n + 1, len(group))
+
+
+def _insertChild(parent, position, node):
+    """Insert the node among the child nodes of the parent, updating the layout of the parent in place:
+    only the siblings after the node move
+    """
+    layout = _layout(parent)
+    children = parent.children
+    children.insert(position, node)
+    for i in range(position, len(children)):
+        layout.positions[children[i]] = i
+    for test in _tests(node):
+        changed = _groupIndex(layout.byTest[test], layout.positions, position)
+        layout.byTest[test].insert(changed, node)
+        _update(layout, test, changed)
+
+
+def _removeChild(parent, node):
+    """Remove the node from the child nodes of the parent, updating the layout of the parent in place"""
+    layout = _layout(parent)
+    position = layout.positions[node]
+    changes = [(test, _groupIndex(layout.byTest[test], layout.positions, position)) for test in _tests(node)]
+    children = parent.children
+    del children[position]
+    del layout.positions[node]
+    for i in range(position, len(children)):
+        layout.positions[children[i]] = i
+    del layout.rows[node]
+    del layout.steps[node]
+    for test, changed in changes:
+        del layout.byTest[test][changed]
+        _update(layout, test, changed)
+
+
+class NameIndex(object):
+    """A mirror of the structure of the document - the names and the namespaces of the elements, the comment and
+    text nodes - with the nodes by their names and kinds, to answer simple XPath expressions without scanning
+    the document. The text nodes are only mirrored if the exported document tells them exactly
+    """
+
+    def __init__(self):
+        self.root = _Node(None, "document")
+        self.texts = True
+        self._nodes = collections.defaultdict(set)
+
+    @staticmethod
+    def build(tixi) -> typing.Union["NameIndex", None]:
+        """Return the index of the document of the ExpandedTixi, None if the exported document cannot be parsed"""
+        index = NameIndex()
+        textNodes = list()
+        stack = [index.root]
+        state = {"text": None}
+
+        def add(node):
+            stack[-1].children.append(node)
+            index._add(node)
+            state["text"] = None
+
+        def startElement(name, attributes):
+            parts = name.split(" ")
+            if len(parts) == 1:
+                node = _Node(stack[-1], _ELEMENT, parts[0])
+            elif len(parts) == 2:
+                node = _Node(stack[-1], _ELEMENT, parts[1], None)
+            else:
+                node = _Node(stack[-1], _ELEMENT, parts[1], parts[2])
+            add(node)
+            stack.append(node)
+
+        def endElement(name):
+            stack.pop()
+            state["text"] = None
+
+        def characterData(data):
+            if state["text"] is None:
+                # The name tells, until the end of the parsing, if the text is whitespace only
+                node = _Node(stack[-1], _TEXT, True)
+                add(node)
+                textNodes.append(node)
+                state["text"] = node
+            state["text"].name = state["text"].name and not data.strip()
+
+        def comment(data):
+            add(_Node(stack[-1], _COMMENT))
+
+        def cdataBoundary():
+            # A CDATA section is a text node of its own
+            state["text"] = None
+
+        parser = xml.parsers.expat.ParserCreate(namespace_separator=" ")
+        parser.namespace_prefixes = True
+        parser.StartElementHandler = startElement
+        parser.EndElementHandler = endElement
+        parser.CharacterDataHandler = characterData
+        parser.CommentHandler = comment
+        parser.StartCdataSectionHandler = cdataBoundary
+        parser.EndCdataSectionHandler = cdataBoundary
+        try:
+            parser.Parse(tixi.exportDocumentAsString(), True)
+        except xml.parsers.expat.ExpatError:
+            return None
+
+        # The export may be indented, adding whitespace-only text nodes which the document does not have
+        total = tixi._xPathEvaluateNodeNumber("//text()")
+        blank = tixi._xPathEvaluateNodeNumber("//text()[normalize-space()='']")
+        blankNodes = [node for node in textNodes if node.name]
+        for node in textNodes:
+            node.name = None
+        if blank == 0:
+            index._removeNodes(blankNodes)
+            exact = len(textNodes) - len(blankNodes) == total
+        else:
+            exact = len(textNodes) == total and len(blankNodes) == blank
+        if not exact:
+            index.texts = False
+            index._removeNodes([node for node in textNodes if node.parent is not None])
+        return index
+
+    def _add(self, node):
+        self._nodes[node.kind].add(node)
+        if node.test() is not None:
+            self._nodes[node.name].add(node)
+
+    def _discard(self, node):
+        self._nodes[node.kind].discard(node)
+        if node.test() is not None:
+            self._nodes[node.name].discard(node)
+
+    def _removeNodes(self, nodes):
+        """Remove the nodes (with no child nodes) from the mirror"""
+        parents = set()
+        for node in nodes:
+            self._discard(node)
+            parents.add(node.parent)
+            node.parent = None
+        for parent in parents:
+            parent.children = [child for child in parent.children if child.parent is not None]
+            parent.layout = None
+
+    #
+    def paths(self, parentTest, test, positional=False) -> typing.Union[typing.List[str], None]:
+        """
+        Return the paths of the nodes selected by //test, or //parentTest/test, in document order.
+        None, if the index cannot tell
+        :param parentTest: name of the parent elements (without a namespace), "*" or None
+        :param test: name of the elements (without a namespace), "*", "comment()" or "text()"
+        :param positional: if True, return the paths in the form "/*[1]/*[3]/comment()[1]"
+        """
+        if test == _TEXT and not self.texts:
+            return None
+        nodes = self._nodes.get(test, ())
+        if parentTest is not None:
+            nodes = [node for node in nodes if node.parent.kind == _ELEMENT
+                     and (parentTest == _ELEMENT or node.parent.test() == parentTest)]
+        path = self.positionalPath if positional else self.path
+        return [path(node) for node in sorted(nodes, key=self._position)]
+
+    def _position(self, node) -> typing.Tuple[int, ...]:
+        position = list()
+        while node.parent is not None:
+            position.append(_layout(node.parent).positions[node])
+            node = node.parent
+        return tuple(reversed(position))
+
+    def path(self, node) -> str:
+        """Return the path of the node as xmlGetNodePath gives it"""
+        steps = list()
+        while node.parent is not None:
+            steps.append(_layout(node.parent).steps[node])
+            node = node.parent
+        return "/" + "/".join(reversed(steps))
+
+    def positionalPath(self, node) -> str:
+        """Return the path of the node in the form "/*[1]/*[3]", the last step being "comment()[n]" or "text()[n]"
+        for the other kinds of nodes
+        """
+        steps = list()
+        while node.parent is not None:
+            steps.append("{}[{}]".format(node.kind, _layout(node.parent).rows[node]))
+            node = node.parent
+        return "/" + "/".join(reversed(steps))
+
+    def find(self, path, prefixes=False) -> typing.Union[_Node, None]:
+        """
+        Return the node at the path of the steps like xmlGetNodePath gives them, None if it is not there or the path
+        has some other form. The steps are resolved the way XPath resolves them, e.g. "name" is the first
+        of the same-named elements
+        :param prefixes: if True, take the prefixes of the steps for those of the document
+        """
+        if not path.startswith("/") or path == "/":
+            return None
+        node = self.root
+        for step in path[1:].split("/"):
+            match = _STEP.fullmatch(step)
+            if match is None:
+                return None
+            test, prefix, name, n = match.groups()
+            if prefix is not None and not prefixes:
+                return None
+            if name is not None:
+                test = (prefix or "", name)
+            if test == _TEXT and not self.texts:
+                return None
+            candidates = _layout(node).byTest.get(test, ())
+            n = int(n) if n else 1
+            if not 0 < n <= len(candidates):
+                return None
+            node = candidates[n - 1]
+        return node
+
+    def elementCount(self, node) -> int:
+        return len(_layout(node).byTest.get(_ELEMENT, ()))
+
+    #
+    def insertElement(self, parent, row, name, step, childNames) -> bool:
+        """
+        Mirror an element created in the document
+        :param parent: node of the parent element
+        :param row: position of the new element among the child elements
+        :param name: name of the new element
+        :param step: last step of the path of the new element, as xmlGetNodePath gives it
+        :param childNames: names of the child nodes of the new element, as getChildNodeName gives them
+        :return: False, if the child nodes cannot be mirrored
+        """
+        step = step.split("[", 1)[0]
+        if step == _ELEMENT:
+            node = _Node(parent, _ELEMENT, name.rsplit(":", 1)[-1], None)
+        elif ":" in step:
+            prefix, name = step.split(":", 1)
+            node = _Node(parent, _ELEMENT, name, prefix)
+        else:
+            node = _Node(parent, _ELEMENT, step)
+        layout = _layout(parent)
+        elements = layout.byTest.get(_ELEMENT, ())
+        _insertChild(parent, layout.positions[elements[row - 1]] if row <= len(elements) else len(parent.children),
+                     node)
+        self._add(node)
+        return self.refreshTexts(node, childNames)
+
+    def removeNode(self, node):
+        """Mirror a node removed from the document, with its subtree"""
+        stack = [node]
+        while stack:
+            descendant = stack.pop()
+            self._discard(descendant)
+            stack.extend(descendant.children)
+        _removeChild(node.parent, node)
+        node.parent = None
+
+    def refreshTexts(self, node, childNames) -> bool:
+        """
+        Mirror the text nodes of the element, after its text has been changed
+        :param childNames: names of the child nodes of the element, as getChildNodeName gives them
+        :return: False, if the other child nodes do not match those mirrored
+        """
+        others = collections.deque(child for child in node.children if child.kind != _TEXT)
+        children = list()
+        for childName in childNames:
+            if childName in ("#text", "#cdata-section"):
+                if self.texts:
+                    text = _Node(node, _TEXT)
+                    children.append(text)
+                    self._add(text)
+            elif childName == "#comment" or not childName.startswith("#"):
+                if not others:
+                    return False
+                child = others.popleft()
+                if (child.kind == _COMMENT) != (childName == "#comment"):
+                    return False
+                children.append(child)
+        if others:
+            return False
+        for child in node.children:
+            if child.kind == _TEXT:
+                self._discard(child)
+        node.children = children
+        node.layout = None
+        return True
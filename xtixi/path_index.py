@@ -0,0 +1,391 @@
+# -*- coding: utf-8 -*-
+"""
+Created on 17.10.2026 22:15
+
+@author: Piotr Gradkowski <grotsztaksel@o2.pl>
+"""
+
+__authors__ = ['Piotr Gradkowski <grotsztaksel@o2.pl>']
+__date__ = '2026-10-17'
+__all__ = ["PathIndex", "SIDECAR_SUFFIX"]
+
+import array
+import collections
+import hashlib
+import mmap
+import os
+import struct
+import sys
+import typing
+import xml.parsers.expat
+
+try:
+    # If Tixi path is specified in PYTHONPATH
+    from tixi3wrapper import Tixi3Exception, ReturnCode
+except ImportError:
+    # This usually works in Anaconda environment
+    from tixi3.tixi3wrapper import Tixi3Exception, ReturnCode
+
+# Appended to the name of the XML file to name its index
+SIDECAR_SUFFIX = ".xtixi-index"
+
+_MAGIC = b"XTIXIDX1"
+_BYTE_ORDER = b"l" if sys.byteorder == "little" else b"b"
+# Magic, content digest, byte order and padding, then the offset and the length of each section
+_HEADER = struct.Struct("=8s16sc7x")
+
+# The sections of the file, in this order. All of them are arrays; the strings are UTF-8 in the blob,
+# the string i being blob[stringOffsets[i]:stringOffsets[i + 1]]. The elements are numbered in document order
+_SECTIONS = (("blob", "B"),
+             ("stringOffsets", "Q"),
+             # By element: parent element (-1 for the root element), position among the child elements
+             ("parent", "i"),
+             ("row", "I"),
+             # Number of the siblings (itself included) with the same name, regardless of the namespace
+             ("nameTotal", "I"),
+             # The nearest element (itself or an ancestor) declaring a default namespace, -1 if none
+             ("scope", "i"),
+             # The default namespace URI declared on the element, -1 if none
+             ("uri", "i"),
+             # Path as xmlGetNodePath gives it, and the path of the names with all indices given, e.g. "/a[1]/b[2]"
+             ("canonical", "I"),
+             ("localKey", "I"),
+             # The elements sorted by the two paths above
+             ("canonicalSorted", "I"),
+             ("localSorted", "I"),
+             # The names of the elements without a namespace, sorted, and those elements in document order by name:
+             # byName[nameStarts[i]:nameStarts[i + 1]] for names[i]
+             ("names", "I"),
+             ("nameStarts", "I"),
+             ("byName", "I"))
+_TABLE = struct.Struct("=" + "QQ" * len(_SECTIONS))
+_DATA_START = _HEADER.size + _TABLE.size
+
+
+def fileDigest(fileName, chunkSize=1 << 20) -> bytes:
+    """Return the hash of the content of the file, the key of its index"""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(fileName, "rb") as file:
+        for chunk in iter(lambda: file.read(chunkSize), b""):
+            digest.update(chunk)
+    return digest.digest()
+
+
+class PathIndex(object):
+    """What the paths, the child layout and the namespace scopes of a document are, read from a memory-mapped file.
+    The queries are binary searches, so they take the same time, however large the document is.
+    Built by parsing the XML file, independent of Tixi
+    """
+
+    def __init__(self, buffer, source=None):
+        """
+        :param buffer: the content of an index file, as written by build
+        :param source: mmap (or file) to close along with the index
+        """
+        self._source = source
+        self._views = dict()
+        view = memoryview(buffer)
+        table = _TABLE.unpack_from(buffer, _HEADER.size)
+        for i, (name, typecode) in enumerate(_SECTIONS):
+            offset, length = table[2 * i], table[2 * i + 1]
+            size = struct.calcsize(typecode)
+            if offset < _DATA_START or offset + length * size > len(view):
+                for section in self._views.values():
+                    section.release()
+                view.release()
+                raise ValueError("Section {} of the index lies outside of it".format(name))
+            self._views[name] = view[offset:offset + length * size].cast(typecode)
+        self._view = view
+
+    @staticmethod
+    def load(fileName, digest) -> typing.Union["PathIndex", None]:
+        """Return the index of the XML file from its sidecar, or None, if there is none for this content of the file,
+        or if the sidecar is corrupt or truncated
+        :param digest: fileDigest of the XML file
+        """
+        try:
+            file = open(fileName + SIDECAR_SUFFIX, "rb")
+        except OSError:
+            return None
+        with file:
+            if os.fstat(file.fileno()).st_size < _DATA_START:
+                return None
+            data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, storedDigest, byteOrder = _HEADER.unpack_from(data)
+        if (magic, storedDigest, byteOrder) != (_MAGIC, digest, _BYTE_ORDER):
+            data.close()
+            return None
+        try:
+            index = PathIndex(data, data)
+        except (ValueError, struct.error):
+            data.close()
+            return None
+        if not index._consistent():
+            index.close()
+            return None
+        return index
+
+    @staticmethod
+    def build(fileName, digest, save=True) -> typing.Union["PathIndex", None]:
+        """Parse the XML file and return its index, saved as a sidecar file if possible.
+        Return None, if the file cannot be parsed
+        """
+        try:
+            content = _buildIndex(fileName, digest)
+        except xml.parsers.expat.ExpatError:
+            return None
+        if save:
+            target = fileName + SIDECAR_SUFFIX
+            temporary = "{}.{}".format(target, os.getpid())
+            try:
+                with open(temporary, "wb") as file:
+                    file.write(content)
+                os.replace(temporary, target)
+            except OSError:
+                # Read-only location - the index is only kept in memory
+                if os.path.exists(temporary):
+                    os.remove(temporary)
+        return PathIndex(content)
+
+    def close(self):
+        for view in self._views.values():
+            view.release()
+        self._views = dict()
+        self._view.release()
+        if self._source is not None:
+            self._source.close()
+            self._source = None
+
+    def _consistent(self) -> bool:
+        """Return True, if the sizes of the sections agree with each other"""
+        views = self._views
+        n = len(views["parent"])
+        if any(len(views[name]) != n for name in ("row", "nameTotal", "scope", "uri", "canonical", "localKey",
+                                                  "canonicalSorted", "localSorted")):
+            return False
+        offsets = views["stringOffsets"]
+        return (len(offsets) > 0 and offsets[-1] == len(views["blob"])
+                and len(views["nameStarts"]) == len(views["names"]) + 1
+                and views["nameStarts"][-1] == len(views["byName"]))
+
+    #
+    def __len__(self):
+        return len(self._views["parent"])
+
+    def _string(self, i) -> bytes:
+        offsets = self._views["stringOffsets"]
+        return bytes(self._views["blob"][offsets[i]:offsets[i + 1]])
+
+    def _search(self, sortedName, keyName, key) -> typing.Union[int, None]:
+        """Return the element whose string keyName is key, by a binary search over the elements sorted by it"""
+        ordered = self._views[sortedName]
+        keys = self._views[keyName]
+        key = key.encode()
+        lo, hi = 0, len(ordered)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._string(keys[ordered[mid]]) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < len(ordered) and self._string(keys[ordered[lo]]) == key:
+            return ordered[lo]
+        return None
+
+    def canonicalPath(self, element) -> str:
+        return self._string(self._views["canonical"][element]).decode()
+
+    def row(self, xmlPath) -> typing.Union[int, None]:
+        """Return the position of the element among the child elements of its parent, None if the path is not
+        one of those that xmlGetNodePath gives
+        """
+        element = self._search("canonicalSorted", "canonical", xmlPath)
+        return None if element is None else self._views["row"][element]
+
+    def namedPaths(self, name) -> typing.List[str]:
+        """Return the paths of the elements of the name without a namespace, in document order - like //name"""
+        names = self._views["names"]
+        key = name.encode()
+        lo, hi = 0, len(names)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._string(names[mid]) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo == len(names) or self._string(names[lo]) != key:
+            return []
+        starts = self._views["nameStarts"]
+        return [self.canonicalPath(element) for element in self._views["byName"][starts[lo]:starts[lo + 1]]]
+
+    def element(self, steps) -> int:
+        """
+        Return the element at the path of the names, as ExpandedTixi.getUnknownNSelementPath takes it
+        :param steps: (name, index) tuples of an XmlPath. A step without index must be unique among the siblings
+        """
+        nameTotal = self._views["nameTotal"]
+        key = ""
+        element = None
+        for name, index in steps:
+            key += "/{}[{}]".format(name, 1 if index is None else index)
+            element = self._search("localSorted", "localKey", key)
+            if element is None:
+                # The original path has the index given where the key has 1
+                raise Tixi3Exception(ReturnCode.ELEMENT_NOT_FOUND, "".join(_stepString(step) for step in steps))
+            if index is None and nameTotal[element] > 1:
+                raise Tixi3Exception(ReturnCode.ELEMENT_PATH_NOT_UNIQUE,
+                                     "".join(_stepString(step) for step in steps))
+        return element
+
+    def chain(self, element) -> typing.Tuple[int, ...]:
+        """Return the positions of the element and of its ancestors among the child elements of their parents"""
+        parent = self._views["parent"]
+        row = self._views["row"]
+        chain = list()
+        while element >= 0:
+            chain.append(row[element])
+            element = parent[element]
+        return tuple(reversed(chain))
+
+    def namespaceScope(self, element) -> typing.Union[typing.Tuple[int, str], None]:
+        """Return the depth (1 for the root element) of the nearest element, itself or an ancestor, declaring
+        a default namespace, and the namespace URI. None if there is no such element
+        """
+        scope = self._views["scope"][element]
+        if scope < 0:
+            return None
+        return len(self.chain(scope)), self._string(self._views["uri"][scope]).decode()
+
+
+def _stepString(step) -> str:
+    name, index = step
+    return "/" + name if index is None else "/{}[{}]".format(name, index)
+
+
+def _buildIndex(fileName, digest) -> bytes:
+    """Parse the XML file and return the content of its index file"""
+    parents = array.array("i")
+    localNames = list()
+    # (kind, name) by element, kind being "" without a namespace, the prefix, or None in the default namespace
+    kinds = list()
+    declared = dict()
+    children = collections.defaultdict(list)
+
+    stack = [-1]
+    pending = list()
+
+    def startNamespace(prefix, uri):
+        if prefix is None and uri:
+            pending.append(uri)
+
+    def startElement(name, attributes):
+        element = len(parents)
+        parts = name.split(" ")
+        if len(parts) == 1:
+            local, kind = parts[0], ""
+        elif len(parts) == 2:
+            local, kind = parts[1], None
+        else:
+            local, kind = parts[1], parts[2]
+        parents.append(stack[-1])
+        localNames.append(local)
+        kinds.append(kind)
+        children[stack[-1]].append(element)
+        if pending:
+            declared[element] = pending[-1]
+            del pending[:]
+        stack.append(element)
+
+    def endElement(name):
+        stack.pop()
+
+    parser = xml.parsers.expat.ParserCreate(namespace_separator=" ")
+    parser.namespace_prefixes = True
+    parser.StartNamespaceDeclHandler = startNamespace
+    parser.StartElementHandler = startElement
+    parser.EndElementHandler = endElement
+    with open(fileName, "rb") as file:
+        parser.ParseFile(file)
+
+    n = len(parents)
+    strings = list()
+    rows = array.array("I", bytes(4 * n))
+    nameTotals = array.array("I", bytes(4 * n))
+    canonical = array.array("I", bytes(4 * n))
+    localKeys = array.array("I", bytes(4 * n))
+    canonicalPaths = [b""] * n
+    localPaths = [b""] * n
+    for parent in sorted(children):
+        siblings = children[parent]
+        totals = collections.Counter(localNames[element] for element in siblings)
+        # xmlGetNodePath counts the siblings of the same name and prefix - or all of them in the default namespace
+        stepTotals = collections.Counter((localNames[element], kinds[element]) for element in siblings
+                                         if kinds[element] is not None)
+        counts = collections.Counter()
+        stepCounts = collections.Counter()
+        parentCanonical = canonicalPaths[parent] if parent >= 0 else b""
+        parentLocal = localPaths[parent] if parent >= 0 else b""
+        for row, element in enumerate(siblings, 1):
+            local, kind = localNames[element], kinds[element]
+            rows[element] = row
+            nameTotals[element] = totals[local]
+            counts[local] += 1
+            if kind is None:
+                step = "*" if len(siblings) == 1 else "*[{}]".format(row)
+            else:
+                stepCounts[(local, kind)] += 1
+                step = "{}:{}".format(kind, local) if kind else local
+                if stepTotals[(local, kind)] > 1:
+                    step = "{}[{}]".format(step, stepCounts[(local, kind)])
+            canonicalPaths[element] = parentCanonical + b"/" + step.encode()
+            localPaths[element] = parentLocal + "/{}[{}]".format(local, counts[local]).encode()
+
+    scopes = array.array("i", [-1] * n)
+    uris = array.array("i", [-1] * n)
+    for element in range(n):
+        if element in declared:
+            scopes[element] = element
+            uris[element] = len(strings)
+            strings.append(declared[element].encode())
+        elif parents[element] >= 0:
+            scopes[element] = scopes[parents[element]]
+
+    for element in range(n):
+        canonical[element] = len(strings)
+        strings.append(canonicalPaths[element])
+        localKeys[element] = len(strings)
+        strings.append(localPaths[element])
+    canonicalSorted = array.array("I", sorted(range(n), key=canonicalPaths.__getitem__))
+    localSorted = array.array("I", sorted(range(n), key=localPaths.__getitem__))
+
+    byNameLists = collections.defaultdict(list)
+    for element in range(n):
+        if kinds[element] == "":
+            byNameLists[localNames[element].encode()].append(element)
+    names = array.array("I")
+    nameStarts = array.array("I", [0])
+    byName = array.array("I")
+    for name in sorted(byNameLists):
+        names.append(len(strings))
+        strings.append(name)
+        byName.extend(byNameLists[name])
+        nameStarts.append(len(byName))
+
+    stringOffsets = array.array("Q", [0])
+    for string in strings:
+        stringOffsets.append(stringOffsets[-1] + len(string))
+    sections = {"blob": array.array("B", b"".join(strings)), "stringOffsets": stringOffsets, "parent": parents,
+                "row": rows, "nameTotal": nameTotals, "scope": scopes, "uri": uris, "canonical": canonical,
+                "localKey": localKeys, "canonicalSorted": canonicalSorted, "localSorted": localSorted,
+                "names": names, "nameStarts": nameStarts, "byName": byName}
+
+    table = list()
+    data = list()
+    offset = _DATA_START
+    for name, typecode in _SECTIONS:
+        content = sections[name].tobytes()
+        table.extend((offset, len(sections[name])))
+        padding = -len(content) % 8
+        data.append(content + bytes(padding))
+        offset += len(content) + padding
+    return _HEADER.pack(_MAGIC, digest, _BYTE_ORDER) + _TABLE.pack(*table) + b"".join(data)
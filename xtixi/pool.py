@@ -0,0 +1,212 @@
+# -*- coding: utf-8 -*-
+"""
+Created on 17.10.2026 20:05
+
+@author: Piotr Gradkowski <grotsztaksel@o2.pl>
+"""
+
+__authors__ = ['Piotr Gradkowski <grotsztaksel@o2.pl>']
+__date__ = '2026-10-17'
+__all__ = ["TixiPool"]
+
+import concurrent.futures
+import functools
+import math
+import os
+import queue
+import typing
+
+from .expanded_tixi import ExpandedTixi
+
+
+class _Replica(object):
+    """A read-only copy of the document. If a task changes it anyway, it is reopened from the snapshot"""
+    __slots__ = ("tixi", "snapshot", "generation")
+
+    def __init__(self, snapshot):
+        self.tixi = None
+        self.open(snapshot)
+
+    def open(self, snapshot):
+        """
+        :param snapshot: the exported document, and whether its whitespace-only text nodes are to be removed
+        """
+        self.close()
+        xml, clearWhitespace = snapshot
+        self.tixi = ExpandedTixi()
+        self.tixi.openString(xml)
+        if clearWhitespace:
+            self.tixi.clearWhitespace()
+        self.snapshot = snapshot
+        self.generation = self.tixi.documentGeneration()
+
+    def close(self):
+        if self.tixi is not None:
+            self.tixi.close()
+            self.tixi = None
+
+    def run(self, chunkFunction, chunk) -> list:
+        try:
+            return chunkFunction(self.tixi, chunk)
+        finally:
+            if self.tixi.documentGeneration() != self.generation:
+                self.open(self.snapshot)
+
+
+# The replica of a worker process
+_workerReplica = None
+
+
+def _initWorker(snapshot):
+    global _workerReplica
+    _workerReplica = _Replica(snapshot)
+
+
+def _runInWorker(chunkFunction, chunk) -> list:
+    return _workerReplica.run(chunkFunction, chunk)
+
+
+def _perItem(function, tixi, chunk) -> list:
+    return [function(tixi, item) for item in chunk]
+
+
+def _nodeNumbers(tixi, chunk) -> typing.List[int]:
+    return [tixi.xPathEvaluateNodeNumber(xPathExpr) for xPathExpr in chunk]
+
+
+def _allXPaths(tixi, chunk) -> typing.List[typing.List[str]]:
+    return [tixi.xPathExpressionGetAllXPaths(xPathExpr) for xPathExpr in chunk]
+
+
+def _attributes(tixi, chunk) -> typing.List[typing.Dict[str, str]]:
+    return [tixi.getAttributes(path) for path in chunk]
+
+
+def _unknownNSelementPaths(tixi, chunk) -> typing.List[str]:
+    return tixi.getUnknownNSelementPaths(chunk)
+
+
+class TixiPool(object):
+    """Read-only replicas of the document of an ExpandedTixi, to spread batches of queries over several cores.
+    The replicas are opened in threads (the native calls release the GIL) or in worker processes.
+    Before each batch, the pool checks if the source document has changed since the replicas were made,
+    and refreshes them - or raises a RuntimeError, if autoRefresh is False.
+    Functions given to the pool are called with a replica and an item. In the worker processes they must be
+    picklable - defined at module level
+    """
+
+    def __init__(self, tixi, size=None, processes=False, autoRefresh=True):
+        """
+        :param tixi: ExpandedTixi with the source document
+        :param size: number of replicas, the number of CPUs by default
+        :param processes: if True, open the replicas in worker processes, otherwise in threads
+        :param autoRefresh: if True, refresh the replicas when the source document changes
+        """
+        self.source = tixi
+        self.size = size or os.cpu_count() or 1
+        self.processes = processes
+        self.autoRefresh = autoRefresh
+        self._executor = None
+        self._replicas = None
+        self._generation = None
+        self.refresh()
+
+    def __enter__(self) -> "TixiPool":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+        if self._replicas is not None:
+            while not self._replicas.empty():
+                self._replicas.get().close()
+            self._replicas = None
+
+    def refresh(self):
+        """Make the replicas anew from the current source document"""
+        snapshot = self._snapshot()
+        if self.processes:
+            self.close()
+            self._executor = concurrent.futures.ProcessPoolExecutor(self.size, initializer=_initWorker,
+                                                                    initargs=(snapshot,))
+        elif self._replicas is None:
+            self._replicas = queue.Queue()
+            for _ in range(self.size):
+                self._replicas.put(_Replica(snapshot))
+            self._executor = concurrent.futures.ThreadPoolExecutor(self.size)
+        else:
+            replicas = [self._replicas.get() for _ in range(self.size)]
+            for replica in replicas:
+                replica.open(snapshot)
+                self._replicas.put(replica)
+        self._generation = self.source.documentGeneration()
+
+    def _snapshot(self) -> typing.Tuple[str, bool]:
+        # The export is indented. If the source has no whitespace-only text nodes, the replicas should not have
+        # them either - but the text of mixed content is to be kept as it is
+        clearWhitespace = not self.source.xPathEvaluateNodeNumber("//text()[normalize-space()='']")
+        return self.source.exportDocumentAsString(), clearWhitespace
+
+    def _checkGeneration(self):
+        if self._generation == self.source.documentGeneration():
+            return
+        if not self.autoRefresh:
+            raise RuntimeError("The document has changed since the replicas were made")
+        self.refresh()
+
+    #
+    def mapChunks(self, chunkFunction, items, chunkSize=None) -> list:
+        """
+        Split the items into chunks, call chunkFunction(replica, chunk) for each chunk on one of the replicas
+        and return the concatenated results, in the order of the items
+        :param chunkFunction: function returning a list of results, one per item of the chunk
+        :param items: sequence of items
+        :param chunkSize: number of items in a chunk. By default, each replica gets about four chunks
+        """
+        if self._executor is None:
+            raise RuntimeError("The pool is closed")
+        self._checkGeneration()
+        items = list(items)
+        if chunkSize is None:
+            chunkSize = max(1, math.ceil(len(items) / (4 * self.size)))
+        chunks = [items[i:i + chunkSize] for i in range(0, len(items), chunkSize)]
+        if self.processes:
+            results = self._executor.map(functools.partial(_runInWorker, chunkFunction), chunks)
+        else:
+            results = self._executor.map(functools.partial(self._runInThread, chunkFunction), chunks)
+        merged = list()
+        for result in results:
+            merged.extend(result)
+        return merged
+
+    def _runInThread(self, chunkFunction, chunk) -> list:
+        replica = self._replicas.get()
+        try:
+            return replica.run(chunkFunction, chunk)
+        finally:
+            self._replicas.put(replica)
+
+    def map(self, function, items, chunkSize=None) -> list:
+        """Return [function(replica, item) for item in items], computed on the replicas"""
+        return self.mapChunks(functools.partial(_perItem, function), items, chunkSize)
+
+    #
+    def xPathEvaluateNodeNumbers(self, xPathExprs, chunkSize=None) -> typing.List[int]:
+        """Return the number of paths to which each of the XPath expressions resolves"""
+        return self.mapChunks(_nodeNumbers, xPathExprs, chunkSize)
+
+    def xPathExpressionGetAllXPaths(self, xPathExprs, chunkSize=None) -> typing.List[typing.List[str]]:
+        """Return the lists of XML paths to which each of the XPath expressions resolves"""
+        return self.mapChunks(_allXPaths, xPathExprs, chunkSize)
+
+    def getAttributes(self, paths, chunkSize=None) -> typing.List[typing.Dict[str, str]]:
+        """Return the attributes of each of the elements"""
+        return self.mapChunks(_attributes, [str(path) for path in paths], chunkSize)
+
+    def getUnknownNSelementPaths(self, paths, chunkSize=None) -> typing.List[str]:
+        """Batch form of ExpandedTixi.getUnknownNSelementPath"""
+        return self.mapChunks(_unknownNSelementPaths, [str(path) for path in paths], chunkSize)
@@ -0,0 +1,197 @@
+# -*- coding: utf-8 -*-
+"""
+Created on 17.10.2026 17:40
+
+@author: Piotr Gradkowski <grotsztaksel@o2.pl>
+"""
+
+__authors__ = ['Piotr Gradkowski <grotsztaksel@o2.pl>']
+__date__ = '2026-10-17'
+__all__ = ["TixiProfiler", "profile"]
+
+import contextlib
+import functools
+import inspect
+import threading
+import time
+import typing
+
+try:
+    # If Tixi path is specified in PYTHONPATH
+    from tixi3wrapper import Tixi3
+except ImportError:
+    # This usually works in Anaconda environment
+    from tixi3.tixi3wrapper import Tixi3
+
+from .expanded_tixi import ExpandedTixi
+
+# Name under which the Tixi3 calls made directly by the user code (not from an ExpandedTixi method) are reported
+DIRECT = "<direct>"
+
+
+def _publicMethods(cls):
+    """Yield the names and the class attributes of the public methods defined in cls itself"""
+    for name, attribute in vars(cls).items():
+        if name.startswith("_") or isinstance(attribute, (staticmethod, classmethod)) or not callable(attribute):
+            continue
+        yield name, attribute
+
+
+class TixiProfiler(object):
+    """Count the calls of the Tixi3 methods and measure their wall time, attributing them to the ExpandedTixi method
+    that the user code has called (the outermost one, if ExpandedTixi methods call each other).
+    The methods are only patched while the profiler is running, so there is no overhead otherwise.
+    Only one profiler can run at a time
+    """
+
+    _active = None
+
+    def __init__(self):
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._originals = list()
+        self.reset()
+
+    def reset(self):
+        """Forget everything collected so far"""
+        # {caller: [calls, seconds]}
+        self._entries = dict()
+        # {(caller, tixi3 method): [calls, seconds]}
+        self._calls = dict()
+
+    @property
+    def running(self) -> bool:
+        return TixiProfiler._active is self
+
+    def start(self):
+        if TixiProfiler._active is not None:
+            raise RuntimeError("Another TixiProfiler is already running")
+        TixiProfiler._active = self
+        for name, attribute in _publicMethods(Tixi3):
+            self._patch(Tixi3, name, attribute, self._wrapTixi3(name, attribute))
+        for name, attribute in _publicMethods(ExpandedTixi):
+            self._patch(ExpandedTixi, name, attribute, self._wrapExpandedTixi(name, attribute))
+
+    def stop(self):
+        if not self.running:
+            return
+        for cls, name, attribute in reversed(self._originals):
+            setattr(cls, name, attribute)
+        self._originals = list()
+        TixiProfiler._active = None
+
+    def __enter__(self) -> "TixiProfiler":
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def _patch(self, cls, name, original, replacement):
+        self._originals.append((cls, name, original))
+        setattr(cls, name, replacement)
+
+    def _caller(self) -> typing.Union[str, None]:
+        return getattr(self._local, "caller", None)
+
+    def _record(self, table, key, seconds):
+        with self._lock:
+            entry = table.get(key)
+            if entry is None:
+                table[key] = [1, seconds]
+            else:
+                entry[0] += 1
+                entry[1] += seconds
+
+    def _wrapTixi3(self, name, original):
+        @functools.wraps(original)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return original(*args, **kwargs)
+            finally:
+                self._record(self._calls, (self._caller() or DIRECT, name), time.perf_counter() - start)
+
+        return wrapper
+
+    def _wrapExpandedTixi(self, name, original):
+        local = self._local
+
+        if inspect.isgeneratorfunction(inspect.unwrap(original)):
+            # The body runs on each next() - attribute it to the method only meanwhile
+            @functools.wraps(original)
+            def generator(*args, **kwargs):
+                iterator = original(*args, **kwargs)
+                while True:
+                    outermost = getattr(local, "caller", None) is None
+                    if outermost:
+                        local.caller = name
+                    start = time.perf_counter()
+                    try:
+                        value = next(iterator)
+                    except StopIteration:
+                        return
+                    finally:
+                        if outermost:
+                            local.caller = None
+                            self._record(self._entries, name, time.perf_counter() - start)
+                    yield value
+
+            return generator
+
+        @functools.wraps(original)
+        def wrapper(*args, **kwargs):
+            if getattr(local, "caller", None) is not None:
+                return original(*args, **kwargs)
+            local.caller = name
+            start = time.perf_counter()
+            try:
+                return original(*args, **kwargs)
+            finally:
+                local.caller = None
+                self._record(self._entries, name, time.perf_counter() - start)
+
+        return wrapper
+
+    def report(self) -> typing.Dict[str, typing.Dict[str, typing.Any]]:
+        """
+        Return what was collected
+        :return: dict {caller: {"calls": n, "seconds": t, "tixi3": {method: {"calls": n, "seconds": t}}}},
+                 where caller is the name of an ExpandedTixi method or DIRECT. For a generator method, "calls"
+                 counts the steps of the iteration
+        """
+        with self._lock:
+            result = dict()
+            for caller, (calls, seconds) in self._entries.items():
+                result[caller] = {"calls": calls, "seconds": seconds, "tixi3": dict()}
+            for (caller, method), (calls, seconds) in self._calls.items():
+                entry = result.setdefault(caller, {"calls": 0, "seconds": 0.0, "tixi3": dict()})
+                entry["tixi3"][method] = {"calls": calls, "seconds": seconds}
+        return result
+
+    def table(self, sortBy="seconds") -> str:
+        """
+        Return the report as a text table: a line per caller, followed by the Tixi3 methods it called
+        :param sortBy: "seconds" or "calls"
+        """
+        lines = ["{:<48} {:>10} {:>12} {:>12}".format("method", "calls", "seconds", "tixi3 calls")]
+        report = self.report()
+        for caller, entry in sorted(report.items(), key=lambda item: -item[1][sortBy]):
+            tixi3Calls = sum(call["calls"] for call in entry["tixi3"].values())
+            lines.append("{:<48} {:>10} {:>12.6f} {:>12}".format(caller, entry["calls"], entry["seconds"], tixi3Calls))
+            for method, call in sorted(entry["tixi3"].items(), key=lambda item: -item[1][sortBy]):
+                lines.append("    {:<44} {:>10} {:>12.6f}".format(method, call["calls"], call["seconds"]))
+        return "\n".join(lines)
+
+
+@contextlib.contextmanager
+def profile() -> typing.Iterator[TixiProfiler]:
+    """Profile the Tixi3 calls made within the context:
+
+        with profile() as profiler:
+            tixi.clearComments()
+        print(profiler.table())
+    """
+    profiler = TixiProfiler()
+    with profiler:
+        yield profiler
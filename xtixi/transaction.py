@@ -0,0 +1,299 @@
+# -*- coding: utf-8 -*-
+"""
+Created on 17.10.2026 18:45
+
+@author: Piotr Gradkowski <grotsztaksel@o2.pl>
+"""
+
+__authors__ = ['Piotr Gradkowski <grotsztaksel@o2.pl>']
+__date__ = '2026-10-17'
+__all__ = ["Batch", "BatchHandle"]
+
+import functools
+import typing
+
+try:
+    # If Tixi path is specified in PYTHONPATH
+    from tixi3wrapper import Tixi3, Tixi3Exception, ReturnCode
+except ImportError:
+    # This usually works in Anaconda environment
+    from tixi3.tixi3wrapper import Tixi3, Tixi3Exception, ReturnCode
+
+
+class _BatchNode(object):
+    """An element referred to in a batch: its position among the child elements of its parent,
+    kept up to date while the batch is applied
+    """
+    __slots__ = ("parent", "index", "children", "originals", "removed", "count")
+
+    def __init__(self, parent, index):
+        self.parent = parent
+        self.index = index
+        # The referred child elements, and those of them that existed before the batch, by their original positions
+        self.children = list()
+        self.originals = dict()
+        self.removed = False
+        # Number of child elements, if known
+        self.count = None
+
+    def path(self) -> str:
+        """Return the path of the element in the form "/*[1]/*[3]" """
+        steps = list()
+        node = self
+        while node.parent is not None:
+            steps.append("*[{}]".format(node.index))
+            node = node.parent
+        return "/" + "/".join(reversed(steps))
+
+    def alive(self) -> bool:
+        node = self
+        while node is not None:
+            if node.removed:
+                return False
+            node = node.parent
+        return True
+
+    def position(self) -> typing.Tuple[int, ...]:
+        """Key sorting the elements in document order"""
+        position = list()
+        node = self
+        while node.parent is not None:
+            position.append(node.index)
+            node = node.parent
+        return tuple(reversed(position))
+
+
+class BatchHandle(object):
+    """Reference to an element created in a batch. Its path is resolved when the batch is applied"""
+    __slots__ = ("_batch", "_node", "_path")
+
+    def __init__(self, batch):
+        self._batch = batch
+        self._node = None
+        self._path = None
+
+    @property
+    def path(self) -> typing.Union[str, None]:
+        """Path of the element, as xmlGetNodePath gives it, or None if the element was removed in the batch"""
+        if not self._batch.applied:
+            raise RuntimeError("The batch has not been applied yet")
+        return self._path
+
+    def __repr__(self):
+        return "BatchHandle({})".format(self.path if self._batch.applied else "pending")
+
+
+class Batch(object):
+    """Changes of the document queued and applied all at once, when the with-block ends without an exception.
+
+    The methods take the paths of the elements as strings, referring to the document as it was before the batch,
+    or as BatchHandles of the elements created earlier in the batch. The indices given to the *AtIndex methods
+    count the child elements as they are at that point of the batch. The removals are applied last,
+    after everything else has succeeded.
+
+    If a change fails, those applied before it are undone and the exception is raised, leaving the document
+    as it was. The removed elements are restored from their elements, attributes and texts, so an element
+    holding anything else (comments, namespaces, text beside its child elements) cannot be removed in a batch.
+    The document cannot be changed directly while the batch is open
+    """
+
+    def __init__(self, tixi):
+        self.tixi = tixi
+        self.applied = False
+        self.applying = False
+        self._operations = list()
+        self._root = None
+        self._nodes = None
+
+    def __enter__(self) -> "Batch":
+        if self.tixi._batch is not None:
+            raise RuntimeError("Another batch is already open")
+        if self.applied:
+            raise RuntimeError("The batch has already been applied")
+        self.tixi._batch = self
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.tixi._batch = None
+        if exc_type is None:
+            self.apply()
+
+    #
+    def createElement(self, xmlPath, elementName) -> BatchHandle:
+        return self._queueCreation(xmlPath, elementName, None, None)
+
+    def createElementAtIndex(self, xmlPath, elementName, index) -> BatchHandle:
+        return self._queueCreation(xmlPath, elementName, None, index)
+
+    def addTextElement(self, xmlPath, elementName, text) -> BatchHandle:
+        return self._queueCreation(xmlPath, elementName, text, None)
+
+    def addTextElementAtIndex(self, xmlPath, elementName, text, index) -> BatchHandle:
+        return self._queueCreation(xmlPath, elementName, text, index)
+
+    def addTextAttribute(self, xmlPath, attrName, attrValue):
+        self._queue(self._setAttribute, xmlPath, attrName, str(attrValue))
+
+    def removeElement(self, xmlPath):
+        self._queue(self._remove, xmlPath)
+
+    def _queueCreation(self, xmlPath, elementName, text, index) -> BatchHandle:
+        handle = BatchHandle(self)
+        self._queue(self._create, xmlPath, elementName, text, index, handle)
+        return handle
+
+    def _queue(self, operation, reference, *args):
+        if self.applied:
+            raise RuntimeError("The batch has already been applied")
+        if not isinstance(reference, BatchHandle):
+            reference = str(reference)
+        self._operations.append((operation, (reference,) + args))
+
+    #
+    def apply(self):
+        """Apply the queued changes. Called at the end of the with-block"""
+        if self.applied:
+            raise RuntimeError("The batch has already been applied")
+        self._root = _BatchNode(None, None)
+        self._nodes = dict()
+        # Everything the string paths refer to is found before anything is changed
+        for operation, args in self._operations:
+            if not isinstance(args[0], BatchHandle) and args[0] not in self._nodes:
+                self._nodes[args[0]] = self._resolve(args[0])
+        # Refuse to remove what could not be restored as it was
+        for operation, args in self._operations:
+            if operation == self._remove and not isinstance(args[0], BatchHandle):
+                content = self.tixi._uncopiedContent(self._nodes[args[0]].path(), exact=True)
+                if content is not None:
+                    raise ValueError("{} cannot be removed in a batch, it holds {}".format(args[0], content))
+
+        undo = list()
+        removals = list()
+        self.applying = True
+        try:
+            # The changed subtrees are marked as the changes are applied
+            with self.tixi._changingDocument(marked=True):
+                try:
+                    for operation, args in self._operations:
+                        operation(undo, removals, *args)
+                    self._removeElements(undo, removals)
+                except Exception:
+                    for action in reversed(undo):
+                        action()
+                    raise
+        finally:
+            self.applying = False
+        # The paths of the created elements, as they are now
+        for operation, args in self._operations:
+            if operation == self._create:
+                handle = args[-1]
+                if handle._node.alive():
+                    handle._path = self.tixi.xPathExpressionGetXPath(handle._node.path(), 1)
+        self._operations = list()
+        self.applied = True
+
+    def _resolve(self, xmlPath) -> _BatchNode:
+        """Return the node of the element, creating the nodes of it and its ancestors by their original positions"""
+        tixi = self.tixi
+        n = tixi.xPathEvaluateNodeNumber(xmlPath)
+        if n == 0:
+            raise Tixi3Exception(ReturnCode.ELEMENT_NOT_FOUND, xmlPath)
+        if n > 1:
+            raise Tixi3Exception(ReturnCode.ELEMENT_PATH_NOT_UNIQUE, xmlPath)
+        steps = tixi.xPathExpressionGetXPath(xmlPath, 1).split("/")
+        node = self._root
+        for depth in range(2, len(steps) + 1):
+            row = tixi.elementRow("/".join(steps[:depth]))
+            child = node.originals.get(row)
+            if child is None:
+                child = _BatchNode(node, row)
+                node.originals[row] = child
+                node.children.append(child)
+            node = child
+        return node
+
+    def _node(self, reference) -> _BatchNode:
+        node = reference._node if isinstance(reference, BatchHandle) else self._nodes[reference]
+        if node is None or not node.alive():
+            raise Tixi3Exception(ReturnCode.ELEMENT_NOT_FOUND, repr(reference))
+        return node
+
+    def _create(self, undo, removals, xmlPath, elementName, text, index, handle):
+        parent = self._node(xmlPath)
+        parentPath = parent.path()
+        self.tixi._markChanged([parentPath])
+        if index is None:
+            if parent.count is None:
+                parent.count = self.tixi._xPathEvaluateNodeNumber(parentPath + "/*")
+            position = parent.count + 1
+            if text is None:
+                Tixi3.createElement(self.tixi, parentPath, elementName)
+            else:
+                Tixi3.addTextElement(self.tixi, parentPath, elementName, text)
+        else:
+            # The elements to be removed are still there - skip them
+            position = index
+            for removed in sorted(child.index for child in parent.children if child.removed):
+                if removed > position:
+                    break
+                position += 1
+            if text is None:
+                Tixi3.createElementAtIndex(self.tixi, parentPath, elementName, position)
+            else:
+                Tixi3.addTextElementAtIndex(self.tixi, parentPath, elementName, text, position)
+        undo.append(functools.partial(Tixi3.removeElement, self.tixi, "{}/*[{}]".format(parentPath.rstrip("/"),
+                                                                                        position)))
+
+        for child in parent.children:
+            if child.index >= position:
+                child.index += 1
+        if parent.count is not None:
+            parent.count += 1
+        node = _BatchNode(parent, position)
+        node.count = 0
+        parent.children.append(node)
+        handle._node = node
+
+    def _setAttribute(self, undo, removals, xmlPath, attrName, attrValue):
+        path = self._node(xmlPath).path()
+        self.tixi._markChanged([path])
+        if Tixi3.checkAttribute(self.tixi, path, attrName):
+            undo.append(functools.partial(Tixi3.addTextAttribute, self.tixi, path, attrName,
+                                          Tixi3.getTextAttribute(self.tixi, path, attrName)))
+        else:
+            undo.append(functools.partial(Tixi3.removeAttribute, self.tixi, path, attrName))
+        Tixi3.addTextAttribute(self.tixi, path, attrName, attrValue)
+
+    def _remove(self, undo, removals, xmlPath):
+        node = self._node(xmlPath)
+        node.removed = True
+        removals.append(node)
+
+    def _removeElements(self, undo, removals):
+        """Remove the elements backwards in document order, so that removing one does not move the others"""
+        for node in sorted(removals, key=_BatchNode.position, reverse=True):
+            if node.parent.alive():
+                path = node.path()
+                self.tixi._markChanged([path], parents=True)
+                spec = self.tixi._subtreeSpec(path)
+                Tixi3.removeElement(self.tixi, path)
+                undo.append(functools.partial(self._restore, node.parent.path(), node.index, spec))
+            for sibling in node.parent.children:
+                if sibling.index > node.index:
+                    sibling.index -= 1
+            if node.parent.count is not None:
+                node.parent.count -= 1
+
+    def _restore(self, parentPath, index, spec):
+        """Create a removed element again at its position, from its spec (see ExpandedTixi.buildSubtree).
+        The batch removes only the elements that the spec describes completely
+        """
+        path = "{}/*[{}]".format(parentPath.rstrip("/"), index)
+        if "text" in spec:
+            Tixi3.addTextElementAtIndex(self.tixi, parentPath, spec["name"], spec["text"], index)
+        else:
+            Tixi3.createElementAtIndex(self.tixi, parentPath, spec["name"], index)
+        for attrName, attrValue in spec["attributes"].items():
+            Tixi3.addTextAttribute(self.tixi, path, attrName, attrValue)
+        if spec["children"]:
+            self.tixi.buildSubtree(path, spec["children"])
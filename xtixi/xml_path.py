@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+"""
+Created on 17.10.2026 14:40
+
+@author: Piotr Gradkowski <grotsztaksel@o2.pl>
+"""
+
+__authors__ = ['Piotr Gradkowski <grotsztaksel@o2.pl>']
+__date__ = '2026-10-17'
+__all__ = ["XmlPath"]
+
+import functools
+import re
+import typing
+
+# A step with an optional index, e.g. "name", "p:name[2]", "*[3]"
+_STEP = re.compile(r"(.+?)(?:\[(\d+)\])?")
+
+
+class XmlPath(object):
+    """An immutable XML path, parsed into its steps - (name, index) tuples, the index being None if not given.
+    Equal to (and hashed as) its string form, so it can be used wherever the path string is used as a key
+    """
+    __slots__ = ("steps", "_string")
+
+    def __init__(self, steps=()):
+        steps = tuple(steps)
+        object.__setattr__(self, "steps", steps)
+        object.__setattr__(self, "_string", "/" + "/".join(_renderStep(name, index) for name, index in steps))
+
+    @staticmethod
+    @functools.lru_cache(maxsize=4096)
+    def parse(path) -> "XmlPath":
+        """Return the XmlPath of an absolute path string like "/root/child_2[1]/node_3". Results are cached"""
+        if isinstance(path, XmlPath):
+            return path
+        if not path.startswith("/"):
+            raise ValueError("Not an absolute XML path: {}".format(path))
+        steps = list()
+        if path != "/":
+            for step in path[1:].split("/"):
+                match = _STEP.fullmatch(step)
+                if match is None:
+                    raise ValueError("Empty step in XML path: {}".format(path))
+                name, index = match.groups()
+                steps.append((name, None if index is None else int(index)))
+        return XmlPath(steps)
+
+    def __setattr__(self, key, value):
+        raise AttributeError("XmlPath is immutable")
+
+    def __reduce__(self):
+        return XmlPath, (self.steps,)
+
+    def __str__(self):
+        return self._string
+
+    def __repr__(self):
+        return "XmlPath({!r})".format(self._string)
+
+    def __eq__(self, other):
+        if isinstance(other, XmlPath):
+            return self.steps == other.steps
+        if isinstance(other, str):
+            return self._string == other
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(self._string)
+
+    def __len__(self):
+        return len(self.steps)
+
+    def __bool__(self):
+        return bool(self.steps)
+
+    def __getitem__(self, item):
+        """Return the step at the position, or the path of the steps in the slice"""
+        if isinstance(item, slice):
+            return XmlPath(self.steps[item])
+        return self.steps[item]
+
+    #
+    @property
+    def parent(self) -> "XmlPath":
+        return XmlPath(self.steps[:-1])
+
+    @property
+    def name(self) -> str:
+        """Name of the last element of the path, without the index"""
+        return self.steps[-1][0]
+
+    @property
+    def index(self) -> typing.Union[int, None]:
+        """Index of the last element of the path, None if not given"""
+        return self.steps[-1][1]
+
+    @property
+    def number(self) -> int:
+        """Index of the last element of the path, 1 if not given"""
+        index = self.steps[-1][1]
+        return 1 if index is None else index
+
+    @property
+    def uniqueName(self) -> str:
+        """Last step of the path, with the index if given"""
+        return _renderStep(*self.steps[-1])
+
+    #
+    def child(self, name, n=None) -> "XmlPath":
+        """Return the path of the child element name, with index n, if given"""
+        return XmlPath(self.steps + ((name, n),))
+
+    def withIndex(self, n) -> "XmlPath":
+        """Return the same path, with the index of the last element set to n (or removed, if n is None)"""
+        return XmlPath(self.steps[:-1] + ((self.steps[-1][0], n),))
+
+
+def _renderStep(name, index):
+    if index is None:
+        return name
+    return "{}[{}]".format(name, index)